@@ -0,0 +1,353 @@
+"""
+Headless async HTTP API for comparisons and saved people.
+
+The API runs comparisons on an asyncio event loop with the AsyncOpenAI
+client, independent of Streamlit reruns, and shares the comparison cache,
+single-flight registry, rate-limit scheduler and people store with the app.
+
+Endpoints:
+
+- POST /compare: compare two people (saved names, or names with strengths)
+- POST /compare/batch: compare many pairs; each pair succeeds or fails on its own
+- GET /people, GET/PUT/DELETE /people/{name}: manage saved people
+- GET /health: liveness and load
+
+Overload protection: at most API_MAX_CONCURRENCY comparisons run at once and
+at most API_MAX_QUEUE requests wait for a slot. A request that cannot be
+admitted, or waits longer than API_QUEUE_TIMEOUT, gets 503 with Retry-After,
+as does one whose API calls could not be scheduled before their deadline; a
+comparison that takes longer than API_REQUEST_TIMEOUT gets 504. Invalid
+input gets 4xx, a failed OpenAI call 502 and a missing API key 500.
+
+Run with:
+
+    uvicorn api_server:app --host 0.0.0.0 --port 8000
+    python api_server.py
+
+Point OPENAI_BASE_URL at the benchmark stub server (benchmarks/stub_server.py) to test
+without an OpenAI key.
+"""
+
+import asyncio
+import hmac
+import os
+from contextlib import asynccontextmanager
+from typing import Dict, List, Optional
+
+from fastapi import Depends, FastAPI, Header, HTTPException
+from pydantic import BaseModel, Field
+
+import data_storage
+from batch_compare import BATCH_MAX_WORKERS
+from fallbacks import is_degraded
+from metrics import metrics
+from model_router import DEPTHS
+from openai_service import (
+    COMPARISON_MODES, SECTIONS, MissingApiKeyError, close_async_openai_client, compare_strengths_async
+)
+from rate_limiter import DeadlineExceeded
+from strengths import validate_strengths
+
+
+API_HOST = os.environ.get("API_HOST", "127.0.0.1")
+API_PORT = int(os.environ.get("API_PORT", "8000"))
+
+# Bearer token required on every request except /health; unset leaves the API open
+API_TOKEN = os.environ.get("API_TOKEN") or None
+
+# Comparisons running at once, and requests allowed to wait for a slot
+API_MAX_CONCURRENCY = int(os.environ.get("API_MAX_CONCURRENCY", "64"))
+API_MAX_QUEUE = int(os.environ.get("API_MAX_QUEUE", "256"))
+API_QUEUE_TIMEOUT = float(os.environ.get("API_QUEUE_TIMEOUT", "10"))
+
+# Overall time allowed for one comparison, including retries
+API_REQUEST_TIMEOUT = float(os.environ.get("API_REQUEST_TIMEOUT", "120"))
+
+API_MAX_BATCH = int(os.environ.get("API_MAX_BATCH", "100"))
+
+
+class Overloaded(Exception):
+    """Raised when a request cannot be admitted."""
+
+
+class AdmissionControl:
+    """
+    Bounded concurrency with a bounded, time-limited wait for a slot.
+    """
+
+    def __init__(self, limit: int = API_MAX_CONCURRENCY, max_waiting: int = API_MAX_QUEUE,
+                 wait_timeout: float = API_QUEUE_TIMEOUT):
+        self.limit = limit
+        self.max_waiting = max_waiting
+        self.wait_timeout = wait_timeout
+        self.active = 0
+        self.waiting = 0
+        self.rejected = 0
+        self._semaphore = asyncio.Semaphore(limit)
+
+    def check(self) -> None:
+        """Reject immediately if the wait queue is full."""
+        if self._semaphore.locked() and self.waiting >= self.max_waiting:
+            self.rejected += 1
+            raise Overloaded("Too many requests are waiting")
+
+    @asynccontextmanager
+    async def slot(self, bounded: bool = True):
+        """
+        Hold one comparison slot.
+
+        Args:
+            bounded (bool): Apply the queue limit and wait timeout; batch items
+                pass False because their batch was already admitted
+
+        Raises:
+            Overloaded: If the queue is full or the wait times out
+        """
+        if bounded:
+            self.check()
+        self.waiting += 1
+        try:
+            if bounded:
+                async with asyncio.timeout(self.wait_timeout):
+                    await self._semaphore.acquire()
+            else:
+                await self._semaphore.acquire()
+        except TimeoutError:
+            self.rejected += 1
+            raise Overloaded("Timed out waiting for a free slot")
+        finally:
+            self.waiting -= 1
+
+        self.active += 1
+        try:
+            yield
+        finally:
+            self.active -= 1
+            self._semaphore.release()
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Report admission counters.
+
+        Returns:
+            dict: limit, active, waiting and rejected
+        """
+        return {"limit": self.limit, "active": self.active, "waiting": self.waiting, "rejected": self.rejected}
+
+
+class PersonIn(BaseModel):
+    strengths: List[str]
+
+
+class Person(BaseModel):
+    name: str
+    strengths: List[str]
+
+
+class CompareRequest(BaseModel):
+    person1_name: str = Field(min_length=1)
+    person2_name: str = Field(min_length=1)
+    person1_strengths: Optional[List[str]] = None
+    person2_strengths: Optional[List[str]] = None
+    mode: Optional[str] = None
+    depth: str = "standard"
+    use_cache: bool = True
+
+
+class Comparison(BaseModel):
+    person1_name: str
+    person2_name: str
+    conflicts: str
+    collaboration: str
+    communication: str
+    degraded: List[str] = []
+
+
+class BatchRequest(BaseModel):
+    pairs: List[CompareRequest]
+    max_concurrency: int = Field(default=BATCH_MAX_WORKERS, ge=1)
+
+
+class BatchItem(BaseModel):
+    person1_name: str
+    person2_name: str
+    status: str
+    result: Optional[Comparison] = None
+    error: Optional[str] = None
+
+
+class BatchResponse(BaseModel):
+    completed: int
+    failed: int
+    results: List[BatchItem]
+
+
+class ComparisonError(Exception):
+    """A comparison failed; carries the HTTP status to report."""
+
+    def __init__(self, status_code: int, detail: str, headers: Optional[Dict[str, str]] = None):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+        self.headers = headers
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if API_TOKEN is None:
+        print("Warning: API_TOKEN is not set; the API accepts unauthenticated requests.")
+    app.state.admission = AdmissionControl()
+    yield
+    await close_async_openai_client()
+
+
+app = FastAPI(title="Strengths Checker API", lifespan=lifespan)
+
+
+def require_token(authorization: Optional[str] = Header(default=None)) -> None:
+    """Check the bearer token when API_TOKEN is set."""
+    if API_TOKEN is not None and not hmac.compare_digest(authorization or "", f"Bearer {API_TOKEN}"):
+        raise HTTPException(status_code=401, detail="Missing or invalid API token",
+                            headers={"WWW-Authenticate": "Bearer"})
+
+
+async def resolve_strengths(name: str, strengths: Optional[List[str]]) -> List[str]:
+    """Return the given strengths, or the saved ones, validated."""
+    if strengths is None:
+        strengths = await asyncio.to_thread(data_storage.get_person_strengths, name)
+        if strengths is None:
+            raise ComparisonError(404, f"No saved person named {name!r}")
+    valid, message = validate_strengths(strengths)
+    if not valid:
+        raise ComparisonError(422, f"{name}: {message}")
+    return strengths
+
+
+async def run_comparison(request: CompareRequest, admission: AdmissionControl, bounded: bool = True) -> Comparison:
+    """
+    Resolve, admit and run one comparison.
+
+    Raises:
+        ComparisonError: With the status code describing the failure
+    """
+    if request.mode is not None and request.mode not in COMPARISON_MODES:
+        raise ComparisonError(422, f"Unknown comparison mode: {request.mode!r}. "
+                                   f"Expected one of {', '.join(COMPARISON_MODES)}.")
+    if request.depth not in DEPTHS:
+        raise ComparisonError(422, f"Unknown analysis depth: {request.depth!r}. "
+                                   f"Expected one of {', '.join(DEPTHS)}.")
+    person1_strengths = await resolve_strengths(request.person1_name, request.person1_strengths)
+    person2_strengths = await resolve_strengths(request.person2_name, request.person2_strengths)
+
+    try:
+        async with admission.slot(bounded=bounded):
+            with metrics.span("api_compare"):
+                sections = await asyncio.wait_for(
+                    compare_strengths_async(
+                        request.person1_name, person1_strengths,
+                        request.person2_name, person2_strengths,
+                        mode=request.mode, use_cache=request.use_cache, depth=request.depth
+                    ),
+                    timeout=API_REQUEST_TIMEOUT
+                )
+    except (Overloaded, DeadlineExceeded) as e:
+        raise ComparisonError(503, str(e), headers={"Retry-After": "1"})
+    except asyncio.TimeoutError:
+        raise ComparisonError(504, f"Comparison did not finish within {API_REQUEST_TIMEOUT:.0f}s")
+    except MissingApiKeyError:
+        raise ComparisonError(500, "The server has no OpenAI API key configured")
+    except ValueError as e:
+        raise ComparisonError(422, str(e))
+    except Exception as e:
+        raise ComparisonError(502, str(e))
+
+    return Comparison(
+        person1_name=request.person1_name,
+        person2_name=request.person2_name,
+        degraded=[section for section, text in zip(SECTIONS, sections) if is_degraded(text)],
+        **dict(zip(SECTIONS, sections))
+    )
+
+
+@app.get("/health")
+async def health():
+    return {"status": "ok", "admission": app.state.admission.stats()}
+
+
+@app.post("/compare", response_model=Comparison, dependencies=[Depends(require_token)])
+async def compare(request: CompareRequest):
+    try:
+        return await run_comparison(request, app.state.admission)
+    except ComparisonError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail, headers=e.headers)
+
+
+@app.post("/compare/batch", response_model=BatchResponse, dependencies=[Depends(require_token)])
+async def compare_batch(request: BatchRequest):
+    if len(request.pairs) > API_MAX_BATCH:
+        raise HTTPException(status_code=413, detail=f"At most {API_MAX_BATCH} pairs per batch")
+
+    admission = app.state.admission
+    try:
+        admission.check()
+    except Overloaded as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
+
+    # Each batch runs a few pairs at a time so one batch cannot take every slot
+    workers = asyncio.Semaphore(min(request.max_concurrency, API_MAX_CONCURRENCY))
+
+    async def run(pair: CompareRequest) -> BatchItem:
+        async with workers:
+            try:
+                result = await run_comparison(pair, admission, bounded=False)
+            except ComparisonError as e:
+                return BatchItem(person1_name=pair.person1_name, person2_name=pair.person2_name,
+                                 status="failed", error=e.detail)
+        return BatchItem(person1_name=pair.person1_name, person2_name=pair.person2_name,
+                         status="done", result=result)
+
+    results = await asyncio.gather(*(run(pair) for pair in request.pairs))
+    completed = sum(1 for item in results if item.status == "done")
+    return BatchResponse(completed=completed, failed=len(results) - completed, results=results)
+
+
+@app.get("/people", response_model=List[Person], dependencies=[Depends(require_token)])
+async def list_people():
+    people = await asyncio.to_thread(data_storage.load_saved_people)
+    return [Person(name=name, strengths=strengths) for name, strengths in people.items()]
+
+
+@app.get("/people/{name}", response_model=Person, dependencies=[Depends(require_token)])
+async def get_person(name: str):
+    strengths = await asyncio.to_thread(data_storage.get_person_strengths, name)
+    if strengths is None:
+        raise HTTPException(status_code=404, detail=f"No saved person named {name!r}")
+    return Person(name=name, strengths=strengths)
+
+
+@app.put("/people/{name}", response_model=Person, dependencies=[Depends(require_token)])
+async def put_person(name: str, person: PersonIn):
+    if not name.strip():
+        raise HTTPException(status_code=422, detail="Name must not be empty")
+    valid, message = validate_strengths(person.strengths)
+    if not valid:
+        raise HTTPException(status_code=422, detail=message)
+    if not await asyncio.to_thread(data_storage.save_person, name, person.strengths):
+        raise HTTPException(status_code=500, detail="Failed to save person")
+    return Person(name=name, strengths=person.strengths)
+
+
+@app.delete("/people/{name}", status_code=204, dependencies=[Depends(require_token)])
+async def delete_person(name: str):
+    if not await asyncio.to_thread(data_storage.delete_person, name):
+        raise HTTPException(status_code=404, detail=f"No saved person named {name!r}")
+
+
+def main():
+    import uvicorn
+
+    uvicorn.run(app, host=API_HOST, port=API_PORT)
+
+
+if __name__ == "__main__":
+    main()
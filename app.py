@@ -2,10 +2,29 @@
 CliftonStrengths Comparison App - Streamlit Application
 """
 
+import io
+import os
+import time
+
+import pandas as pd
 import streamlit as st
-from strengths import CLIFTON_STRENGTHS, validate_strengths, format_strengths_list
-from openai_service import compare_strengths
-from data_storage import load_saved_people, save_person, delete_person, get_person_strengths
+from strengths import CLIFTON_STRENGTHS, STRENGTH_INDEX, validate_strengths, format_strengths_list
+from openai_service import SECTIONS, stream_comparison
+from fallbacks import is_degraded
+from comparison_cache import get_comparison_cache
+from metrics import maybe_start_metrics_server, metrics
+from rate_limiter import get_scheduler
+from model_router import get_router
+from singleflight import get_comparison_flights
+from batch_compare import BATCH_MAX_WORKERS, DONE, FAILED, BatchJobState, run_batch
+from scoring import score_pair
+from profile_search import SEARCH_METRICS, suggest_partners
+from prefetch import PREFETCH_ENABLED, get_prefetcher, prefetch_pairs
+from bulk_io import FORMATS as EXPORT_FORMATS, detect_format, export_people_text, import_people
+from session_history import entry_label, export_filename, get_session_history, history_key, to_json, to_markdown
+from data_storage import (
+    list_saved_names, save_person, delete_person, get_person_strengths, read_cache_stats, saved_people_generation
+)
 
 
 def check_password():
@@ -23,9 +42,24 @@ def check_password():
         # Default password for local development
         return "strengths2024"
     
+    def get_admin_password():
+        """Get the admin password from secrets or environment (no default)."""
+        try:
+            if hasattr(st, 'secrets') and "admin_password" in st.secrets:
+                return st.secrets["admin_password"]
+        except:
+            pass
+        return os.environ.get("ADMIN_PASSWORD")
+    
     def password_entered():
         """Check if the entered password is correct."""
-        if st.session_state["password_input"] == get_password():
+        admin_password = get_admin_password()
+        if admin_password and st.session_state["password_input"] == admin_password:
+            # The admin password also unlocks the metrics panel
+            st.session_state["password_correct"] = True
+            st.session_state["is_admin"] = True
+            del st.session_state["password_input"]
+        elif st.session_state["password_input"] == get_password():
             st.session_state["password_correct"] = True
             # Don't store the actual password
             del st.session_state["password_input"]
@@ -57,6 +91,26 @@ def check_password():
     return False
 
 
+@st.cache_resource(show_spinner=False)
+def get_strength_options():
+    """Options for the strength dropdowns, built once per process."""
+    return tuple(["Select a strength..."] + CLIFTON_STRENGTHS)
+
+
+@st.cache_resource(max_entries=2, show_spinner=False)
+def get_person_options(generation):
+    """
+    Options for the person dropdowns, rebuilt only when the saved people change.
+    
+    Args:
+        generation (int): saved_people_generation() value the list is built for
+        
+    Returns:
+        tuple: "➕ Add New Person" followed by the saved names
+    """
+    return tuple(["➕ Add New Person"] + list_saved_names())
+
+
 def render_person_selector(person_number, is_me=False):
     """
     Render the person selection and strengths input section.
@@ -68,10 +122,6 @@ def render_person_selector(person_number, is_me=False):
     Returns:
         tuple: (name, strengths_list)
     """
-    # Load saved people
-    saved_people = load_saved_people()
-    saved_names = list(saved_people.keys())
-    
     # Header
     header = f"👤 Person {person_number}"
     if is_me:
@@ -92,7 +142,7 @@ def render_person_selector(person_number, is_me=False):
         st.session_state[selection_key] = "➕ Add New Person"
     
     # Dropdown to select saved person or add new
-    options = ["➕ Add New Person"] + saved_names
+    options = get_person_options(saved_people_generation())
     
     # Validate that current selection is still valid
     if st.session_state[selection_key] not in options:
@@ -158,14 +208,11 @@ def render_person_selector(person_number, is_me=False):
         # Determine default index
         default_index = 0
         if person_strengths and i < len(person_strengths):
-            try:
-                default_index = CLIFTON_STRENGTHS.index(person_strengths[i]) + 1
-            except ValueError:
-                default_index = 0
+            default_index = STRENGTH_INDEX.get(person_strengths[i], -1) + 1
         
         strength = st.selectbox(
             f"Strength #{i+1}",
-            options=["Select a strength..."] + CLIFTON_STRENGTHS,
+            options=get_strength_options(),
             key=strength_key,
             index=default_index if selected != "➕ Add New Person" else 0
         )
@@ -209,43 +256,339 @@ def render_person_selector(person_number, is_me=False):
                 else:
                     st.error("Failed to delete person.")
     
+    if selected != "➕ Add New Person":
+        render_partner_suggestions(person_number, selected)
+    
     return person_name, current_strengths
 
 
-def main():
-    """Main Streamlit application."""
+def render_partner_suggestions(person_number, name):
+    """
+    Render the "suggest a partner" search for a saved person.
     
-    # Page configuration
-    st.set_page_config(
-        page_title="CliftonStrengths Comparison",
-        page_icon="💪",
-        layout="wide"
-    )
+    Choosing a suggestion selects them as the other person.
     
-    # Check password first
-    if not check_password():
-        st.stop()
+    Args:
+        person_number (int): 1 or 2
+        name (str): The selected saved person
+    """
+    other_number = 2 if person_number == 1 else 1
+    metric_labels = {
+        "shared": "Most shared themes",
+        "complementary": "Most complementary",
+        "similar": "Most similar (rank-weighted)",
+    }
+    
+    with st.expander("🤝 Suggest a partner"):
+        metric = st.selectbox(
+            "Match by",
+            options=list(SEARCH_METRICS),
+            format_func=metric_labels.get,
+            key=f"person{person_number}_suggest_metric"
+        )
+        with metrics.span("partner_search", metric=metric):
+            suggestions = suggest_partners(name, metric, k=5)
+        
+        if not suggestions:
+            st.caption("No other saved people to suggest yet.")
+            return
+        
+        for rank, (partner, score) in enumerate(suggestions):
+            label = f"{int(score)} shared" if metric == "shared" else f"{score:.0%}"
+            if st.button(f"{partner} · {label}", key=f"person{person_number}_suggestion_{rank}",
+                         use_container_width=True):
+                st.session_state[f"person{other_number}_pending_selection"] = partner
+                st.rerun()
+
+
+def build_matrix_frame(names, state):
+    """
+    Build the N×N status matrix for a team batch.
     
-    # Title and description
-    st.title("🎯 CliftonStrengths Comparison Tool")
+    Args:
+        names (list): Team member names (rows and columns)
+        state (BatchJobState): Batch state holding job statuses
+        
+    Returns:
+        DataFrame: Status symbol per pair (row compared against column)
+    """
+    symbols = {DONE: "✅", FAILED: "❌"}
+    rows = []
+    for row_name in names:
+        row = []
+        for col_name in names:
+            if row_name == col_name:
+                row.append("—")
+                continue
+            job = state.get((row_name, col_name))
+            if job is None and not state.ordered:
+                job = state.get((col_name, row_name))
+            row.append(symbols.get(job["status"], "⏳") if job else "")
+        rows.append(row)
+    return pd.DataFrame(rows, index=names, columns=names)
+
+
+def render_team_matrix_page():
+    """Render the team matrix page: all-pairs comparisons for a group of saved people."""
+    st.title("🧮 Team Matrix")
     st.markdown(
-        "Compare CliftonStrengths profiles between two people to understand "
-        "potential conflicts, collaboration opportunities, and communication strategies."
+        "Compare every pair in a team of saved people. Finished comparisons are kept, "
+        "so an interrupted run picks up where it stopped."
     )
     st.divider()
     
-    # Create two columns for the two people
-    col1, col2 = st.columns(2)
+    team = st.multiselect("Team members", options=list_saved_names(), key="matrix_team")
     
-    # Person 1 inputs (Me)
-    with col1:
-        person1_name, person1_strengths = render_person_selector(1, is_me=True)
+    option_col1, option_col2 = st.columns(2)
+    with option_col1:
+        ordered = st.checkbox(
+            "Compare both directions (A → B and B → A)",
+            key="matrix_ordered",
+            help="The communication advice is directional, so ordered pairs give each person their own guidance."
+        )
+    with option_col2:
+        max_workers = st.number_input(
+            "Concurrent comparisons", min_value=1, max_value=16,
+            value=BATCH_MAX_WORKERS, key="matrix_workers"
+        )
     
-    # Person 2 inputs
-    with col2:
-        person2_name, person2_strengths = render_person_selector(2, is_me=False)
+    if len(team) < 2:
+        st.info("Select at least two saved people to build a team matrix.")
+        return
     
-    st.divider()
+    strengths_by_name = {name: get_person_strengths(name) for name in team}
+    state = BatchJobState.load_or_create(team, ordered=ordered, strengths_by_name=strengths_by_name)
+    progress = state.progress()
+    
+    progress_bar = st.progress(
+        (progress[DONE] + progress[FAILED]) / progress["total"],
+        text=f"{progress[DONE]} of {progress['total']} comparisons done"
+    )
+    matrix_placeholder = st.empty()
+    matrix_placeholder.dataframe(build_matrix_frame(team, state), use_container_width=True)
+    
+    if st.button("▶️ Run Team Matrix", type="primary", use_container_width=True,
+                 disabled=progress[DONE] == progress["total"]):
+        finished = progress[DONE]
+        for pair, result, error, elapsed in run_batch(state, strengths_by_name, max_workers=int(max_workers)):
+            if error is None:
+                finished += 1
+            else:
+                st.error(f"❌ {pair[0]} vs {pair[1]}: {error}")
+            progress_bar.progress(
+                finished / progress["total"],
+                text=f"{finished} of {progress['total']} comparisons done"
+            )
+            matrix_placeholder.dataframe(build_matrix_frame(team, state), use_container_width=True)
+    
+    # Detail view for finished pairs
+    finished_jobs = [job for job in state.jobs.values() if job["status"] == DONE]
+    if finished_jobs:
+        st.divider()
+        labels = [f"{job['pair'][0]} ↔ {job['pair'][1]}" if not ordered else f"{job['pair'][0]} → {job['pair'][1]}"
+                  for job in finished_jobs]
+        choice = st.selectbox("View comparison", options=range(len(finished_jobs)),
+                              format_func=lambda i: labels[i], key="matrix_detail")
+        job = finished_jobs[choice]
+        name1, name2 = job["pair"]
+        render_sections(name1, name2, dict(zip(SECTIONS, job["result"])))
+
+
+def queue_prefetch(me_name, partner_name, recent_limit=5):
+    """
+    Queue background comparisons of "Me" against likely partners.
+    
+    Runs when the selected or saved people change: the current partner comes
+    first, then partners recently selected in this session.
+    
+    Args:
+        me_name (str): Person 1's name
+        partner_name (str): Person 2's name
+        recent_limit (int): Number of recent partners remembered
+    """
+    me_strengths = get_person_strengths(me_name) if me_name else None
+    partner_strengths = get_person_strengths(partner_name) if partner_name else None
+    
+    selection = (me_name, tuple(me_strengths or ()), partner_name, tuple(partner_strengths or ()))
+    if st.session_state.get("prefetch_selection") == selection:
+        return
+    st.session_state["prefetch_selection"] = selection
+    
+    recent = st.session_state.setdefault("recent_partners", [])
+    if partner_strengths:
+        if partner_name in recent:
+            recent.remove(partner_name)
+        recent.insert(0, partner_name)
+        del recent[recent_limit:]
+    
+    if not me_strengths:
+        return
+    
+    others = []
+    for name in recent:
+        strengths = partner_strengths if name == partner_name else get_person_strengths(name)
+        if strengths:
+            others.append((name, strengths))
+    prefetch_pairs(me_name, me_strengths, others)
+
+
+def render_admin_panel():
+    """Render the admin-only metrics panel in the sidebar."""
+    with st.sidebar.expander("📈 Metrics (admin)", expanded=False):
+        snapshot = metrics.snapshot()
+        
+        stages = [h for h in snapshot["histograms"] if h["name"] == "stage_duration_seconds"]
+        if stages:
+            st.markdown("**Stage latency**")
+            st.dataframe(pd.DataFrame([
+                {
+                    "stage": " ".join([h["labels"].get("stage", "")] + [
+                        f"{k}={v}" for k, v in h["labels"].items() if k != "stage"
+                    ]),
+                    "count": h["count"],
+                    "mean ms": 1000 * h["sum"] / h["count"] if h["count"] else 0.0,
+                    "p50 ms": 1000 * h["p50"],
+                    "p95 ms": 1000 * h["p95"],
+                }
+                for h in stages
+            ]), hide_index=True, use_container_width=True)
+        
+        api_calls = [h for h in snapshot["histograms"] if h["name"] == "openai_request_duration_seconds"]
+        if api_calls:
+            st.markdown("**OpenAI calls**")
+            st.dataframe(pd.DataFrame([
+                {"model": h["labels"]["model"], "calls": h["count"],
+                 "p50 ms": 1000 * h["p50"], "p95 ms": 1000 * h["p95"]}
+                for h in api_calls
+            ]), hide_index=True, use_container_width=True)
+        
+        totals = {}
+        for counter in snapshot["counters"]:
+            if counter["name"] == "openai_tokens_total":
+                key = f"{counter['labels']['kind']} tokens"
+            elif counter["name"] == "openai_cost_usd_total":
+                key = "estimated cost (USD)"
+            else:
+                continue
+            totals[key] = totals.get(key, 0.0) + counter["value"]
+        if totals:
+            st.markdown("**Usage**")
+            st.json({key: round(value, 4) for key, value in totals.items()})
+        
+        st.markdown("**Caches and scheduling**")
+        comparison_cache = get_comparison_cache()
+        st.json({
+            "comparison_cache": comparison_cache.stats() if comparison_cache else "disabled",
+            "storage_reads_last_rerun": st.session_state.get("storage_read_stats", {}),
+            "storage_reads_total": read_cache_stats(),
+            "scheduler": get_scheduler().stats(),
+            "coalescing": get_comparison_flights().stats(),
+            "prefetch": get_prefetcher().stats() if PREFETCH_ENABLED else "disabled",
+            "routing": get_router().stats(),
+        })
+        
+        st.download_button(
+            "⬇️ Prometheus metrics",
+            data=metrics.render_prometheus(),
+            file_name="metrics.prom",
+            mime="text/plain",
+            use_container_width=True
+        )
+
+
+def render_bulk_io_panel():
+    """Render bulk import and export of saved people in the sidebar."""
+    with st.sidebar.expander("📥 Import / Export People", expanded=False):
+        uploaded = st.file_uploader(
+            "Import a CSV or JSONL file",
+            type=["csv", "jsonl", "ndjson"],
+            key="bulk_import_file",
+            help="CSV columns: name, strength_1 … strength_5. "
+                 'JSONL lines: {"name": "...", "strengths": ["...", ...]}'
+        )
+        if uploaded is not None and st.button("Import", key="bulk_import_button", use_container_width=True):
+            uploaded.seek(0)
+            try:
+                with st.spinner("Importing..."):
+                    report = import_people(
+                        io.TextIOWrapper(uploaded, encoding="utf-8-sig", newline=""),
+                        detect_format(uploaded.name)
+                    )
+            except ValueError as e:
+                # Includes UnicodeDecodeError for files that are not UTF-8
+                st.error(f"❌ Could not import {uploaded.name}: {e}")
+            else:
+                st.success(f"✅ Imported {report.imported} people.")
+                if report.failed:
+                    st.warning(f"⚠️ {report.failed} rows were rejected.")
+                    st.dataframe(
+                        pd.DataFrame(report.errors, columns=["Line", "Error"]),
+                        hide_index=True, use_container_width=True
+                    )
+        
+        export_format = st.radio("Export format", list(EXPORT_FORMATS), horizontal=True, key="bulk_export_format")
+        if st.button("Prepare export", key="bulk_export_button", use_container_width=True):
+            with st.spinner("Exporting..."):
+                st.session_state["bulk_export"] = (export_format, export_people_text(export_format))
+        
+        if "bulk_export" in st.session_state:
+            exported_format, exported_text = st.session_state["bulk_export"]
+            st.download_button(
+                f"⬇️ Download {exported_format.upper()}",
+                data=exported_text,
+                file_name=f"saved_people.{exported_format}",
+                mime="text/csv" if exported_format == "csv" else "application/jsonl",
+                key="bulk_export_download",
+                use_container_width=True
+            )
+
+
+@st.fragment
+def person_selector_fragment(person_number, is_me=False):
+    """
+    Render one person's column as a fragment, so its widgets rerun only this column.
+    
+    The current name and strengths are handed to the results panel through
+    session state (``person{n}_current``). Saving, deleting and choosing a
+    suggested partner change what the other column shows, so those trigger a
+    full rerun.
+    
+    Args:
+        person_number (int): 1 or 2
+        is_me (bool): Whether this is the "Me" person
+    """
+    with metrics.span("person_selector", person=str(person_number)):
+        st.session_state[f"person{person_number}_current"] = render_person_selector(person_number, is_me)
+    
+    # Warm the cache for the comparisons this user is likely to run next
+    person1_name, _ = st.session_state.get("person1_current", ("", []))
+    person2_name, _ = st.session_state.get("person2_current", ("", []))
+    queue_prefetch(person1_name, person2_name)
+
+
+@st.fragment
+def results_fragment():
+    """
+    Render the Compare button and the analysis as a fragment.
+    
+    Reads both people from the session state written by
+    person_selector_fragment, so clicking Compare reruns only this panel.
+    """
+    person1_name, person1_strengths = st.session_state.get("person1_current", ("", []))
+    person2_name, person2_strengths = st.session_state.get("person2_current", ("", []))
+    history = get_session_history(st.session_state)
+    streamed = False
+    
+    # Deep analysis requested from the history panel on the previous run
+    deep_entry = history.peek(st.session_state.pop("deep_request", None))
+    if deep_entry is not None:
+        stream_results(
+            history,
+            deep_entry["person1_name"], deep_entry["person1_strengths"],
+            deep_entry["person2_name"], deep_entry["person2_strengths"],
+            depth="deep"
+        )
+        streamed = True
     
     # Compare button
     compare_button = st.button("🔍 Compare Strengths", type="primary", use_container_width=True)
@@ -283,65 +626,296 @@ def main():
             person1_strengths = [s for s in person1_strengths if s != "Select a strength..."]
             person2_strengths = [s for s in person2_strengths if s != "Select a strength..."]
             
-            # Show comparison summary
-            st.success(f"Comparing {person1_name} and {person2_name}...")
-            
-            with st.expander("📊 Strengths Summary", expanded=True):
-                sum_col1, sum_col2 = st.columns(2)
-                with sum_col1:
-                    st.markdown(f"**{person1_name}'s Strengths:**")
-                    for strength in person1_strengths:
-                        st.markdown(f"- {strength}")
-                with sum_col2:
-                    st.markdown(f"**{person2_name}'s Strengths:**")
-                    for strength in person2_strengths:
-                        st.markdown(f"- {strength}")
+            cache_key = history_key(person1_name, person1_strengths, person2_name, person2_strengths)
+            entry = history.get(cache_key)
+            if entry is not None and not entry.get("degraded"):
+                # Already compared in this session: show it from the history below
+                st.session_state["history_selected"] = cache_key
+            else:
+                stream_results(history, person1_name, person1_strengths, person2_name, person2_strengths)
+                streamed = True
+    
+    render_history_panel(history, show_selected=not streamed)
+
+
+def render_strengths_summary(person1_name, person1_strengths, person2_name, person2_strengths):
+    """
+    Render both strength lists and the locally computed scores.
+    
+    Args:
+        person1_name (str): Name of first person
+        person1_strengths (list): Person 1's 5 strengths
+        person2_name (str): Name of second person
+        person2_strengths (list): Person 2's 5 strengths
+    """
+    with st.expander("📊 Strengths Summary", expanded=True):
+        sum_col1, sum_col2 = st.columns(2)
+        with sum_col1:
+            st.markdown(f"**{person1_name}'s Strengths:**")
+            for strength in person1_strengths:
+                st.markdown(f"- {strength}")
+        with sum_col2:
+            st.markdown(f"**{person2_name}'s Strengths:**")
+            for strength in person2_strengths:
+                st.markdown(f"- {strength}")
+        
+        # Instant, deterministic scores computed locally (no API call)
+        scores = score_pair(person1_strengths, person2_strengths)
+        score_cols = st.columns(4)
+        score_cols[0].metric("Compatibility", f"{scores['overall']:.0%}")
+        score_cols[1].metric("Shared Strengths", f"{scores['overlap']:.0%}")
+        score_cols[2].metric("Complementarity", f"{scores['complementarity']:.0%}")
+        score_cols[3].metric("Domain Coverage", f"{scores['domain_coverage']:.0%}")
+
+
+def render_section_text(text):
+    """
+    Render one section's text, marking an offline fallback.
+    
+    Args:
+        text (str): Section text (a FallbackText if the section missed its deadline)
+    """
+    st.markdown(text)
+    if is_degraded(text):
+        st.warning(
+            "⏱️ The AI analysis for this section did not arrive in time, so this is an "
+            "offline summary of the two profiles. Compare again for the full analysis."
+        )
+
+
+def render_sections(person1_name, person2_name, sections):
+    """
+    Render finished comparison sections.
+    
+    Args:
+        person1_name (str): Name of first person
+        person2_name (str): Name of second person
+        sections (dict): Result text keyed by section name
+    """
+    st.subheader("⚠️ What conflicts might we have?")
+    render_section_text(sections["conflicts"])
+    st.divider()
+    st.subheader("🤝 How can we work well together?")
+    render_section_text(sections["collaboration"])
+    st.divider()
+    st.subheader(f"💬 How should {person1_name} speak to {person2_name}?")
+    render_section_text(sections["communication"])
+
+
+def stream_results(history, person1_name, person1_strengths, person2_name, person2_strengths,
+                   depth="standard"):
+    """
+    Run a comparison, rendering each section as its tokens arrive, and add it to the history.
+    
+    Args:
+        history (ComparisonHistory): This session's history
+        person1_name (str): Name of first person
+        person1_strengths (list): Person 1's 5 strengths
+        person2_name (str): Name of second person
+        person2_strengths (list): Person 2's 5 strengths
+        depth (str): "standard", or "deep" for the longer deep analysis
+    """
+    # Show comparison summary
+    st.success(f"Comparing {person1_name} and {person2_name}...")
+    render_strengths_summary(person1_name, person1_strengths, person2_name, person2_strengths)
+    
+    # Call OpenAI API, rendering each section as its tokens arrive
+    try:
+        st.divider()
+        st.header("🔬 Deep Analysis Results" if depth == "deep" else "📋 Analysis Results")
+        
+        placeholders = {}
+        
+        # Question 1: Conflicts
+        st.subheader("⚠️ What conflicts might we have?")
+        with st.container():
+            placeholders["conflicts"] = st.empty()
+        
+        st.divider()
+        
+        # Question 2: Collaboration
+        st.subheader("🤝 How can we work well together?")
+        with st.container():
+            placeholders["collaboration"] = st.empty()
+        
+        st.divider()
+        
+        # Question 3: Communication
+        st.subheader(f"💬 How should {person1_name} speak to {person2_name}?")
+        with st.container():
+            placeholders["communication"] = st.empty()
+        
+        for section in SECTIONS:
+            placeholders[section].markdown("_🤔 Analyzing strengths profiles with AI..._")
+        
+        texts = {section: "" for section in SECTIONS}
+        with metrics.span("render_results"):
+            for section, delta in stream_comparison(
+                person1_name,
+                person1_strengths,
+                person2_name,
+                person2_strengths,
+                depth=depth
+            ):
+                if is_degraded(delta):
+                    # The section missed its deadline; the fallback replaces any partial text
+                    texts[section] = delta
+                    continue
+                texts[section] += delta
+                placeholders[section].markdown(texts[section] + "▌")
             
-            # Call OpenAI API
-            try:
-                with st.spinner("🤔 Analyzing strengths profiles with AI..."):
-                    conflicts, collaboration, communication = compare_strengths(
-                        person1_name,
-                        person1_strengths,
-                        person2_name,
-                        person2_strengths
-                    )
-                
-                # Display results
-                st.divider()
-                st.header("📋 Analysis Results")
-                
-                # Question 1: Conflicts
-                st.subheader("⚠️ What conflicts might we have?")
-                with st.container():
-                    st.markdown(conflicts)
-                
-                st.divider()
-                
-                # Question 2: Collaboration
-                st.subheader("🤝 How can we work well together?")
-                with st.container():
-                    st.markdown(collaboration)
-                
-                st.divider()
-                
-                # Question 3: Communication
-                st.subheader(f"💬 How should {person1_name} speak to {person2_name}?")
-                with st.container():
-                    st.markdown(communication)
-                
-            except ValueError as e:
-                st.error(f"⚙️ Configuration Error: {str(e)}")
-                st.info(
-                    "💡 **Tip:** Make sure the OPENAI_API_KEY environment variable is set. "
-                    "If running with Docker, use: "
-                    "`docker run -e OPENAI_API_KEY=your_key_here ...`"
-                )
-            except Exception as e:
-                st.error(f"❌ Error: {str(e)}")
-                st.info(
-                    "Please check your internet connection and API key, then try again."
-                )
+            for section in SECTIONS:
+                with placeholders[section].container():
+                    render_section_text(texts[section])
+        
+        history.add(person1_name, person1_strengths, person2_name, person2_strengths, texts, depth=depth)
+        st.session_state["history_selected"] = history_key(
+            person1_name, person1_strengths, person2_name, person2_strengths
+        )
+        
+    except ValueError as e:
+        st.error(f"⚙️ Configuration Error: {str(e)}")
+        st.info(
+            "💡 **Tip:** Make sure the OPENAI_API_KEY environment variable is set. "
+            "If running with Docker, use: "
+            "`docker run -e OPENAI_API_KEY=your_key_here ...`"
+        )
+    except Exception as e:
+        st.error(f"❌ Error: {str(e)}")
+        st.info(
+            "Please check your internet connection and API key, then try again."
+        )
+
+
+def request_deep_analysis(key):
+    """Button callback: stream a deep analysis of a history entry on the next run of results_fragment."""
+    st.session_state["deep_request"] = key
+
+
+def render_history_panel(history, show_selected=True):
+    """
+    Render this session's recent comparisons: a picker, the chosen result and its exports.
+    
+    Switching between entries re-renders from the history without any API call.
+    
+    Args:
+        history (ComparisonHistory): This session's history
+        show_selected (bool): Render the chosen result (False when it was just
+            streamed above)
+    """
+    entries = history.entries()
+    if not entries:
+        return
+    
+    labels = {entry["key"]: entry_label(entry) for entry in entries}
+    if st.session_state.get("history_selected") not in labels:
+        st.session_state["history_selected"] = entries[0]["key"]
+    
+    st.divider()
+    selected = st.selectbox(
+        "🕘 Recent comparisons",
+        options=list(labels),
+        format_func=labels.get,
+        key="history_selected"
+    )
+    entry = history.peek(selected)
+    
+    if show_selected:
+        render_strengths_summary(
+            entry["person1_name"], entry["person1_strengths"],
+            entry["person2_name"], entry["person2_strengths"]
+        )
+        st.divider()
+        st.header("🔬 Deep Analysis Results" if entry.get("depth") == "deep" else "📋 Analysis Results")
+        render_sections(entry["person1_name"], entry["person2_name"], entry["sections"])
+    
+    deep_col, markdown_col, json_col = st.columns(3)
+    with deep_col:
+        if entry.get("depth") != "deep":
+            st.button(
+                "🔬 Deep analysis",
+                on_click=request_deep_analysis,
+                args=(entry["key"],),
+                help="Rerun this comparison with a larger output budget (slower)",
+                key="history_deep",
+                use_container_width=True
+            )
+    with markdown_col:
+        st.download_button(
+            "⬇️ Download as Markdown",
+            data=to_markdown(entry),
+            file_name=export_filename(entry, "md"),
+            mime="text/markdown",
+            key="history_export_md",
+            use_container_width=True
+        )
+    with json_col:
+        st.download_button(
+            "⬇️ Download as JSON",
+            data=to_json(entry),
+            file_name=export_filename(entry, "json"),
+            mime="application/json",
+            key="history_export_json",
+            use_container_width=True
+        )
+
+
+def main():
+    """Main Streamlit application."""
+    
+    # Page configuration
+    st.set_page_config(
+        page_title="CliftonStrengths Comparison",
+        page_icon="💪",
+        layout="wide"
+    )
+    
+    # Serve /metrics if METRICS_PORT is configured (started once per process)
+    maybe_start_metrics_server()
+    page_started = time.perf_counter()
+    
+    # Check password first
+    with metrics.span("password_check"):
+        authenticated = check_password()
+    if not authenticated:
+        st.stop()
+    
+    # Snapshot storage read counters so this rerun's cache effectiveness can be reported
+    storage_stats_before = read_cache_stats()
+    
+    if st.session_state.get("is_admin"):
+        render_admin_panel()
+    
+    render_bulk_io_panel()
+    
+    # Page navigation
+    page = st.sidebar.radio("Page", ["🔍 Compare Two People", "🧮 Team Matrix"], key="page")
+    if page == "🧮 Team Matrix":
+        render_team_matrix_page()
+        return
+    
+    # Title and description
+    st.title("🎯 CliftonStrengths Comparison Tool")
+    st.markdown(
+        "Compare CliftonStrengths profiles between two people to understand "
+        "potential conflicts, collaboration opportunities, and communication strategies."
+    )
+    st.divider()
+    
+    # Each column and the results panel rerun on their own when their widgets change
+    col1, col2 = st.columns(2)
+    
+    # Person 1 inputs (Me)
+    with col1:
+        person_selector_fragment(1, is_me=True)
+    
+    # Person 2 inputs
+    with col2:
+        person_selector_fragment(2, is_me=False)
+    
+    st.divider()
+    
+    results_fragment()
     
     # Footer
     st.divider()
@@ -351,6 +925,14 @@ def main():
         "</div>",
         unsafe_allow_html=True
     )
+    
+    # Record storage reads performed and avoided during this rerun
+    storage_stats_after = read_cache_stats()
+    st.session_state["storage_read_stats"] = {
+        key: storage_stats_after[key] - storage_stats_before[key]
+        for key in storage_stats_after
+    }
+    metrics.observe("stage_duration_seconds", time.perf_counter() - page_started, stage="page_render")
 
 
 if __name__ == "__main__":
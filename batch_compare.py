@@ -0,0 +1,302 @@
+"""
+Batch comparison engine for running all-pairs comparisons across a team.
+
+A batch is the set of pairs for a group of saved people. Every finished job
+is appended as one line to the batch's JSONL state file, so an interrupted
+batch resumes where it stopped instead of starting over. A finished result
+records a digest of both people's strengths and is only reused while those
+strengths are unchanged.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from functools import partial
+from itertools import combinations, permutations
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from fallbacks import is_degraded
+from openai_service import SECTIONS, compare_strengths
+from rate_limiter import PRIORITY_BATCH
+
+
+BATCH_STATE_DIR = os.environ.get("BATCH_STATE_DIR", "batch_jobs")
+BATCH_MAX_WORKERS = int(os.environ.get("BATCH_MAX_WORKERS", "4"))
+
+# Batch comparisons yield to interactive ones in the shared API scheduler
+compare_strengths_batch = partial(compare_strengths, priority=PRIORITY_BATCH)
+
+# Job statuses
+PENDING = "pending"
+DONE = "done"
+FAILED = "failed"
+
+
+def iter_pairs(names: List[str], ordered: bool = False) -> Iterator[Tuple[str, str]]:
+    """
+    Generate the pairs to compare lazily (a large team has millions of pairs).
+
+    Args:
+        names (list): Names of the people in the team
+        ordered (bool): If True, compare both A→B and B→A (the communication
+            section is directional); otherwise each unordered pair once
+
+    Returns:
+        iterator: (person1_name, person2_name) tuples
+    """
+    if ordered:
+        return permutations(names, 2)
+    return combinations(names, 2)
+
+
+def make_pairs(names: List[str], ordered: bool = False) -> List[Tuple[str, str]]:
+    """
+    Build the list of pairs to compare.
+
+    Args:
+        names (list): Names of the people in the team
+        ordered (bool): If True, compare both A→B and B→A (the communication
+            section is directional); otherwise each unordered pair once
+
+    Returns:
+        list: (person1_name, person2_name) tuples
+    """
+    return list(iter_pairs(names, ordered))
+
+
+def make_batch_id(names: List[str], ordered: bool) -> str:
+    """Return a stable identifier for a team and pairing mode."""
+    canonical = json.dumps({"names": sorted(names), "ordered": ordered}, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:16]
+
+
+def _job_key(pair: Tuple[str, str]) -> str:
+    """Encode a pair as a JSON string key (safe for any name)."""
+    return json.dumps(list(pair))
+
+
+def profiles_digest(person1_strengths: List[str], person2_strengths: List[str]) -> str:
+    """Return a short digest of both people's ranked strengths."""
+    canonical = json.dumps([list(person1_strengths), list(person2_strengths)], separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:16]
+
+
+class BatchJobState:
+    """
+    Persisted state of one batch: every pair with its status and result.
+
+    The state file holds one JSON line per job record; later lines for the
+    same pair replace earlier ones. ``save`` rewrites it compactly and
+    ``mark_done`` / ``mark_failed`` append a single line.
+    """
+
+    def __init__(self, names: List[str], ordered: bool = False, state_dir: str = BATCH_STATE_DIR,
+                 strengths_by_name: Optional[Dict[str, List[str]]] = None):
+        self.names = list(names)
+        self.ordered = ordered
+        self.strengths_by_name = dict(strengths_by_name or {})
+        self.batch_id = make_batch_id(self.names, ordered)
+        self.path = os.path.join(state_dir, f"{self.batch_id}.jsonl")
+        self.jobs = {
+            _job_key(pair): {"pair": list(pair), "status": PENDING}
+            for pair in make_pairs(self.names, ordered)
+        }
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load_or_create(cls, names: List[str], ordered: bool = False,
+                       state_dir: str = BATCH_STATE_DIR,
+                       strengths_by_name: Optional[Dict[str, List[str]]] = None) -> "BatchJobState":
+        """
+        Load the saved state for this team, or start a fresh one.
+
+        Args:
+            names (list): Names of the people in the team
+            ordered (bool): Whether pairs are ordered
+            state_dir (str): Directory holding batch state files
+            strengths_by_name (dict): Current strengths of every team member;
+                finished results are only restored for pairs whose strengths
+                still match (none are restored without it)
+
+        Returns:
+            BatchJobState: State with any still-valid finished jobs restored
+        """
+        state = cls(names, ordered, state_dir, strengths_by_name)
+        if os.path.exists(state.path):
+            try:
+                with open(state.path, 'r') as f:
+                    for line in f:
+                        try:
+                            job = json.loads(line)
+                        except ValueError:
+                            # A line cut short by an interrupted write
+                            continue
+                        key = _job_key(job.get("pair", []))
+                        if key not in state.jobs:
+                            continue
+                        if job.get("status") == DONE and job.get("profiles") == state._digest(job["pair"]):
+                            state.jobs[key] = job
+                        else:
+                            state.jobs[key] = {"pair": job["pair"], "status": PENDING}
+            except Exception as e:
+                print(f"Error loading batch state: {e}")
+        return state
+
+    def _digest(self, pair) -> Optional[str]:
+        """Digest of the pair's current strengths, or None if they are not known."""
+        name1, name2 = pair
+        if name1 not in self.strengths_by_name or name2 not in self.strengths_by_name:
+            return None
+        return profiles_digest(self.strengths_by_name[name1], self.strengths_by_name[name2])
+
+    def save(self) -> None:
+        """Rewrite the state file atomically with one line per finished or failed job."""
+        with self._lock:
+            directory = os.path.dirname(os.path.abspath(self.path))
+            os.makedirs(directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(prefix=".batch.", suffix=".tmp", dir=directory)
+            try:
+                with os.fdopen(fd, 'w') as f:
+                    for job in self.jobs.values():
+                        if job["status"] != PENDING:
+                            f.write(json.dumps(job) + "\n")
+                os.replace(tmp_path, self.path)
+            except BaseException:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+
+    def _append(self, job: Dict) -> None:
+        """Append one job record to the state file (caller holds the lock)."""
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        with open(self.path, 'a') as f:
+            f.write(json.dumps(job) + "\n")
+
+    def pending_pairs(self) -> List[Tuple[str, str]]:
+        """Return pairs that still need to run (pending or previously failed)."""
+        with self._lock:
+            return [tuple(job["pair"]) for job in self.jobs.values() if job["status"] != DONE]
+
+    def get(self, pair: Tuple[str, str]) -> Optional[Dict]:
+        """Return the job record for a pair, or None if it is not in this batch."""
+        with self._lock:
+            return self.jobs.get(_job_key(pair))
+
+    def mark_done(self, pair: Tuple[str, str], result: Tuple[str, ...], elapsed: float) -> None:
+        """Record and persist a successful comparison."""
+        with self._lock:
+            job = {
+                "pair": list(pair),
+                "status": DONE,
+                "profiles": self._digest(pair),
+                "result": list(result),
+                "elapsed": round(elapsed, 3),
+            }
+            self.jobs[_job_key(pair)] = job
+            self._append(job)
+
+    def mark_failed(self, pair: Tuple[str, str], error: str, elapsed: float) -> None:
+        """Record and persist a failed comparison."""
+        with self._lock:
+            job = {
+                "pair": list(pair),
+                "status": FAILED,
+                "error": error,
+                "elapsed": round(elapsed, 3),
+            }
+            self.jobs[_job_key(pair)] = job
+            self._append(job)
+
+    def progress(self) -> Dict[str, int]:
+        """
+        Count jobs by status.
+
+        Returns:
+            dict: Counts for "done", "failed", "pending" and "total"
+        """
+        with self._lock:
+            counts = {DONE: 0, FAILED: 0, PENDING: 0}
+            for job in self.jobs.values():
+                counts[job["status"]] += 1
+            counts["total"] = len(self.jobs)
+            return counts
+
+
+def iter_comparisons(pairs, strengths_by_name: Dict[str, List[str]],
+                     max_workers: int = BATCH_MAX_WORKERS,
+                     compare_fn: Callable = compare_strengths_batch) -> Iterator[Tuple]:
+    """
+    Run comparisons on a bounded worker pool, yielding each as it finishes.
+
+    At most ``max_workers`` jobs are in flight and only that many are
+    submitted at a time, so memory stays flat however many pairs there are.
+
+    Args:
+        pairs (iterable): (person1_name, person2_name) tuples
+        strengths_by_name (dict): Strengths for every name in ``pairs``
+        max_workers (int): Concurrency limit
+        compare_fn (callable): Comparison function with the compare_strengths signature
+
+    Yields:
+        tuple: (pair, result, error, elapsed) where exactly one of result/error is set;
+            a result with offline fallback sections is reported as an error so
+            the pair is retried later
+    """
+    def run(pair):
+        started = time.perf_counter()
+        name1, name2 = pair
+        try:
+            result = compare_fn(name1, strengths_by_name[name1], name2, strengths_by_name[name2])
+            missed = [section for section, text in zip(SECTIONS, result) if is_degraded(text)]
+            if missed:
+                return pair, None, f"Deadline exceeded for: {', '.join(missed)}", time.perf_counter() - started
+            return pair, result, None, time.perf_counter() - started
+        except Exception as e:
+            return pair, None, str(e), time.perf_counter() - started
+
+    pairs = iter(pairs)
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="batch-compare") as executor:
+        in_flight = set()
+        for pair in pairs:
+            in_flight.add(executor.submit(run, pair))
+            if len(in_flight) >= max_workers:
+                break
+
+        while in_flight:
+            done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
+                next_pair = next(pairs, None)
+                if next_pair is not None:
+                    in_flight.add(executor.submit(run, next_pair))
+
+
+def run_batch(state: BatchJobState, strengths_by_name: Dict[str, List[str]],
+              max_workers: int = BATCH_MAX_WORKERS,
+              compare_fn: Callable = compare_strengths_batch) -> Iterator[Tuple]:
+    """
+    Run every unfinished job of a batch, appending each result to its state file.
+
+    Args:
+        state (BatchJobState): Batch to run (finished jobs are skipped)
+        strengths_by_name (dict): Strengths for every name in the batch
+        max_workers (int): Concurrency limit
+        compare_fn (callable): Comparison function with the compare_strengths signature
+
+    Yields:
+        tuple: (pair, result, error, elapsed) for each job as it finishes
+    """
+    state.save()
+    for pair, result, error, elapsed in iter_comparisons(
+        state.pending_pairs(), strengths_by_name, max_workers, compare_fn
+    ):
+        if error is None:
+            state.mark_done(pair, result, elapsed)
+        else:
+            state.mark_failed(pair, error, elapsed)
+        yield pair, result, error, elapsed
@@ -0,0 +1,317 @@
+"""
+Command-line batch runner that streams comparison results to JSONL.
+
+Runs many comparisons without the app (for example nightly from cron) and
+writes each result as one JSON line as soon as it finishes. Pairs are read
+lazily and run on the bounded worker pool from batch_compare, so pending
+pairs and results are never held in memory. The strengths of every person
+involved are loaded up front, and with --resume the (person1, person2) keys
+of pairs already finished in the output file are kept in a set so they can
+be skipped; new results are appended.
+
+Pair sources (one of):
+
+- --pairs FILE: CSV with a "person1,person2" header, or JSONL lines like
+  {"person1": "...", "person2": "..."}
+- --team FILE: one name per line; every pair of them is compared
+- --all-saved: every pair of saved people
+
+Strengths come from the saved-people store, or from --people FILE (a file in
+the bulk_io import format).
+
+Command line:
+
+    python batch_runner.py --team team.txt --output results.jsonl --workers 8
+    python batch_runner.py --team team.txt --output results.jsonl --resume
+
+Each output line is {"person1", "person2", "status": "done" | "failed",
+"elapsed", and "conflicts"/"collaboration"/"communication" or "error"}.
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from functools import partial
+from typing import Dict, Iterable, Iterator, List, Set, TextIO, Tuple
+
+import data_storage
+from batch_compare import BATCH_MAX_WORKERS, DONE, FAILED, iter_comparisons, iter_pairs
+from bulk_io import detect_format, iter_rows
+from metrics import Histogram
+from openai_service import COMPARISON_MODES, SECTIONS, compare_strengths
+from rate_limiter import PRIORITY_BATCH
+from strengths import validate_strengths
+
+
+# Geometric latency buckets (1 ms to about 10 minutes, 10% apart) for percentile reporting
+REPORT_BUCKETS = tuple(0.001 * 1.1 ** i for i in range(140))
+
+Pair = Tuple[str, str]
+
+
+class RunReport:
+    """Counters and latency distribution of one run, in constant memory."""
+
+    def __init__(self):
+        self.done = 0
+        self.failed = 0
+        self.skipped = 0
+        self.latency = Histogram(REPORT_BUCKETS)
+        self.max_latency = 0.0
+        self.started = time.perf_counter()
+
+    def record(self, error, elapsed: float) -> None:
+        """Count one finished comparison."""
+        if error is None:
+            self.done += 1
+        else:
+            self.failed += 1
+        self.latency.observe(elapsed)
+        self.max_latency = max(self.max_latency, elapsed)
+
+    def summary(self) -> Dict:
+        """
+        Summarize the run.
+
+        Returns:
+            dict: done, failed, skipped, elapsed seconds, comparisons per
+                second and latency percentiles in milliseconds
+        """
+        elapsed = time.perf_counter() - self.started
+        finished = self.done + self.failed
+        return {
+            "done": self.done,
+            "failed": self.failed,
+            "skipped": self.skipped,
+            "elapsed_s": round(elapsed, 3),
+            "throughput_per_s": round(finished / elapsed, 3) if elapsed > 0 else 0.0,
+            "p50_ms": self._percentile_ms(0.50),
+            "p90_ms": self._percentile_ms(0.90),
+            "p95_ms": self._percentile_ms(0.95),
+            "p99_ms": self._percentile_ms(0.99),
+            "max_ms": round(1000 * self.max_latency, 1),
+        }
+
+    def _percentile_ms(self, q: float) -> float:
+        # Bucket interpolation can overshoot the largest sample
+        return round(1000 * min(self.latency.quantile(q), self.max_latency), 1)
+
+
+def read_pairs(stream: TextIO, file_format: str) -> Iterator[Pair]:
+    """
+    Parse a pairs file lazily.
+
+    Args:
+        stream (TextIO): Text stream to read
+        file_format (str): "csv" (person1,person2 header) or "jsonl"
+
+    Yields:
+        tuple: (person1_name, person2_name)
+
+    Raises:
+        ValueError: If a line cannot be parsed
+    """
+    if file_format == "csv":
+        reader = csv.DictReader(stream)
+        if not {"person1", "person2"} <= set(reader.fieldnames or []):
+            raise ValueError("Pairs CSV needs a person1,person2 header")
+        for row in reader:
+            yield (row["person1"] or "").strip(), (row["person2"] or "").strip()
+        return
+
+    for line_number, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+            yield str(record["person1"]).strip(), str(record["person2"]).strip()
+        except (json.JSONDecodeError, KeyError, TypeError) as e:
+            raise ValueError(f"Line {line_number}: expected {{\"person1\": ..., \"person2\": ...}} ({e})")
+
+
+def read_names(stream: TextIO) -> List[str]:
+    """Read a team file with one name per line, skipping blanks and duplicates."""
+    names = {}
+    for line in stream:
+        name = line.strip()
+        if name:
+            names.setdefault(name, None)
+    return list(names)
+
+
+def load_people_file(path: str) -> Dict[str, List[str]]:
+    """
+    Load strengths from a bulk_io-format CSV or JSONL file; invalid rows are skipped.
+
+    Args:
+        path (str): File to read
+
+    Returns:
+        dict: Names mapped to their 5 strengths
+    """
+    people = {}
+    with open(path, 'r', encoding="utf-8-sig", newline="") as f:
+        for line, name, strengths, error in iter_rows(f, detect_format(path)):
+            if error is None and name and validate_strengths(strengths)[0]:
+                people[name] = strengths
+            else:
+                print(f"Skipping {path} line {line}: {error or 'invalid row'}", file=sys.stderr)
+    return people
+
+
+def read_finished(path: str) -> Set[Pair]:
+    """
+    Collect the pairs already finished in an output file, for --resume.
+
+    A trailing partial line (left by an interrupted run) is cut off so new
+    results start on a fresh line. Failed pairs are not returned, so they are
+    retried.
+
+    Args:
+        path (str): Output file from an earlier run
+
+    Returns:
+        set: (person1_name, person2_name) tuples with status "done"
+    """
+    finished = set()
+    if not os.path.exists(path):
+        return finished
+
+    with open(path, 'rb+') as f:
+        valid_end = 0
+        for line in f:
+            if not line.endswith(b"\n"):
+                break
+            valid_end += len(line)
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if record.get("status") == DONE:
+                finished.add((record.get("person1"), record.get("person2")))
+        f.truncate(valid_end)
+    return finished
+
+
+def run(pairs: Iterable[Pair], strengths_by_name: Dict[str, List[str]], output: TextIO,
+        finished: Set[Pair] = frozenset(), max_workers: int = BATCH_MAX_WORKERS,
+        compare_fn=None, report: RunReport = None) -> RunReport:
+    """
+    Run comparisons and write one JSON line per result as it finishes.
+
+    Args:
+        pairs (iterable): (person1_name, person2_name) tuples, read lazily
+        strengths_by_name (dict): Strengths for the names in ``pairs``
+        output (TextIO): Stream the JSONL results are written to
+        finished (set): Pairs to skip because an earlier run finished them
+        max_workers (int): Concurrency limit
+        compare_fn (callable): Comparison function with the compare_strengths
+            signature (defaults to batch-priority compare_strengths)
+        report (RunReport): Report to update (a new one by default); pass one
+            in to keep the counts if the run is interrupted
+
+    Returns:
+        RunReport: Counts and latency percentiles
+    """
+    report = report or RunReport()
+    compare_fn = compare_fn or partial(compare_strengths, priority=PRIORITY_BATCH)
+
+    def write(pair: Pair, record: Dict) -> None:
+        output.write(json.dumps({"person1": pair[0], "person2": pair[1], **record}) + "\n")
+        output.flush()
+
+    def runnable() -> Iterator[Pair]:
+        for pair in pairs:
+            if pair in finished or pair[0] == pair[1]:
+                report.skipped += 1
+                continue
+            missing = [name for name in pair if name not in strengths_by_name]
+            if missing:
+                report.failed += 1
+                write(pair, {"status": FAILED, "error": f"Unknown person: {', '.join(missing)}", "elapsed": 0.0})
+                continue
+            yield pair
+
+    for pair, result, error, elapsed in iter_comparisons(runnable(), strengths_by_name, max_workers, compare_fn):
+        report.record(error, elapsed)
+        if error is None:
+            write(pair, {"status": DONE, "elapsed": round(elapsed, 3), **dict(zip(SECTIONS, result))})
+        else:
+            write(pair, {"status": FAILED, "error": error, "elapsed": round(elapsed, 3)})
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run comparisons in bulk and stream the results to JSONL.")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--pairs", help="CSV (person1,person2) or JSONL file of pairs to compare")
+    source.add_argument("--team", help="Text file with one name per line; every pair is compared")
+    source.add_argument("--all-saved", action="store_true", help="Compare every pair of saved people")
+    parser.add_argument("--people", help="CSV or JSONL file of people (default: the saved-people store)")
+    parser.add_argument("--ordered", action="store_true",
+                        help="With --team/--all-saved, compare both A→B and B→A")
+    parser.add_argument("--output", required=True, help="JSONL file to write ('-' for stdout)")
+    parser.add_argument("--resume", action="store_true",
+                        help="Skip pairs already done in --output and append to it")
+    parser.add_argument("--workers", type=int, default=BATCH_MAX_WORKERS, help="Comparisons run at once")
+    parser.add_argument("--mode", choices=COMPARISON_MODES, help="Comparison mode (default: COMPARISON_MODE)")
+    args = parser.parse_args()
+
+    if args.resume and args.output == "-":
+        parser.error("--resume needs an output file")
+
+    try:
+        strengths_by_name = load_people_file(args.people) if args.people else data_storage.load_saved_people()
+        if args.pairs:
+            pairs_file = open(args.pairs, 'r', encoding="utf-8-sig", newline="")
+            pairs = read_pairs(pairs_file, detect_format(args.pairs))
+        else:
+            pairs_file = None
+            if args.team:
+                with open(args.team, 'r', encoding="utf-8-sig") as f:
+                    names = read_names(f)
+            else:
+                names = list(strengths_by_name)
+            pairs = iter_pairs(names, args.ordered)
+    except (OSError, ValueError) as e:
+        parser.error(str(e))
+
+    finished = read_finished(args.output) if args.resume else set()
+    compare_fn = partial(compare_strengths, mode=args.mode, priority=PRIORITY_BATCH)
+    report = RunReport()
+    interrupted = False
+
+    try:
+        if args.output == "-":
+            run(pairs, strengths_by_name, sys.stdout, finished, args.workers, compare_fn, report)
+        else:
+            with open(args.output, 'a' if args.resume else 'w', encoding="utf-8") as output:
+                run(pairs, strengths_by_name, output, finished, args.workers, compare_fn, report)
+    except ValueError as e:
+        print(f"Error reading pairs: {e}", file=sys.stderr)
+        sys.exit(2)
+    except KeyboardInterrupt:
+        interrupted = True
+    finally:
+        if pairs_file is not None:
+            pairs_file.close()
+
+    summary = report.summary()
+    print(
+        f"Done {summary['done']}, failed {summary['failed']}, skipped {summary['skipped']} "
+        f"in {summary['elapsed_s']:.1f}s ({summary['throughput_per_s']:.2f} comparisons/s). "
+        f"Latency p50 {summary['p50_ms']:.0f} ms, p90 {summary['p90_ms']:.0f} ms, "
+        f"p95 {summary['p95_ms']:.0f} ms, p99 {summary['p99_ms']:.0f} ms, max {summary['max_ms']:.0f} ms.",
+        file=sys.stderr
+    )
+    if interrupted:
+        print("Interrupted; run again with --resume to continue.", file=sys.stderr)
+        sys.exit(130)
+    sys.exit(1 if summary["failed"] else 0)
+
+
+if __name__ == "__main__":
+    main()
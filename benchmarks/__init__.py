@@ -0,0 +1,3 @@
+"""
+Benchmark and load-test tooling (not shipped in the Docker image).
+"""
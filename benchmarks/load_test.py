@@ -0,0 +1,672 @@
+"""
+Concurrent multi-session load and soak test for the CliftonStrengths app.
+
+Estimates how many simultaneous users one app container can serve. The
+harness starts the app exactly as the Dockerfile does (``streamlit run
+app.py --server.headless=true``, one process) and connects many browser
+sessions to it over Streamlit's websocket protocol. Model calls go to the
+local stub server (benchmarks/stub_server.py), so no API credit is spent.
+Each virtual user opens a fresh session after the last one ends and walks
+the main flow, clicking widgets the way the browser does (including
+fragment reruns):
+
+    login -> fill both person selectors -> save person 1 -> save person 2 -> compare
+
+It reports p50/p95/p99 latency per step and end to end, the session error
+rate, the server's RSS growth, and the integrity of the people store. Each
+virtual user owns two people and saves new strengths for them in every
+session. A save is a lost update if the app, straight after saving, or the
+store at the end of the run returns anything but the strengths that user
+saved last. The data file is corruption-checked on every report tick and
+at the end: the JSON file must parse, or SQLite must pass
+``PRAGMA quick_check``.
+
+    python -m benchmarks.load_test --users 20 --duration 600 --output load_results.json
+
+For a soak run, raise ``--duration`` to hours and watch ``rss_growth_mb_per_hour``.
+To load a running container instead, pass ``--url`` and point the container
+at a stub server (``python -m benchmarks.stub_server``); RSS and store checks
+are then skipped unless ``--pid`` and ``--data-file`` are given.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import socket
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from datetime import datetime, timezone
+
+from benchmarks.run_benchmarks import REPO_ROOT, git_commit, percentile
+from benchmarks.stub_server import StubConfig, start_stub_server
+
+
+APP_PASSWORD = "strengths2024"
+COMPARE_LABEL = "🔍 Compare Strengths"
+
+# Steps of one session, in order
+STEPS = ("login", "select", "save_person1", "save_person2", "compare")
+
+
+def process_rss_mb(pid):
+    """Return the resident set size of a process in MB, or None if it cannot be read."""
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    try:
+        # No /proc (macOS): ps reports RSS in KB
+        return int(subprocess.check_output(["ps", "-o", "rss=", "-p", str(pid)], text=True)) / 1024
+    except (OSError, ValueError, subprocess.CalledProcessError):
+        return None
+
+
+def latency_stats(samples):
+    """Summarize durations in seconds as milliseconds, with the tail percentiles."""
+    return {
+        "count": len(samples),
+        "p50_ms": round(1000 * percentile(samples, 50), 3),
+        "p95_ms": round(1000 * percentile(samples, 95), 3),
+        "p99_ms": round(1000 * percentile(samples, 99), 3),
+        "max_ms": round(1000 * max(samples), 3) if samples else 0.0,
+    }
+
+
+class SessionFailed(Exception):
+    """Raised when a step of a session did not reach its expected state."""
+
+    def __init__(self, step, message):
+        super().__init__(f"{step}: {message}")
+        self.step = step
+
+
+class BrowserSession:
+    """
+    One browser tab speaking Streamlit's websocket protocol.
+
+    Keeps what the frontend keeps: the rendered elements (pruned after each
+    run, per fragment for fragment runs) and the widget values to send back
+    on every rerun. Widgets are found by their ``key`` (the suffix of the
+    widget id) or, for keyless ones, by label.
+    """
+
+    def __init__(self, url, timeout):
+        self.url = url.rstrip("/")
+        self.timeout = timeout
+        self._ws = None
+        self._run_id = ""
+        self._page_hash = ""
+        # delta path -> (element, fragment id, script run id)
+        self._elements = {}
+        # widget id -> WidgetState the browser sends back
+        self._values = {}
+        # Elements received during the last run, in order
+        self.last_run = []
+
+    async def open(self):
+        from websockets.asyncio.client import connect
+
+        ws_url = "ws" + self.url[len("http"):] + "/_stcore/stream"
+        self._ws = await connect(ws_url, subprotocols=["streamlit"], max_size=None, open_timeout=self.timeout)
+
+    async def close(self):
+        if self._ws is not None:
+            await self._ws.close()
+
+    def _widgets(self, kind):
+        for element, fragment_id, _ in self._elements.values():
+            if element.WhichOneof("type") == kind:
+                yield getattr(element, kind), fragment_id
+
+    def widget(self, kind, key=None, label=None):
+        """Return (proto, fragment id) of a rendered widget, by key or by label."""
+        for proto, fragment_id in self._widgets(kind):
+            if key is not None and proto.id.endswith(f"-{key}"):
+                return proto, fragment_id
+            if label is not None and proto.label == label:
+                return proto, fragment_id
+        raise KeyError(f"No {kind} widget {key or label!r} on the page")
+
+    def value(self, kind, key):
+        """Return the value the browser shows in a text input or selectbox."""
+        proto, _ = self.widget(kind, key=key)
+        state = self._values.get(proto.id)
+        if state is not None:
+            return state.string_value
+        if kind == "selectbox":
+            return proto.options[proto.default] if proto.HasField("default") else None
+        return proto.default
+
+    def set_value(self, kind, key, value):
+        """Change a text input or selectbox; like the browser, this takes effect on the next rerun."""
+        from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+        proto, _ = self.widget(kind, key=key)
+        self._values[proto.id] = WidgetState(id=proto.id, string_value=value)
+
+    async def click(self, key=None, label=None):
+        """Click a button and wait for the run it starts (a fragment run inside a fragment)."""
+        from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+        proto, fragment_id = self.widget("button", key=key, label=label)
+        await self.rerun(trigger=WidgetState(id=proto.id, trigger_value=True), fragment_id=fragment_id)
+
+    async def rerun(self, trigger=None, fragment_id=""):
+        """Send the current widget values and wait until the script has finished."""
+        from streamlit.proto.BackMsg_pb2 import BackMsg
+
+        msg = BackMsg()
+        state = msg.rerun_script
+        state.page_script_hash = self._page_hash
+        state.fragment_id = fragment_id
+        state.widget_states.widgets.extend(self._values.values())
+        if trigger is not None:
+            state.widget_states.widgets.append(trigger)
+        await self._ws.send(msg.SerializeToString())
+        await asyncio.wait_for(self._receive_run(), self.timeout)
+
+    async def _receive_run(self):
+        from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+        self.last_run = []
+        fragment_ids = []
+        while True:
+            msg = ForwardMsg()
+            msg.ParseFromString(await self._ws.recv())
+            kind = msg.WhichOneof("type")
+            if kind == "new_session":
+                self._run_id = msg.new_session.script_run_id
+                self._page_hash = msg.new_session.page_script_hash
+                fragment_ids = list(msg.new_session.fragment_ids_this_run)
+                self.last_run = []
+            elif kind == "delta" and msg.delta.WhichOneof("type") == "new_element":
+                element = msg.delta.new_element
+                path = tuple(msg.metadata.delta_path)
+                self._elements[path] = (element, msg.delta.fragment_id, self._run_id)
+                self.last_run.append(element)
+                self._track_widget(element)
+            elif kind == "script_finished":
+                status = ForwardMsg.ScriptFinishedStatus.Name(msg.script_finished)
+                if status == "FINISHED_EARLY_FOR_RERUN":
+                    # st.rerun(): the server starts the next run by itself
+                    continue
+                self._prune(fragment_ids)
+                if status == "FINISHED_WITH_COMPILE_ERROR":
+                    raise RuntimeError("App failed to compile")
+                return
+
+    def _track_widget(self, element):
+        """Adopt values the app set through session state, as the browser does."""
+        from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+        kind = element.WhichOneof("type")
+        if kind not in ("text_input", "selectbox"):
+            return
+        proto = getattr(element, kind)
+        if not proto.set_value:
+            return
+        value = proto.value if kind == "text_input" else proto.raw_value
+        self._values[proto.id] = WidgetState(id=proto.id, string_value=value)
+
+    def _prune(self, fragment_ids):
+        """Drop elements the last run did not redraw, and the values of widgets that went with them."""
+        self._elements = {
+            path: entry for path, entry in self._elements.items()
+            if entry[2] == self._run_id or (fragment_ids and entry[1] not in fragment_ids)
+        }
+        shown = set()
+        for element, _, _ in self._elements.values():
+            proto = getattr(element, element.WhichOneof("type"))
+            widget_id = getattr(proto, "id", None)
+            if isinstance(widget_id, str):
+                shown.add(widget_id)
+        self._values = {widget_id: state for widget_id, state in self._values.items() if widget_id in shown}
+
+    def problems(self):
+        """Return the exceptions and st.error messages shown by the last run."""
+        from streamlit.proto.Alert_pb2 import Alert
+
+        messages = []
+        for element in self.last_run:
+            kind = element.WhichOneof("type")
+            if kind == "exception":
+                messages.append(f"{element.exception.type}: {element.exception.message}")
+            elif kind == "alert" and element.alert.format == Alert.ERROR:
+                messages.append(element.alert.body)
+        return messages
+
+    def alerts(self, alert_format):
+        """Return the bodies of the alerts of one format shown by the last run."""
+        return [
+            element.alert.body for element in self.last_run
+            if element.WhichOneof("type") == "alert" and element.alert.format == alert_format
+        ]
+
+    def headings(self):
+        """Return the headings shown by the last run."""
+        return [element.heading.body for element in self.last_run if element.WhichOneof("type") == "heading"]
+
+
+class LoadStats:
+    """Tallies shared by every virtual user (all run on one event loop)."""
+
+    def __init__(self):
+        self.steps = {step: [] for step in STEPS}
+        self.sessions = []
+        self.failures = {}
+        self.errors = []
+        self.degraded_sessions = 0
+        self.active_users = 0
+        # Last strengths each person was saved with, by the user that owns them
+        self.expected = {}
+        self.lost_updates = 0
+
+    @property
+    def failed(self):
+        return sum(self.failures.values())
+
+    def record_failure(self, error):
+        step = getattr(error, "step", "exception")
+        self.failures[step] = self.failures.get(step, 0) + 1
+        # Keep a sample of messages, not every one from a long soak
+        if len(self.errors) < 50:
+            self.errors.append(f"{type(error).__name__}: {error}")
+
+    def record_save(self, name, strengths, read_back):
+        self.expected[name] = list(strengths)
+        if read_back != list(strengths):
+            self.lost_updates += 1
+
+
+def check_store(backend, path, expected):
+    """
+    Check the people store on disk, independently of the app's own connection.
+
+    Args:
+        backend (str): "json" or "sqlite"
+        path (str): Data file of the store
+        expected (dict): Last strengths saved per person (None skips the comparison)
+
+    Returns:
+        dict: saved_people, corrupt (bool) and lost_updates (people whose
+            stored strengths differ from the last save)
+    """
+    import data_storage
+
+    try:
+        if backend == "json":
+            with open(path, "r") as f:
+                stored = json.load(f)
+        else:
+            conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True, timeout=30)
+            try:
+                if conn.execute("PRAGMA quick_check").fetchone()[0] != "ok":
+                    raise sqlite3.DatabaseError("quick_check failed")
+                rows = conn.execute("SELECT name, strengths FROM people").fetchall()
+            finally:
+                conn.close()
+            stored = {name: list(data_storage._decode_profile(value)) for name, value in rows}
+    except FileNotFoundError:
+        stored = {}
+    except (OSError, ValueError, sqlite3.Error):
+        return {"saved_people": 0, "corrupt": True, "lost_updates": 0}
+
+    lost = sum(1 for name, strengths in (expected or {}).items() if stored.get(name) != strengths)
+    return {"saved_people": len(stored), "corrupt": False, "lost_updates": lost}
+
+
+async def run_session(url, user, rng, stats, timeout):
+    """
+    Walk one fresh browser session through login, selection, both saves and Compare.
+
+    Args:
+        url (str): Base URL of the app
+        user (int): Virtual user number (it owns the people it saves)
+        rng (random.Random): The user's random source
+        stats (LoadStats): Shared tallies
+        timeout (float): Seconds each run may take
+
+    Returns:
+        bool: True if the comparison shown contained offline fallback sections
+
+    Raises:
+        SessionFailed: If a step did not reach its expected state
+    """
+    from streamlit.proto.Alert_pb2 import Alert
+
+    from strengths import CLIFTON_STRENGTHS
+
+    session = BrowserSession(url, timeout)
+    people = {
+        number: (f"Load User {user:04d}-{number}", rng.sample(CLIFTON_STRENGTHS, 5))
+        for number in (1, 2)
+    }
+
+    async def step(name, action):
+        started = time.perf_counter()
+        try:
+            await action()
+        except (KeyError, RuntimeError, asyncio.TimeoutError) as e:
+            raise SessionFailed(name, str(e) or type(e).__name__)
+        stats.steps[name].append(time.perf_counter() - started)
+        problems = session.problems()
+        if problems:
+            raise SessionFailed(name, problems[0])
+
+    async def login():
+        await session.open()
+        await session.rerun()
+        session.set_value("text_input", "password_input", APP_PASSWORD)
+        await session.rerun()
+        session.widget("selectbox", key="person1_selection")
+
+    async def select():
+        for number, (name, strengths) in people.items():
+            session.set_value("text_input", f"person{number}_name_input", name)
+            for i, strength in enumerate(strengths):
+                session.set_value("selectbox", f"person{number}_strength_{i}", strength)
+        await session.rerun()
+
+    try:
+        await step("login", login)
+        await step("select", select)
+
+        for number, (name, strengths) in people.items():
+            await step(f"save_person{number}", lambda: session.click(key=f"save_person{number}"))
+            if session.value("selectbox", f"person{number}_selection") != name:
+                raise SessionFailed(f"save_person{number}", f"{name} was not selected after saving")
+            # The selector reloads the saved person from the store after the save
+            read_back = [session.value("selectbox", f"person{number}_strength_{i}") for i in range(5)]
+            stats.record_save(name, strengths, read_back)
+
+        await step("compare", lambda: session.click(label=COMPARE_LABEL))
+        if not any("What conflicts" in heading for heading in session.headings()):
+            raise SessionFailed("compare", "no comparison was shown")
+        return bool(session.alerts(Alert.WARNING))
+    finally:
+        await session.close()
+
+
+async def virtual_user(url, user, seed, stats, start_at, stop_at, timeout, think_time):
+    """Run sessions back to back for one virtual user from start_at until stop_at."""
+    rng = random.Random(seed * 100_003 + user)
+    loop = asyncio.get_running_loop()
+    await asyncio.sleep(max(0.0, start_at - loop.time()))
+    stats.active_users += 1
+    try:
+        while loop.time() < stop_at:
+            started = time.perf_counter()
+            try:
+                degraded = await run_session(url, user, rng, stats, timeout)
+            except Exception as e:
+                stats.record_failure(e)
+            else:
+                stats.sessions.append(time.perf_counter() - started)
+                stats.degraded_sessions += degraded
+            if think_time:
+                await asyncio.sleep(rng.uniform(0, 2 * think_time))
+    finally:
+        stats.active_users -= 1
+
+
+async def drive(args, url, stats, pid, store_path):
+    """Start the virtual users, print a progress line per report interval, and sample RSS."""
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    stop_at = started + args.ramp_up + args.duration
+    users = [
+        asyncio.ensure_future(virtual_user(
+            url, user, args.seed, stats,
+            started + args.ramp_up * user / args.users, stop_at, args.rerun_timeout, args.think_time
+        ))
+        for user in range(args.users)
+    ]
+
+    rss = {"max": None}
+    timeline = []
+    corrupt_checks = 0
+    next_report = started + args.report_interval
+    while not all(task.done() for task in users):
+        await asyncio.sleep(0.5)
+        current = process_rss_mb(pid) if pid else None
+        if current is not None:
+            rss["max"] = max(rss["max"] or current, current)
+
+        now = loop.time()
+        if now < next_report:
+            continue
+        next_report += args.report_interval
+        point = {
+            "elapsed_s": round(now - started, 1),
+            "active_users": stats.active_users,
+            "sessions": len(stats.sessions) + stats.failed,
+            "failed": stats.failed,
+            "p95_ms": round(1000 * percentile(stats.sessions[-200:], 95), 3),
+            "rss_mb": round(current, 1) if current is not None else None,
+        }
+        if store_path:
+            # Saves still in flight may differ from what is expected; lost updates are counted at the end
+            integrity = await loop.run_in_executor(None, check_store, args.backend, store_path, None)
+            corrupt_checks += integrity["corrupt"]
+            point.update(saved_people=integrity["saved_people"], corrupt=integrity["corrupt"])
+        timeline.append(point)
+        print(
+            f"[{point['elapsed_s']:>7.1f}s] users={point['active_users']:<4} "
+            f"sessions={point['sessions']:<6} failed={point['failed']:<4} "
+            f"p95={point['p95_ms']:>9.1f}ms rss={point['rss_mb']}MB "
+            f"people={point.get('saved_people')} corrupt={point.get('corrupt')}",
+            flush=True
+        )
+
+    for task in users:
+        task.result()
+    return timeline, corrupt_checks, rss["max"], loop.time() - started
+
+
+def free_port():
+    """Return a TCP port that is free on localhost."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_app(workdir, base_url, backend, log_file):
+    """
+    Start the app the way the Dockerfile does, in its own process.
+
+    Returns:
+        tuple: (process, app URL)
+    """
+    port = free_port()
+    env = dict(
+        os.environ,
+        OPENAI_BASE_URL=base_url,
+        OPENAI_API_KEY="sk-load-test",
+        PEOPLE_STORE_BACKEND=backend,
+        PEOPLE_DB_FILE=os.path.join(workdir, "saved_people.db"),
+        COMPARISON_CACHE_FILE=os.path.join(workdir, "comparison_cache.db"),
+        BATCH_STATE_DIR=os.path.join(workdir, "batch_jobs"),
+    )
+    env.setdefault("OPENAI_RPM_LIMIT", "1000000")
+    env.setdefault("OPENAI_TPM_LIMIT", "1000000000")
+    process = subprocess.Popen(
+        [
+            sys.executable, "-m", "streamlit", "run", os.path.join(REPO_ROOT, "app.py"),
+            "--server.headless=true", f"--server.port={port}", "--server.address=127.0.0.1",
+            "--server.fileWatcherType=none", "--browser.gatherUsageStats=false",
+        ],
+        # Relative data files (saved_people.json) land in the work directory
+        cwd=workdir, env=env, stdout=log_file, stderr=subprocess.STDOUT
+    )
+    url = f"http://127.0.0.1:{port}"
+    wait_for_health(url, process)
+    return process, url
+
+
+def wait_for_health(url, process=None, timeout=60.0):
+    """Wait until the app answers its health check."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process is not None and process.poll() is not None:
+            raise RuntimeError(f"App exited with status {process.returncode} before becoming healthy")
+        try:
+            with urllib.request.urlopen(f"{url}/_stcore/health", timeout=2) as response:
+                if response.status == 200:
+                    return
+        except OSError:
+            pass
+        time.sleep(0.5)
+    raise RuntimeError(f"App at {url} did not become healthy within {timeout:.0f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load and soak test the CliftonStrengths app with concurrent sessions.")
+    parser.add_argument("--users", type=int, default=10, help="Concurrent virtual users")
+    parser.add_argument("--duration", type=float, default=60.0, help="Seconds to keep starting sessions after ramp-up")
+    parser.add_argument("--ramp-up", type=float, default=10.0, help="Seconds over which users are started")
+    parser.add_argument("--think-time", type=float, default=0.0, help="Mean pause between a user's sessions (s)")
+    parser.add_argument("--backend", choices=("sqlite", "json"), default="sqlite", help="People store backend")
+    parser.add_argument("--report-interval", type=float, default=10.0, help="Seconds between progress lines")
+    parser.add_argument("--rerun-timeout", type=float, default=120.0, help="Seconds one script run may take")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed for the users' profiles")
+    parser.add_argument("--url", help="Load an already running app instead of starting one")
+    parser.add_argument("--pid", type=int, help="With --url: process to sample RSS from")
+    parser.add_argument("--data-file", help="With --url: people store file to check")
+    parser.add_argument("--latency", type=float, default=0.3, help="Stub latency before first token (s)")
+    parser.add_argument("--tokens-per-second", type=float, default=200.0, help="Stub token rate")
+    parser.add_argument("--completion-tokens", type=int, default=200, help="Stub completion length")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Stub injected error rate")
+    parser.add_argument("--output", default="load_results.json", help="Where to write the JSON results")
+    args = parser.parse_args()
+
+    try:
+        import websockets  # noqa: F401
+    except ImportError:
+        parser.error("the load test needs the websockets package (pip install websockets)")
+    if REPO_ROOT not in sys.path:
+        sys.path.insert(0, REPO_ROOT)
+
+    config = StubConfig(
+        latency=args.latency,
+        tokens_per_second=args.tokens_per_second,
+        completion_tokens=args.completion_tokens,
+        error_rate=args.error_rate,
+        seed=args.seed,
+    )
+    server, base_url = start_stub_server(config=config)
+
+    workdir = tempfile.mkdtemp(prefix="strengths-load-")
+    process = None
+    log_path = os.path.join(workdir, "app.log")
+    stats = LoadStats()
+    try:
+        with open(log_path, "w") as log_file:
+            if args.url:
+                url, pid, store_path = args.url, args.pid, args.data_file
+                wait_for_health(url)
+            else:
+                process, url = start_app(workdir, base_url, args.backend, log_file)
+                pid = process.pid
+                store_path = os.path.join(
+                    workdir, "saved_people.db" if args.backend == "sqlite" else "saved_people.json"
+                )
+
+            # One session up front imports the app modules, so the run measures steady state
+            asyncio.run(run_session(url, -1, random.Random(args.seed), LoadStats(), args.rerun_timeout))
+            rss_start = process_rss_mb(pid) if pid else None
+            timeline, corrupt_checks, rss_max, elapsed = asyncio.run(drive(args, url, stats, pid, store_path))
+            rss_end = process_rss_mb(pid) if pid else None
+            integrity = check_store(args.backend, store_path, stats.expected) if store_path else {}
+            corrupt_checks += integrity.get("corrupt", False)
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait(timeout=30)
+        server.shutdown()
+
+    total = len(stats.sessions) + stats.failed
+    hours = elapsed / 3600
+    rss_growth = rss_end - rss_start if rss_start is not None and rss_end is not None else None
+
+    summary = {
+        "sessions": total,
+        "failed_sessions": stats.failed,
+        "error_rate": round(stats.failed / total, 4) if total else 0.0,
+        "failures_by_step": dict(stats.failures),
+        "degraded_sessions": stats.degraded_sessions,
+        "sessions_per_second": round(total / elapsed, 3) if elapsed else 0.0,
+        "end_to_end": latency_stats(stats.sessions),
+        "steps": {step: latency_stats(samples) for step, samples in stats.steps.items()},
+        "rss_start_mb": round(rss_start, 1) if rss_start is not None else None,
+        "rss_end_mb": round(rss_end, 1) if rss_end is not None else None,
+        "rss_max_mb": round(rss_max, 1) if rss_max is not None else None,
+        "rss_growth_mb": round(rss_growth, 1) if rss_growth is not None else None,
+        "rss_growth_mb_per_hour": round(rss_growth / hours, 1) if rss_growth is not None and hours else None,
+        "saved_people": integrity.get("saved_people"),
+        "corrupt_checks": corrupt_checks,
+        "lost_updates_read_back": stats.lost_updates,
+        "lost_updates_final": integrity.get("lost_updates"),
+        "error_samples": stats.errors,
+    }
+
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "url": args.url,
+            "users": args.users,
+            "duration_s": args.duration,
+            "ramp_up_s": args.ramp_up,
+            "think_time_s": args.think_time,
+            "backend": args.backend,
+            "elapsed_s": round(elapsed, 1),
+            "app_log": None if args.url else log_path,
+            "stub": {
+                "latency": args.latency,
+                "tokens_per_second": args.tokens_per_second,
+                "completion_tokens": args.completion_tokens,
+                "error_rate": args.error_rate,
+                "requests": config.requests,
+                "errors": config.errors,
+            },
+        },
+        "summary": summary,
+        "timeline": timeline,
+    }
+
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+
+    print()
+    print(f"{'step':<14} {'count':>7} {'p50':>12} {'p95':>12} {'p99':>12}")
+    for name, result in [("end_to_end", summary["end_to_end"])] + list(summary["steps"].items()):
+        print(f"{name:<14} {result['count']:>7} {result['p50_ms']:>10.1f}ms {result['p95_ms']:>10.1f}ms {result['p99_ms']:>10.1f}ms")
+    print(
+        f"\nsessions={total} error_rate={summary['error_rate']:.2%} "
+        f"degraded={summary['degraded_sessions']} throughput={summary['sessions_per_second']}/s"
+    )
+    print(
+        f"rss start={summary['rss_start_mb']}MB end={summary['rss_end_mb']}MB max={summary['rss_max_mb']}MB "
+        f"growth={summary['rss_growth_mb_per_hour']}MB/h"
+    )
+    print(
+        f"store people={summary['saved_people']} corrupt_checks={corrupt_checks} "
+        f"lost_updates read_back={stats.lost_updates} final={summary['lost_updates_final']}"
+    )
+    print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,278 @@
+"""
+Benchmark suite for the CliftonStrengths comparison app.
+
+Measures, against a local stub OpenAI server (no API credit spent):
+
+- compare_strengths in each comparison mode, and time-to-first-token of
+  stream_comparison
+- data_storage operations for each backend at several saved-people counts
+- full app.main rerun cost via Streamlit's AppTest
+
+Results are written as JSON so runs can be compared across commits:
+
+    python -m benchmarks.run_benchmarks --output bench_results.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+from benchmarks.stub_server import StubConfig, start_stub_server
+
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def percentile(values, pct):
+    """Return the pct-th percentile (0-100) of values using linear interpolation."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * pct / 100.0
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def summarize(samples):
+    """Summarize a list of durations in seconds as milliseconds."""
+    return {
+        "count": len(samples),
+        "mean_ms": round(1000 * sum(samples) / len(samples), 3) if samples else 0.0,
+        "p50_ms": round(1000 * percentile(samples, 50), 3),
+        "p95_ms": round(1000 * percentile(samples, 95), 3),
+        "max_ms": round(1000 * max(samples), 3) if samples else 0.0,
+    }
+
+
+def timed(fn, iterations):
+    """Run fn ``iterations`` times and return the durations in seconds."""
+    samples = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+def random_profiles(count, seed=0):
+    """Generate ``count`` named profiles with 5 distinct random strengths each."""
+    from strengths import CLIFTON_STRENGTHS
+
+    rng = random.Random(seed)
+    return {f"Person {i:06d}": rng.sample(CLIFTON_STRENGTHS, 5) for i in range(count)}
+
+
+def bench_compare(iterations):
+    """Benchmark compare_strengths per mode and streaming time-to-first-token."""
+    import openai_service
+
+    profiles = list(random_profiles(2, seed=1).items())
+    (name1, strengths1), (name2, strengths2) = profiles
+    results = []
+
+    for mode in openai_service.COMPARISON_MODES:
+        samples = timed(
+            lambda: openai_service.compare_strengths(
+                name1, strengths1, name2, strengths2, mode=mode, use_cache=False
+            ),
+            iterations
+        )
+        results.append({"name": "compare_strengths", "params": {"mode": mode}, "stats": summarize(samples)})
+
+    first_token, total = [], []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        first = None
+        for _section, _delta in openai_service.stream_comparison(
+            name1, strengths1, name2, strengths2, use_cache=False
+        ):
+            if first is None:
+                first = time.perf_counter() - started
+        first_token.append(first)
+        total.append(time.perf_counter() - started)
+    results.append({"name": "stream_comparison.first_token", "params": {}, "stats": summarize(first_token)})
+    results.append({"name": "stream_comparison.total", "params": {}, "stats": summarize(total)})
+
+    return results
+
+
+def _make_store(backend, workdir, size):
+    """Create a fresh store of the given backend in workdir."""
+    import data_storage
+
+    json_path = os.path.join(workdir, f"people_{backend}_{size}.json")
+    if backend == "sqlite":
+        return data_storage.SqlitePeopleStore(os.path.join(workdir, f"people_{size}.db"), json_path)
+    return data_storage.JsonPeopleStore(json_path)
+
+
+def bench_storage(sizes, backends, iterations, workdir):
+    """Benchmark data_storage operations for each backend and size."""
+    import data_storage
+
+    results = []
+    for backend in backends:
+        for size in sizes:
+            store = _make_store(backend, workdir, size)
+            people = random_profiles(size)
+            store.upsert_many(people)
+            data_storage.set_store(store)
+
+            names = list(people)
+            sample_strengths = people[names[0]]
+            # Rewriting a large JSON file is slow; keep write iterations proportionate
+            write_iterations = max(1, min(iterations, 200_000 // max(size, 1)))
+            counter = iter(range(10 ** 9))
+
+            operations = {
+                "load_saved_people.cold": (
+                    lambda: (data_storage.get_read_cache().invalidate(), data_storage.load_saved_people()),
+                    min(iterations, write_iterations)
+                ),
+                "load_saved_people.warm": (data_storage.load_saved_people, iterations),
+                "get_person_strengths": (
+                    lambda: data_storage.get_person_strengths(random.choice(names)), iterations
+                ),
+                "save_person": (
+                    lambda: data_storage.save_person(f"Bench {next(counter)}", sample_strengths),
+                    write_iterations
+                ),
+                "delete_person": (
+                    lambda: data_storage.delete_person(names.pop()), write_iterations
+                ),
+            }
+            for name, (fn, count) in operations.items():
+                results.append({
+                    "name": f"data_storage.{name}",
+                    "params": {"backend": backend, "saved_people": size},
+                    "stats": summarize(timed(fn, count)),
+                })
+    return results
+
+
+def bench_app_reruns(sizes, reruns, workdir):
+    """Benchmark a full app.main rerun with AppTest after logging in."""
+    import data_storage
+    from streamlit.testing.v1 import AppTest
+
+    results = []
+    for size in sizes:
+        store = _make_store("sqlite", workdir, f"app_{size}")
+        store.upsert_many(random_profiles(size))
+        data_storage.set_store(store)
+
+        app = AppTest.from_file(os.path.join(REPO_ROOT, "app.py"), default_timeout=120)
+        app.run()
+        app.text_input(key="password_input").input("strengths2024").run()
+        if app.exception:
+            raise RuntimeError(f"App raised during benchmark: {app.exception}")
+
+        samples = timed(app.run, reruns)
+        results.append({
+            "name": "app.main.rerun",
+            "params": {"saved_people": size},
+            "stats": summarize(samples),
+        })
+    return results
+
+
+def git_commit():
+    """Return the current git commit hash, or None outside a git checkout."""
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "HEAD"], cwd=REPO_ROOT, stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except Exception:
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the CliftonStrengths comparison app.")
+    parser.add_argument("--iterations", type=int, default=10, help="Iterations per measurement")
+    parser.add_argument("--sizes", default="10,1000,100000", help="Comma-separated saved-people counts")
+    parser.add_argument("--backends", default="sqlite,json", help="Comma-separated storage backends")
+    parser.add_argument("--app-sizes", default="10,1000", help="Saved-people counts for app rerun benchmarks")
+    parser.add_argument("--reruns", type=int, default=10, help="App reruns per measurement")
+    parser.add_argument("--latency", type=float, default=0.3, help="Stub latency before first token (s)")
+    parser.add_argument("--tokens-per-second", type=float, default=200.0, help="Stub token rate")
+    parser.add_argument("--completion-tokens", type=int, default=200, help="Stub completion length")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Stub injected error rate")
+    parser.add_argument("--skip", default="", help="Comma-separated groups to skip: compare,storage,app")
+    parser.add_argument("--output", default="bench_results.json", help="Where to write the JSON results")
+    args = parser.parse_args()
+
+    config = StubConfig(
+        latency=args.latency,
+        tokens_per_second=args.tokens_per_second,
+        completion_tokens=args.completion_tokens,
+        error_rate=args.error_rate,
+        seed=0,
+    )
+    server, base_url = start_stub_server(config=config)
+
+    # Configure the app modules before they are imported
+    workdir = tempfile.mkdtemp(prefix="strengths-bench-")
+    os.environ["OPENAI_BASE_URL"] = base_url
+    os.environ["OPENAI_API_KEY"] = "sk-benchmark"
+    os.environ.setdefault("OPENAI_RPM_LIMIT", "1000000")
+    os.environ.setdefault("OPENAI_TPM_LIMIT", "1000000000")
+    os.environ["PEOPLE_DB_FILE"] = os.path.join(workdir, "saved_people.db")
+    os.environ["COMPARISON_CACHE_FILE"] = os.path.join(workdir, "comparison_cache.db")
+    os.environ["FRAGMENT_CACHE_FILE"] = os.path.join(workdir, "insight_fragments.db")
+    os.environ["BATCH_STATE_DIR"] = os.path.join(workdir, "batch_jobs")
+    if REPO_ROOT not in sys.path:
+        sys.path.insert(0, REPO_ROOT)
+
+    skip = {group.strip() for group in args.skip.split(",") if group.strip()}
+    results = []
+    try:
+        if "compare" not in skip:
+            results += bench_compare(args.iterations)
+        if "storage" not in skip:
+            sizes = [int(size) for size in args.sizes.split(",")]
+            backends = [backend.strip() for backend in args.backends.split(",")]
+            results += bench_storage(sizes, backends, args.iterations, workdir)
+        if "app" not in skip:
+            app_sizes = [int(size) for size in args.app_sizes.split(",")]
+            results += bench_app_reruns(app_sizes, args.reruns, workdir)
+    finally:
+        server.shutdown()
+
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "stub": {
+                "latency": args.latency,
+                "tokens_per_second": args.tokens_per_second,
+                "completion_tokens": args.completion_tokens,
+                "error_rate": args.error_rate,
+                "requests": config.requests,
+                "errors": config.errors,
+            },
+        },
+        "results": results,
+    }
+
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+
+    for result in results:
+        params = ", ".join(f"{key}={value}" for key, value in result["params"].items())
+        stats = result["stats"]
+        print(f"{result['name']:<36} {params:<36} p50={stats['p50_ms']:>10.2f}ms  p95={stats['p95_ms']:>10.2f}ms")
+    print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,223 @@
+"""
+Local OpenAI-compatible stub server for benchmarks and load tests.
+
+Serves POST /v1/chat/completions (streaming and non-streaming, including
+JSON-schema structured output) with configurable latency, token rate and
+error injection, so the app can be measured without spending API credit.
+
+Run standalone:
+
+    python -m benchmarks.stub_server --port 8900 --latency 0.4 --tokens-per-second 80
+
+then point the app at it with OPENAI_BASE_URL=http://127.0.0.1:8900/v1.
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class StubConfig:
+    """Behaviour of the stub server; attributes may be changed while it runs."""
+
+    def __init__(self, latency=0.3, tokens_per_second=100.0, completion_tokens=200,
+                 error_rate=0.0, error_status=429, retry_after_ms=200, seed=None):
+        self.latency = latency
+        self.tokens_per_second = tokens_per_second
+        self.completion_tokens = completion_tokens
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.retry_after_ms = retry_after_ms
+        self.random = random.Random(seed)
+        self.requests = 0
+        self.errors = 0
+        self.lock = threading.Lock()
+
+
+WORDS = (
+    "strengths collaborate communicate focus energy trust clarity planning ideas "
+    "feedback momentum structure empathy vision priorities balance"
+).split()
+
+
+def _completion_text(config, max_tokens):
+    """Generate filler text of roughly the configured token count."""
+    count = min(config.completion_tokens, max_tokens or config.completion_tokens)
+    return [config.random.choice(WORDS) + " " for _ in range(count)]
+
+
+def _structured_content(response_format, tokens):
+    """Build a JSON object matching a json_schema response format."""
+    schema = response_format.get("json_schema", {}).get("schema", {})
+    keys = list(schema.get("properties", {}).keys()) or ["content"]
+    share = max(1, len(tokens) // len(keys))
+    return json.dumps({
+        key: "".join(tokens[i * share:(i + 1) * share]).strip()
+        for i, key in enumerate(keys)
+    })
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Request handler implementing the chat completions endpoint."""
+
+    protocol_version = "HTTP/1.1"
+    config = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status, payload, headers=None):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", "0"))
+        request = json.loads(self.rfile.read(length) or b"{}")
+        config = self.config
+
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self._send_json(404, {"error": {"message": "Not found"}})
+            return
+
+        with config.lock:
+            config.requests += 1
+            fail = config.random.random() < config.error_rate
+            if fail:
+                config.errors += 1
+
+        time.sleep(config.latency)
+
+        if fail:
+            self._send_json(
+                config.error_status,
+                {"error": {"message": "Injected error", "type": "stub_error"}},
+                headers={"retry-after-ms": str(config.retry_after_ms)}
+            )
+            return
+
+        prompt_tokens = sum(len(str(m.get("content", ""))) for m in request.get("messages", [])) // 4 + 1
+        tokens = _completion_text(config, request.get("max_tokens"))
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:12]}"
+        model = request.get("model", "stub")
+        usage = {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": len(tokens),
+            "total_tokens": prompt_tokens + len(tokens),
+            "prompt_tokens_details": {"cached_tokens": 0},
+        }
+
+        response_format = request.get("response_format") or {}
+        if response_format.get("type") == "json_schema":
+            tokens = [_structured_content(response_format, tokens)]
+
+        if request.get("stream"):
+            self._stream(completion_id, model, tokens, usage, request)
+            return
+
+        time.sleep(usage["completion_tokens"] / config.tokens_per_second)
+        self._send_json(200, {
+            "id": completion_id,
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": "".join(tokens)},
+                "finish_reason": "stop",
+            }],
+            "usage": usage,
+        })
+
+    def _stream(self, completion_id, model, tokens, usage, request):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+
+        def event(choices, extra=None):
+            payload = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": model,
+                "choices": choices,
+            }
+            payload.update(extra or {})
+            self.wfile.write(f"data: {json.dumps(payload)}\n\n".encode("utf-8"))
+            self.wfile.flush()
+
+        try:
+            delay = 1.0 / self.config.tokens_per_second
+            for token in tokens:
+                time.sleep(delay)
+                event([{"index": 0, "delta": {"content": token}, "finish_reason": None}])
+            event([{"index": 0, "delta": {}, "finish_reason": "stop"}])
+            if (request.get("stream_options") or {}).get("include_usage"):
+                event([], {"usage": usage})
+            self.wfile.write(b"data: [DONE]\n\n")
+            self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+
+def start_stub_server(host="127.0.0.1", port=0, config=None):
+    """
+    Start the stub server on a background thread.
+
+    Args:
+        host (str): Interface to bind
+        port (int): Port to bind (0 picks a free port)
+        config (StubConfig): Server behaviour (defaults to StubConfig())
+
+    Returns:
+        tuple: (server, base_url) — call server.shutdown() to stop it
+    """
+    config = config or StubConfig()
+    handler = type("ConfiguredStubHandler", (StubHandler,), {"config": config})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    server.config = config
+    thread = threading.Thread(target=server.serve_forever, name="stub-openai", daemon=True)
+    thread.start()
+    return server, f"http://{host}:{server.server_address[1]}/v1"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a local OpenAI-compatible stub server.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--latency", type=float, default=0.3, help="Seconds before the first token")
+    parser.add_argument("--tokens-per-second", type=float, default=100.0)
+    parser.add_argument("--completion-tokens", type=int, default=200)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests that fail")
+    parser.add_argument("--error-status", type=int, default=429)
+    args = parser.parse_args()
+
+    config = StubConfig(
+        latency=args.latency,
+        tokens_per_second=args.tokens_per_second,
+        completion_tokens=args.completion_tokens,
+        error_rate=args.error_rate,
+        error_status=args.error_status,
+    )
+    server, base_url = start_stub_server(args.host, args.port, config)
+    print(f"Stub OpenAI server listening on {base_url}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
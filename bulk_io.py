@@ -0,0 +1,275 @@
+"""
+Streaming bulk import and export of saved people (CSV or JSONL).
+
+Imports read the input row by row and commit it in batches with one store
+write per batch, so memory stays bounded and large files load in seconds.
+Every row is validated with validate_strengths; bad rows are reported with
+their line number and skipped without stopping the import.
+
+File formats:
+
+- CSV with a header row: name,strength_1,strength_2,strength_3,strength_4,strength_5
+- JSONL with one object per line: {"name": "...", "strengths": ["...", ...]}
+
+Command line:
+
+    python bulk_io.py import team.csv
+    python bulk_io.py export team.jsonl
+"""
+
+import argparse
+import csv
+import io
+import json
+import os
+import sys
+from typing import Dict, Iterator, List, Optional, TextIO, Tuple
+
+from data_storage import iter_saved_people, save_people_batch
+from strengths import validate_strengths
+
+
+FORMATS = ("csv", "jsonl")
+CSV_FIELDS = ["name"] + [f"strength_{i}" for i in range(1, 6)]
+IMPORT_BATCH_SIZE = int(os.environ.get("IMPORT_BATCH_SIZE", "5000"))
+
+# Only the first errors are kept in the report; the rest are just counted
+MAX_REPORTED_ERRORS = 1000
+
+
+def detect_format(filename: str) -> str:
+    """
+    Infer the file format from a file name.
+
+    Args:
+        filename (str): File name or path
+
+    Returns:
+        str: "csv" or "jsonl"
+
+    Raises:
+        ValueError: If the extension is not .csv, .jsonl or .ndjson
+    """
+    extension = os.path.splitext(filename)[1].lower()
+    if extension == ".csv":
+        return "csv"
+    if extension in (".jsonl", ".ndjson"):
+        return "jsonl"
+    raise ValueError(f"Cannot tell the format of {filename!r}. Use a .csv or .jsonl file.")
+
+
+class ImportReport:
+    """Outcome of an import: counts and the first per-row errors."""
+
+    def __init__(self):
+        self.imported = 0
+        self.failed = 0
+        self.batches = 0
+        self.errors: List[Tuple[int, str]] = []
+
+    def add_error(self, line: int, message: str, rows: int = 1) -> None:
+        """Record rejected rows."""
+        self.failed += rows
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append((line, message))
+
+    def to_dict(self) -> Dict:
+        """Return the report as plain data."""
+        return {
+            "imported": self.imported,
+            "failed": self.failed,
+            "batches": self.batches,
+            "errors": [{"line": line, "error": message} for line, message in self.errors],
+        }
+
+
+def _iter_csv(stream: TextIO) -> Iterator[Tuple[int, Optional[str], Optional[List[str]], Optional[str]]]:
+    """Yield (line, name, strengths, error) for each CSV data row."""
+    reader = csv.DictReader(stream)
+    missing = [field for field in CSV_FIELDS if field not in (reader.fieldnames or [])]
+    if missing:
+        yield 1, None, None, f"Missing column(s): {', '.join(missing)}"
+        return
+
+    try:
+        for row in reader:
+            strengths = [(row.get(field) or "").strip() for field in CSV_FIELDS[1:]]
+            yield reader.line_num, (row.get("name") or "").strip(), strengths, None
+    except csv.Error as e:
+        # The reader cannot resume after malformed input, so the rest of the file is skipped
+        yield reader.line_num, None, None, f"Malformed CSV, import stopped: {e}"
+
+
+def _iter_jsonl(stream: TextIO) -> Iterator[Tuple[int, Optional[str], Optional[List[str]], Optional[str]]]:
+    """Yield (line, name, strengths, error) for each JSONL line."""
+    for line_number, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError as e:
+            yield line_number, None, None, f"Invalid JSON: {e.msg}"
+            continue
+        if not isinstance(record, dict) or not isinstance(record.get("strengths"), list):
+            yield line_number, None, None, 'Expected an object with "name" and a "strengths" list'
+            continue
+        name = str(record.get("name") or "").strip()
+        strengths = [str(strength).strip() for strength in record["strengths"]]
+        yield line_number, name, strengths, None
+
+
+def iter_rows(stream: TextIO, file_format: str):
+    """
+    Parse an import stream lazily.
+
+    Args:
+        stream (TextIO): Text stream to read
+        file_format (str): "csv" or "jsonl"
+
+    Yields:
+        tuple: (line, name, strengths, error) where error is set for rows
+            that could not be parsed
+    """
+    if file_format == "csv":
+        return _iter_csv(stream)
+    if file_format == "jsonl":
+        return _iter_jsonl(stream)
+    raise ValueError(f"Unknown format: {file_format!r}. Expected one of {', '.join(FORMATS)}.")
+
+
+def import_people(stream: TextIO, file_format: str, batch_size: int = IMPORT_BATCH_SIZE,
+                  progress=None) -> ImportReport:
+    """
+    Import people from a CSV or JSONL stream, committing in batches.
+
+    A later row for the same name replaces an earlier one.
+
+    Args:
+        stream (TextIO): Text stream to read
+        file_format (str): "csv" or "jsonl"
+        batch_size (int): Valid rows committed per store write
+        progress (callable): Optional callback called with the report after each batch
+
+    Returns:
+        ImportReport: Counts and the first MAX_REPORTED_ERRORS row errors
+    """
+    report = ImportReport()
+    batch: Dict[str, List[str]] = {}
+
+    def commit():
+        if not batch:
+            return
+        if save_people_batch(batch):
+            report.imported += len(batch)
+        else:
+            report.add_error(0, f"Failed to save a batch of {len(batch)} people", rows=len(batch))
+        report.batches += 1
+        batch.clear()
+        if progress is not None:
+            progress(report)
+
+    for line, name, strengths, error in iter_rows(stream, file_format):
+        if error is None and not name:
+            error = "Missing name"
+        if error is None:
+            valid, message = validate_strengths(strengths)
+            if not valid:
+                error = message
+        if error is not None:
+            report.add_error(line, error)
+            continue
+
+        batch[name] = strengths
+        if len(batch) >= batch_size:
+            commit()
+
+    commit()
+    return report
+
+
+def export_people(stream: TextIO, file_format: str) -> int:
+    """
+    Write every saved person to a CSV or JSONL stream.
+
+    Args:
+        stream (TextIO): Text stream to write
+        file_format (str): "csv" or "jsonl"
+
+    Returns:
+        int: Number of people written
+    """
+    if file_format not in FORMATS:
+        raise ValueError(f"Unknown format: {file_format!r}. Expected one of {', '.join(FORMATS)}.")
+
+    count = 0
+    writer = csv.writer(stream) if file_format == "csv" else None
+    if writer is not None:
+        writer.writerow(CSV_FIELDS)
+
+    for name, strengths in iter_saved_people():
+        if writer is not None:
+            writer.writerow([name] + list(strengths))
+        else:
+            stream.write(json.dumps({"name": name, "strengths": list(strengths)}) + "\n")
+        count += 1
+    return count
+
+
+def export_people_text(file_format: str) -> str:
+    """
+    Export every saved person to a string (used for the app's download button).
+
+    Args:
+        file_format (str): "csv" or "jsonl"
+
+    Returns:
+        str: The exported file contents
+    """
+    buffer = io.StringIO(newline="")
+    export_people(buffer, file_format)
+    return buffer.getvalue()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk import or export saved people.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    import_parser = subparsers.add_parser("import", help="Import people from a CSV or JSONL file")
+    import_parser.add_argument("path", help="File to import")
+    import_parser.add_argument("--format", choices=FORMATS, help="File format (default: from the extension)")
+    import_parser.add_argument("--batch-size", type=int, default=IMPORT_BATCH_SIZE, help="Rows per store write")
+
+    export_parser = subparsers.add_parser("export", help="Export saved people to a CSV or JSONL file")
+    export_parser.add_argument("path", help="File to write ('-' for stdout)")
+    export_parser.add_argument("--format", choices=FORMATS, help="File format (default: from the extension)")
+
+    args = parser.parse_args()
+
+    try:
+        file_format = args.format or detect_format(args.path)
+    except ValueError as e:
+        parser.error(str(e))
+
+    if args.command == "import":
+        with open(args.path, 'r', encoding="utf-8-sig", newline="") as f:
+            report = import_people(
+                f, file_format, args.batch_size,
+                progress=lambda r: print(f"Imported {r.imported} people ({r.failed} rejected)", file=sys.stderr)
+            )
+        for line, message in report.errors:
+            print(f"Line {line}: {message}", file=sys.stderr)
+        if report.failed > len(report.errors):
+            print(f"... and {report.failed - len(report.errors)} more errors", file=sys.stderr)
+        print(f"Imported {report.imported} people, rejected {report.failed} rows.")
+        sys.exit(1 if report.failed else 0)
+
+    if args.path == "-":
+        count = export_people(sys.stdout, file_format)
+    else:
+        with open(args.path, 'w', encoding="utf-8", newline="") as f:
+            count = export_people(f, file_format)
+    print(f"Exported {count} people.", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
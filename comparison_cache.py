@@ -0,0 +1,219 @@
+"""
+Persistent on-disk cache for comparison results.
+
+Results are keyed on everything that influences the generated text (both
+names, both strength lists, the prompt-template version, the model and the
+temperature) and stored in a small SQLite database so they survive restarts
+and are shared between sessions.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+
+CACHE_FILE = os.environ.get("COMPARISON_CACHE_FILE", "comparison_cache.db")
+CACHE_ENABLED = os.environ.get("COMPARISON_CACHE_ENABLED", "1") not in ("0", "false", "False")
+
+# Entries older than the TTL are treated as misses and removed
+CACHE_TTL_SECONDS = float(os.environ.get("COMPARISON_CACHE_TTL", str(30 * 24 * 3600)))
+
+# Size caps; least recently used entries are evicted first
+CACHE_MAX_ENTRIES = int(os.environ.get("COMPARISON_CACHE_MAX_ENTRIES", "5000"))
+CACHE_MAX_BYTES = int(os.environ.get("COMPARISON_CACHE_MAX_BYTES", str(50 * 1024 * 1024)))
+
+
+def make_cache_key(person1_name, person1_strengths, person2_name, person2_strengths,
+                   prompt_version, model, temperature) -> str:
+    """
+    Build a canonical cache key for a comparison.
+
+    The order of the two people is preserved because the communication
+    section is directional (how person 1 should speak to person 2).
+
+    Args:
+        person1_name (str): Name of first person
+        person1_strengths (list): List of 5 CliftonStrengths for person 1
+        person2_name (str): Name of second person
+        person2_strengths (list): List of 5 CliftonStrengths for person 2
+        prompt_version (str): Version of the prompt templates
+        model (str): Model name
+        temperature (float): Sampling temperature
+
+    Returns:
+        str: Hex digest identifying the comparison
+    """
+    payload = {
+        "p1": [person1_name.strip(), list(person1_strengths)],
+        "p2": [person2_name.strip(), list(person2_strengths)],
+        "prompt_version": str(prompt_version),
+        "model": model,
+        "temperature": round(float(temperature), 3),
+    }
+    canonical = json.dumps(payload, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class ComparisonCache:
+    """
+    SQLite-backed result cache with TTL and LRU eviction.
+
+    Values are tuples of strings (one per analysis section).
+    """
+
+    def __init__(self, path: str = CACHE_FILE, ttl: float = CACHE_TTL_SECONDS,
+                 max_entries: int = CACHE_MAX_ENTRIES, max_bytes: int = CACHE_MAX_BYTES):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS results ("
+            " key TEXT PRIMARY KEY,"
+            " value TEXT NOT NULL,"
+            " size INTEGER NOT NULL,"
+            " created_at REAL NOT NULL,"
+            " accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_results_accessed ON results (accessed_at)")
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[Tuple[str, ...]]:
+        """
+        Look up a cached result.
+
+        Args:
+            key (str): Key from make_cache_key
+
+        Returns:
+            tuple or None: Cached sections, or None on a miss
+        """
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created_at FROM results WHERE key = ?", (key,)
+            ).fetchone()
+
+            if row is None or now - row[1] > self.ttl:
+                if row is not None:
+                    self._conn.execute("DELETE FROM results WHERE key = ?", (key,))
+                    self._conn.commit()
+                self.misses += 1
+                return None
+
+            self._conn.execute("UPDATE results SET accessed_at = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self.hits += 1
+            return tuple(json.loads(row[0]))
+
+    def contains(self, key: str) -> bool:
+        """
+        Check for a live entry without counting a hit or miss or touching its recency.
+
+        Args:
+            key (str): Key from make_cache_key
+
+        Returns:
+            bool: True if an unexpired result is cached
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT created_at FROM results WHERE key = ?", (key,)
+            ).fetchone()
+        return row is not None and time.time() - row[0] <= self.ttl
+
+    def set(self, key: str, value: Tuple[str, ...]) -> None:
+        """
+        Store a result and evict old entries if the cache is over its caps.
+
+        Args:
+            key (str): Key from make_cache_key
+            value (tuple): Section texts to store
+        """
+        encoded = json.dumps(list(value))
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO results (key, value, size, created_at, accessed_at) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET value = excluded.value, size = excluded.size, "
+                "created_at = excluded.created_at, accessed_at = excluded.accessed_at",
+                (key, encoded, len(encoded), now, now)
+            )
+            self._evict(now)
+            self._conn.commit()
+
+    def _evict(self, now: float) -> None:
+        """Drop expired entries, then least recently used ones until under the caps."""
+        self._conn.execute("DELETE FROM results WHERE created_at < ?", (now - self.ttl,))
+
+        count, total_bytes = self._conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM results"
+        ).fetchone()
+        if count <= self.max_entries and total_bytes <= self.max_bytes:
+            return
+
+        doomed = []
+        for key, size in self._conn.execute("SELECT key, size FROM results ORDER BY accessed_at ASC"):
+            if count <= self.max_entries and total_bytes <= self.max_bytes:
+                break
+            doomed.append((key,))
+            count -= 1
+            total_bytes -= size
+        self._conn.executemany("DELETE FROM results WHERE key = ?", doomed)
+
+    def clear(self) -> None:
+        """Remove every cached result and reset the counters."""
+        with self._lock:
+            self._conn.execute("DELETE FROM results")
+            self._conn.commit()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Report cache counters.
+
+        Returns:
+            dict: hits, misses, entries and bytes currently stored
+        """
+        with self._lock:
+            count, total_bytes = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM results"
+            ).fetchone()
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "entries": count,
+                "bytes": total_bytes,
+            }
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_comparison_cache() -> Optional[ComparisonCache]:
+    """
+    Return the process-wide comparison cache.
+
+    Returns:
+        ComparisonCache or None: The shared cache, or None if caching is disabled
+    """
+    global _cache
+
+    if not CACHE_ENABLED:
+        return None
+
+    with _cache_lock:
+        if _cache is None:
+            _cache = ComparisonCache()
+        return _cache
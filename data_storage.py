@@ -1,55 +1,502 @@
 """
 Data storage module for saving and loading people and their CliftonStrengths.
+
+Two backends sit behind the same module-level functions:
+
+- "sqlite" (default): a SQLite database in WAL mode with the name as its
+  primary key, so lookups and upserts touch a single row. On first use any
+  existing saved_people.json is imported once.
+- "json": the original saved_people.json file, now written atomically under
+  a lock.
+
+The backend is chosen with the PEOPLE_STORE_BACKEND environment variable.
+
+The SQLite backend stores each profile in its compact StrengthProfile form
+(one byte per theme) rather than as JSON text. Rows that are not a list of
+distinct, known themes are kept as JSON so nothing is lost.
+
+Reads go through a shared in-process cache that is invalidated by the
+store's own writes and by changes to the underlying files' mtime/size, so
+repeated lookups during a Streamlit rerun are served from memory.
 """
 
 import json
 import os
-from typing import Dict, List, Optional
+import sqlite3
+import tempfile
+import threading
+from typing import Callable, Dict, Iterator, List, Optional, Tuple, Union
+
+from metrics import metrics
+from strengths import StrengthProfile
 
 
 DATA_FILE = "saved_people.json"
+DB_FILE = os.environ.get("PEOPLE_DB_FILE", "saved_people.db")
+STORAGE_BACKEND = os.environ.get("PEOPLE_STORE_BACKEND", "sqlite")
+
+
+# A cached profile: compact when possible, otherwise the names as stored
+CachedProfile = Union[StrengthProfile, List[str]]
+
+
+def _to_profile(strengths: List[str]) -> CachedProfile:
+    """Encode a list of names compactly, keeping it as-is if it cannot be encoded."""
+    try:
+        return StrengthProfile.from_names(strengths)
+    except (TypeError, ValueError):
+        return strengths
+
+
+def _encode_strengths(strengths: List[str]):
+    """Return the column value for a profile: compact bytes, or JSON text as a fallback."""
+    profile = _to_profile(strengths)
+    if isinstance(profile, StrengthProfile):
+        return profile.to_bytes()
+    return json.dumps(strengths)
+
+
+def _decode_profile(value) -> CachedProfile:
+    """Decode a stored column value written by _encode_strengths (or legacy JSON text)."""
+    if isinstance(value, bytes):
+        return StrengthProfile.from_bytes(value)
+    return _to_profile(json.loads(value))
+
+
+def _file_signature(path: str) -> Tuple:
+    """Return (mtime_ns, size) for a file, or (None, None) if it does not exist."""
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return (None, None)
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+class JsonPeopleStore:
+    """Store people in a single JSON file, rewritten atomically on every change."""
+
+    def __init__(self, path: str = DATA_FILE):
+        self.path = path
+        self._lock = threading.RLock()
+
+    def load_all(self) -> Dict[str, List[str]]:
+        """Return every saved person."""
+        if not os.path.exists(self.path):
+            return {}
+
+        with open(self.path, 'r') as f:
+            return json.load(f)
+
+    def load_profiles(self) -> Dict[str, CachedProfile]:
+        """Return every saved person as a compact profile."""
+        return {name: _to_profile(strengths) for name, strengths in self.load_all().items()}
+
+    def get(self, name: str) -> Optional[List[str]]:
+        """Return one person's strengths, or None."""
+        return self.load_all().get(name)
+
+    def signature(self) -> Tuple:
+        """Return a value that changes whenever the data file changes."""
+        return _file_signature(self.path)
+
+    def upsert(self, name: str, strengths: List[str]) -> None:
+        """Add or update a person."""
+        with self._lock:
+            people = self.load_all()
+            people[name] = strengths
+            self._write(people)
+
+    def upsert_many(self, people: Dict[str, List[str]]) -> None:
+        """Add or update many people with a single file write."""
+        with self._lock:
+            existing = self.load_all()
+            existing.update(people)
+            self._write(existing)
+
+    def delete(self, name: str) -> bool:
+        """Delete a person; returns False if they were not saved."""
+        with self._lock:
+            people = self.load_all()
+            if name not in people:
+                return False
+            del people[name]
+            self._write(people)
+            return True
+
+    def _write(self, people: Dict[str, List[str]]) -> None:
+        """Write to a temporary file and rename it over the data file."""
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, tmp_path = tempfile.mkstemp(prefix=".saved_people.", suffix=".tmp", dir=directory)
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump(people, f, indent=2)
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+
+class SqlitePeopleStore:
+    """Store people in SQLite (WAL mode), one row per person."""
+
+    def __init__(self, path: str = DB_FILE, json_path: str = DATA_FILE):
+        self.path = path
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS people ("
+            " name TEXT PRIMARY KEY,"
+            " strengths TEXT NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS meta ("
+            " key TEXT PRIMARY KEY,"
+            " value TEXT NOT NULL)"
+        )
+        self._conn.commit()
+        self._migrate_from_json(json_path)
+        self._compact_rows()
+
+    def _migrate_from_json(self, json_path: str) -> None:
+        """Import the legacy JSON file once; later runs leave it untouched."""
+        with self._lock, self._conn:
+            done = self._conn.execute(
+                "SELECT value FROM meta WHERE key = 'json_migrated'"
+            ).fetchone()
+            if done is not None:
+                return
+
+            if os.path.exists(json_path):
+                people = JsonPeopleStore(json_path).load_all()
+                self._conn.executemany(
+                    "INSERT OR IGNORE INTO people (name, strengths) VALUES (?, ?)",
+                    [(name, _encode_strengths(strengths)) for name, strengths in people.items()]
+                )
+            self._conn.execute(
+                "INSERT INTO meta (key, value) VALUES ('json_migrated', ?)",
+                (json_path,)
+            )
+
+    def _compact_rows(self) -> None:
+        """Re-encode rows written as JSON text by earlier versions into the compact form."""
+        with self._lock, self._conn:
+            rows = self._conn.execute(
+                "SELECT name, strengths FROM people WHERE typeof(strengths) = 'text'"
+            ).fetchall()
+            updates = [
+                (_encode_strengths(json.loads(strengths)), name) for name, strengths in rows
+            ]
+            self._conn.executemany(
+                "UPDATE people SET strengths = ? WHERE name = ?",
+                [(value, name) for value, name in updates if isinstance(value, bytes)]
+            )
+
+    def load_profiles(self) -> Dict[str, CachedProfile]:
+        """Return every saved person as a compact profile, in the order they were first saved."""
+        with self._lock:
+            rows = self._conn.execute("SELECT name, strengths FROM people ORDER BY rowid").fetchall()
+        return {name: _decode_profile(strengths) for name, strengths in rows}
+
+    def load_all(self) -> Dict[str, List[str]]:
+        """Return every saved person, in the order they were first saved."""
+        return {name: list(profile) for name, profile in self.load_profiles().items()}
+
+    def signature(self) -> Tuple:
+        """Return a value that changes whenever the database or its WAL changes."""
+        return _file_signature(self.path) + _file_signature(self.path + "-wal")
+
+    def get(self, name: str) -> Optional[List[str]]:
+        """Return one person's strengths, or None."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT strengths FROM people WHERE name = ?", (name,)
+            ).fetchone()
+        return list(_decode_profile(row[0])) if row else None
+
+    def upsert(self, name: str, strengths: List[str]) -> None:
+        """Add or update a person."""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO people (name, strengths) VALUES (?, ?) "
+                "ON CONFLICT(name) DO UPDATE SET strengths = excluded.strengths",
+                (name, _encode_strengths(strengths))
+            )
+
+    def upsert_many(self, people: Dict[str, List[str]]) -> None:
+        """Add or update many people in a single transaction."""
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT INTO people (name, strengths) VALUES (?, ?) "
+                "ON CONFLICT(name) DO UPDATE SET strengths = excluded.strengths",
+                [(name, _encode_strengths(strengths)) for name, strengths in people.items()]
+            )
+
+    def delete(self, name: str) -> bool:
+        """Delete a person; returns False if they were not saved."""
+        with self._lock, self._conn:
+            cursor = self._conn.execute("DELETE FROM people WHERE name = ?", (name,))
+        return cursor.rowcount > 0
+
+
+class PeopleReadCache:
+    """
+    Thread-safe in-memory copy of all saved people, held as compact profiles.
+
+    The copy is reused while the store's signature (file mtime/size) is
+    unchanged and dropped whenever the store is written through this module.
+    ``generation`` increases every time the copy is reloaded, so callers can
+    cache values derived from it (such as option lists) cheaply.
+
+    Single-name lookups made while there is no full copy read just that row
+    from the store and keep it until the next change, so a write does not
+    make the next lookup reload everyone.
+    """
+
+    def __init__(self, store):
+        self.store = store
+        self.reads = 0
+        self.reads_avoided = 0
+        self.generation = 0
+        self._lock = threading.Lock()
+        self._people = None
+        self._entries = {}
+        self._signature = None
+
+    def _check_signature(self) -> None:
+        """Drop everything cached if the store changed behind our back."""
+        signature = self.store.signature()
+        if signature != self._signature:
+            self._people = None
+            self._entries = {}
+            self._signature = signature
+
+    def get_all(self) -> Dict[str, CachedProfile]:
+        """Return the cached profiles, reloading from the store if it changed."""
+        with self._lock:
+            self._check_signature()
+            if self._people is not None:
+                self.reads_avoided += 1
+                return self._people
+
+            self._people = self.store.load_profiles()
+            self._entries = {}
+            self.reads += 1
+            self.generation += 1
+            return self._people
+
+    def get(self, name: str) -> Optional[CachedProfile]:
+        """Return one person's cached profile (None if not saved), reading only their row on a miss."""
+        with self._lock:
+            self._check_signature()
+            if self._people is not None:
+                self.reads_avoided += 1
+                return self._people.get(name)
+            if name in self._entries:
+                self.reads_avoided += 1
+                return self._entries[name]
+
+            strengths = self.store.get(name)
+            profile = _to_profile(strengths) if strengths is not None else None
+            self._entries[name] = profile
+            self.reads += 1
+            return profile
+
+    def get_generation(self) -> int:
+        """Return the generation of the current copy, reloading it first if the store changed."""
+        self.get_all()
+        with self._lock:
+            return self.generation
+
+    def invalidate(self) -> None:
+        """Forget the cached copy so the next read goes to the store."""
+        with self._lock:
+            self._people = None
+            self._entries = {}
+            self._signature = None
+
+    def stats(self) -> Dict[str, int]:
+        """Return the number of store reads performed and avoided."""
+        with self._lock:
+            return {"reads": self.reads, "reads_avoided": self.reads_avoided}
+
+
+_store = None
+_read_cache = None
+_store_lock = threading.Lock()
+_change_listeners = []
+
+
+def get_store():
+    """
+    Return the process-wide people store for the configured backend.
+
+    Returns:
+        JsonPeopleStore or SqlitePeopleStore: The active store
+
+    Raises:
+        ValueError: If PEOPLE_STORE_BACKEND is not "sqlite" or "json"
+    """
+    global _store
+
+    with _store_lock:
+        if _store is None:
+            if STORAGE_BACKEND == "sqlite":
+                _store = SqlitePeopleStore()
+            elif STORAGE_BACKEND == "json":
+                _store = JsonPeopleStore()
+            else:
+                raise ValueError(
+                    f"Unknown PEOPLE_STORE_BACKEND: {STORAGE_BACKEND!r}. Expected 'sqlite' or 'json'."
+                )
+        return _store
+
+
+def set_store(store) -> None:
+    """
+    Replace the active store (used by tools and benchmarks).
+
+    Args:
+        store (JsonPeopleStore or SqlitePeopleStore): Store to use from now on
+    """
+    global _store, _read_cache
+
+    with _store_lock:
+        _store = store
+        _read_cache = None
+
+
+def get_read_cache() -> PeopleReadCache:
+    """
+    Return the shared read cache for the active store.
+
+    Returns:
+        PeopleReadCache: The process-wide read cache
+    """
+    global _read_cache
+
+    store = get_store()
+    with _store_lock:
+        if _read_cache is None:
+            _read_cache = PeopleReadCache(store)
+        return _read_cache
+
+
+def add_change_listener(listener: Callable[[Dict[str, Optional[List[str]]]], None]) -> None:
+    """
+    Register a function called after every save or delete made through this module.
+
+    Args:
+        listener (callable): Called as listener(changes), where changes maps each
+            changed name to its new strengths, or to None if the person was deleted
+    """
+    with _store_lock:
+        if listener not in _change_listeners:
+            _change_listeners.append(listener)
+
+
+def _notify_change(changes: Dict[str, Optional[List[str]]]) -> None:
+    """Call every change listener; a failing listener never fails the write."""
+    for listener in list(_change_listeners):
+        try:
+            listener(changes)
+        except Exception as e:
+            print(f"Error in saved people change listener: {e}")
+
+
+def read_cache_stats() -> Dict[str, int]:
+    """
+    Report how many store reads the read cache performed and avoided.
+
+    Returns:
+        dict: Counters with keys "reads" and "reads_avoided"
+    """
+    return get_read_cache().stats()
 
 
 def load_saved_people() -> Dict[str, List[str]]:
     """
-    Load saved people and their strengths from JSON file.
-    
+    Load saved people and their strengths.
+
     Returns:
         dict: Dictionary with names as keys and list of 5 strengths as values
     """
-    if not os.path.exists(DATA_FILE):
+    try:
+        with metrics.span("storage_read", op="load_saved_people"):
+            return {name: list(profile) for name, profile in get_read_cache().get_all().items()}
+    except Exception as e:
+        print(f"Error loading saved people: {e}")
         return {}
-    
+
+
+def load_saved_profiles() -> Dict[str, StrengthProfile]:
+    """
+    Load saved people as compact profiles.
+
+    People whose saved strengths are not distinct, known themes are skipped.
+
+    Returns:
+        dict: Dictionary with names as keys and StrengthProfile values
+    """
     try:
-        with open(DATA_FILE, 'r') as f:
-            return json.load(f)
+        with metrics.span("storage_read", op="load_saved_profiles"):
+            return {
+                name: profile
+                for name, profile in get_read_cache().get_all().items()
+                if isinstance(profile, StrengthProfile)
+            }
     except Exception as e:
         print(f"Error loading saved people: {e}")
         return {}
 
 
+def list_saved_names() -> List[str]:
+    """
+    List the names of saved people without copying their strengths.
+
+    Returns:
+        list: Saved names, in the order they were first saved
+    """
+    try:
+        with metrics.span("storage_read", op="list_saved_names"):
+            return list(get_read_cache().get_all())
+    except Exception as e:
+        print(f"Error loading saved people: {e}")
+        return []
+
+
+def saved_people_generation() -> int:
+    """
+    Return a number that changes whenever the saved people change.
+
+    Returns:
+        int: Current generation of the read cache (0 if the store cannot be read)
+    """
+    try:
+        return get_read_cache().get_generation()
+    except Exception as e:
+        print(f"Error loading saved people: {e}")
+        return 0
+
+
 def save_person(name: str, strengths: List[str]) -> bool:
     """
-    Save a person and their strengths to the data file.
-    
+    Save a person and their strengths.
+
     Args:
         name (str): Person's name
         strengths (list): List of 5 CliftonStrengths
-        
+
     Returns:
         bool: True if successful, False otherwise
     """
     try:
-        # Load existing data
-        people = load_saved_people()
-        
-        # Add or update person
-        people[name] = strengths
-        
-        # Save back to file
-        with open(DATA_FILE, 'w') as f:
-            json.dump(people, f, indent=2)
-        
+        with metrics.span("storage_write", op="save_person"):
+            get_store().upsert(name, strengths)
+        get_read_cache().invalidate()
+        _notify_change({name: list(strengths)})
         return True
     except Exception as e:
         print(f"Error saving person: {e}")
@@ -59,38 +506,76 @@ def save_person(name: str, strengths: List[str]) -> bool:
 def delete_person(name: str) -> bool:
     """
     Delete a person from saved data.
-    
+
     Args:
         name (str): Person's name to delete
-        
+
     Returns:
         bool: True if successful, False otherwise
     """
     try:
-        people = load_saved_people()
-        
-        if name in people:
-            del people[name]
-            
-            with open(DATA_FILE, 'w') as f:
-                json.dump(people, f, indent=2)
-            
-            return True
-        return False
+        with metrics.span("storage_write", op="delete_person"):
+            deleted = get_store().delete(name)
+        get_read_cache().invalidate()
+        if deleted:
+            _notify_change({name: None})
+        return deleted
     except Exception as e:
         print(f"Error deleting person: {e}")
         return False
 
 
+def save_people_batch(people: Dict[str, List[str]]) -> bool:
+    """
+    Save many people with a single store write.
+
+    Args:
+        people (dict): Names mapped to lists of 5 CliftonStrengths
+
+    Returns:
+        bool: True if successful, False otherwise
+    """
+    try:
+        with metrics.span("storage_write", op="save_people_batch"):
+            get_store().upsert_many(people)
+        get_read_cache().invalidate()
+        _notify_change({name: list(strengths) for name, strengths in people.items()})
+        return True
+    except Exception as e:
+        print(f"Error saving people: {e}")
+        return False
+
+
+def iter_saved_people() -> Iterator[Tuple[str, List[str]]]:
+    """
+    Iterate over saved people without building a full copy of them.
+
+    Yields:
+        tuple: (name, strengths) in the order they were first saved
+    """
+    try:
+        people = get_read_cache().get_all()
+    except Exception as e:
+        print(f"Error loading saved people: {e}")
+        return
+    for name, profile in people.items():
+        yield name, list(profile)
+
+
 def get_person_strengths(name: str) -> Optional[List[str]]:
     """
     Get a person's saved strengths.
-    
+
     Args:
         name (str): Person's name
-        
+
     Returns:
         list or None: List of 5 strengths if found, None otherwise
     """
-    people = load_saved_people()
-    return people.get(name)
+    try:
+        with metrics.span("storage_read", op="get_person_strengths"):
+            strengths = get_read_cache().get(name)
+        return list(strengths) if strengths is not None else None
+    except Exception as e:
+        print(f"Error loading saved people: {e}")
+        return None
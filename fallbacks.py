@@ -0,0 +1,118 @@
+"""
+Offline fallback text for comparison sections that missed their deadline.
+
+A fallback never calls the API. It is built from stored theme-pair insight
+fragments when the fragment store has any for the comparison's top pairs,
+and otherwise from the theme descriptions in strengths.py. The text is a
+FallbackText: a str with ``degraded`` set and its ``source`` recorded, so
+callers can mark it in the UI and keep it out of the comparison cache.
+"""
+
+from itertools import product
+from typing import Dict, List, Optional, Tuple
+
+from insight_fragments import get_fragment_store, ranked_pairs
+from strengths import STRENGTH_DESCRIPTIONS
+
+
+# Theme pairs or themes listed per fallback section
+FALLBACK_ITEMS = 3
+
+
+class FallbackText(str):
+    """
+    Section text produced without the API.
+
+    Attributes:
+        degraded (bool): Always True; plain str results have no such attribute
+        source (str): "fragments" or "descriptions"
+    """
+
+    degraded = True
+
+    def __new__(cls, text: str = "", source: str = "descriptions"):
+        obj = super().__new__(cls, text)
+        obj.source = source
+        return obj
+
+
+def is_degraded(text) -> bool:
+    """Return True for section text produced by a fallback."""
+    return getattr(text, "degraded", False)
+
+
+def _top_pairs(person1_strengths: List[str], person2_strengths: List[str]) -> List[Tuple[str, str]]:
+    """Pairs of different themes (person 1's, person 2's), both people's top ranks first."""
+    ordered = sorted(
+        product(enumerate(person1_strengths), enumerate(person2_strengths)),
+        key=lambda ranked: (ranked[0][0] + ranked[1][0], ranked[0][0])
+    )
+    return [(a, b) for (_, a), (_, b) in ordered if a != b][:FALLBACK_ITEMS]
+
+
+def _from_fragments(person1_name: str, person2_name: str, fragments: Dict[Tuple[str, str], str]) -> str:
+    lines = [f"What the top theme pairs of {person1_name} and {person2_name} suggest:", ""]
+    lines += [f"- **{a} × {b}:** {text}" for (a, b), text in fragments.items()]
+    return "\n".join(lines)
+
+
+def _from_descriptions(section: str, person1_name: str, person1_strengths: List[str],
+                       person2_name: str, person2_strengths: List[str]) -> str:
+    if section == "conflicts":
+        lines = [f"Where the top themes of {person1_name} and {person2_name} may pull in different directions:", ""]
+        for a, b in _top_pairs(person1_strengths, person2_strengths):
+            lines.append(
+                f"- **{a}** and **{b}**: {person1_name} {STRENGTH_DESCRIPTIONS[a]}, while "
+                f"{person2_name} {STRENGTH_DESCRIPTIONS[b]}. Agree early on how to balance the two."
+            )
+        return "\n".join(lines)
+
+    if section == "collaboration":
+        shared = [theme for theme in person1_strengths if theme in person2_strengths]
+        lines = [f"How {person1_name} and {person2_name} can divide the work:", ""]
+        for theme in shared:
+            lines.append(f"- **{theme}** (shared): common ground to build on together.")
+        for name, strengths in ((person1_name, person1_strengths), (person2_name, person2_strengths)):
+            for theme in [t for t in strengths if t not in shared][:FALLBACK_ITEMS]:
+                lines.append(f"- **{theme}**: {name} {STRENGTH_DESCRIPTIONS[theme]}; let {name} lead where this matters.")
+        return "\n".join(lines)
+
+    lines = [f"What {person2_name}'s top themes suggest for how {person1_name} should approach them:", ""]
+    for theme in person2_strengths[:FALLBACK_ITEMS]:
+        lines.append(f"- **{theme}**: {person2_name} {STRENGTH_DESCRIPTIONS[theme]}.")
+    return "\n".join(lines)
+
+
+def fallback_section(section: str, person1_name: str, person1_strengths: List[str],
+                     person2_name: str, person2_strengths: List[str],
+                     fragment_version: Optional[str] = None) -> FallbackText:
+    """
+    Build offline text for one comparison section.
+
+    Args:
+        section (str): Comparison section
+        person1_name (str): Name of first person
+        person1_strengths (list): Ranked strengths for person 1
+        person2_name (str): Name of second person
+        person2_strengths (list): Ranked strengths for person 2
+        fragment_version (str): Fragment prompt version to look up (None skips the fragment store)
+
+    Returns:
+        FallbackText: The section text
+    """
+    if fragment_version is not None:
+        pairs = ranked_pairs(section, person1_strengths, person2_strengths)
+        try:
+            found = get_fragment_store().get_many(section, pairs, fragment_version)
+        except Exception as e:
+            print(f"Error reading insight fragments: {e}")
+            found = {}
+        fragments = {pair: found[pair] for pair in pairs if pair in found}
+        if fragments:
+            fragments = dict(list(fragments.items())[:FALLBACK_ITEMS])
+            return FallbackText(_from_fragments(person1_name, person2_name, fragments), "fragments")
+
+    return FallbackText(
+        _from_descriptions(section, person1_name, person1_strengths, person2_name, person2_strengths),
+        "descriptions"
+    )
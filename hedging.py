@@ -0,0 +1,168 @@
+"""
+Deadline-bounded API calls with hedged second attempts.
+
+A hedged call starts one attempt. If it has not answered once the hedge
+delay has passed (the route's observed p90 latency), a second identical
+attempt is started and the first answer wins. Either way the caller waits
+no longer than its deadline and then gets DeadlineExceeded, so one slow
+completion cannot hold up a whole comparison. Attempts that lose, or are
+still running at the deadline, are cancelled: each thread attempt gets a
+threading.Event that is then set, so a request still queued in the API
+scheduler or waiting to retry is never sent, and asyncio tasks are
+cancelled. A request already on the wire runs to its own per-call timeout
+and its answer is discarded.
+
+Callers pass ``can_hedge`` to skip a hedge when it would only add load, for
+example while the API scheduler already has requests waiting.
+"""
+
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Awaitable, Callable, Optional
+
+from metrics import metrics
+from rate_limiter import DeadlineExceeded
+
+
+# Longest a caller waits for one section of a comparison, including retries and hedges
+SECTION_DEADLINE_SECONDS = float(os.environ.get("SECTION_DEADLINE_SECONDS", "45"))
+
+HEDGING_ENABLED = os.environ.get("HEDGING_ENABLED", "1") not in ("0", "false", "False")
+
+# Never hedge sooner than this, whatever the observed p90
+HEDGE_MIN_DELAY_SECONDS = float(os.environ.get("HEDGE_MIN_DELAY_SECONDS", "1.0"))
+
+
+def hedge_delay(observed_p90: Optional[float]) -> Optional[float]:
+    """
+    Turn an observed p90 latency into the delay before a hedge.
+
+    Args:
+        observed_p90 (float): p90 latency in seconds, or None without observations
+
+    Returns:
+        float: Seconds to wait before hedging, or None for no hedge
+    """
+    if not HEDGING_ENABLED or observed_p90 is None:
+        return None
+    return max(observed_p90, HEDGE_MIN_DELAY_SECONDS)
+
+
+def hedged_call(call: Callable, deadline: float, hedge_after: Optional[float] = None,
+                can_hedge: Optional[Callable[[], bool]] = None, label: str = ""):
+    """
+    Run a call with an optional hedge, waiting at most ``deadline`` seconds.
+
+    Args:
+        call (callable): Function performing one attempt; it is passed a
+            threading.Event that is set once that attempt's answer is no
+            longer wanted, and should hand it to the API scheduler
+        deadline (float): Seconds to wait for an answer
+        hedge_after (float): Seconds before a second attempt starts (None: never)
+        can_hedge (callable): Checked when the hedge is due; returning False skips it
+        label (str): Value of the ``section`` label on the hedge metrics
+
+    Returns:
+        The result of the first attempt that succeeds
+
+    Raises:
+        DeadlineExceeded: If no attempt succeeded in time
+        Exception: The last attempt's error if every attempt failed
+    """
+    started = time.monotonic()
+    deadline_at = started + deadline
+    hedge_at = started + hedge_after if hedge_after is not None else None
+
+    executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="hedged-call")
+    cancels = [threading.Event()]
+    primary = executor.submit(call, cancels[0])
+    pending = {primary}
+    error = None
+    try:
+        while pending:
+            now = time.monotonic()
+            if now >= deadline_at:
+                metrics.increment("deadlines_exceeded_total", section=label)
+                raise DeadlineExceeded(f"No answer within {deadline:.0f}s")
+            if hedge_at is not None and now >= hedge_at:
+                hedge_at = None
+                if can_hedge is None or can_hedge():
+                    metrics.increment("hedges_total", section=label)
+                    cancels.append(threading.Event())
+                    pending.add(executor.submit(call, cancels[-1]))
+                continue
+
+            wake_at = deadline_at if hedge_at is None else min(deadline_at, hedge_at)
+            done, pending = wait(pending, timeout=wake_at - now, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    if future is not primary:
+                        metrics.increment("hedge_wins_total", section=label)
+                    return future.result()
+                error = future.exception()
+        raise error
+    finally:
+        # Stop every attempt still queued or retrying; the winner has already returned
+        for cancel in cancels:
+            cancel.set()
+        for future in pending:
+            future.cancel()
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+async def hedged_call_async(make_call: Callable[[], Awaitable], deadline: float,
+                            hedge_after: Optional[float] = None,
+                            can_hedge: Optional[Callable[[], bool]] = None, label: str = ""):
+    """
+    Async counterpart of hedged_call; losing attempts are cancelled.
+
+    Args:
+        make_call (callable): Zero-argument function returning a new coroutine per attempt
+        deadline (float): Seconds to wait for an answer
+        hedge_after (float): Seconds before a second attempt starts (None: never)
+        can_hedge (callable): Checked when the hedge is due; returning False skips it
+        label (str): Value of the ``section`` label on the hedge metrics
+
+    Returns:
+        The result of the first attempt that succeeds
+
+    Raises:
+        DeadlineExceeded: If no attempt succeeded in time
+        Exception: The last attempt's error if every attempt failed
+    """
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    deadline_at = started + deadline
+    hedge_at = started + hedge_after if hedge_after is not None else None
+
+    primary = asyncio.ensure_future(make_call())
+    pending = {primary}
+    error = None
+    try:
+        while pending:
+            now = loop.time()
+            if now >= deadline_at:
+                metrics.increment("deadlines_exceeded_total", section=label)
+                raise DeadlineExceeded(f"No answer within {deadline:.0f}s")
+            if hedge_at is not None and now >= hedge_at:
+                hedge_at = None
+                if can_hedge is None or can_hedge():
+                    metrics.increment("hedges_total", section=label)
+                    pending.add(asyncio.ensure_future(make_call()))
+                continue
+
+            wake_at = deadline_at if hedge_at is None else min(deadline_at, hedge_at)
+            done, pending = await asyncio.wait(pending, timeout=wake_at - now, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    if task is not primary:
+                        metrics.increment("hedge_wins_total", section=label)
+                    return task.result()
+                error = task.exception()
+        raise error
+    finally:
+        for task in pending:
+            task.cancel()
@@ -0,0 +1,175 @@
+"""
+Persistent store of per-theme-pair insight fragments.
+
+A comparison of two top-5 profiles touches at most 25 theme pairs, and the
+same pairs recur across many comparisons. Fragments are short, name-free
+insights about one pair of themes for one section (conflicts, collaboration
+or communication). They are generated lazily, stored in SQLite, and reused
+by the "fragments" comparison mode, which only needs one small synthesis
+call to turn them into personalised text.
+
+Conflicts and collaboration are symmetric, so their pairs are stored in
+canonical (sorted) order; communication is directional ("how should the
+first theme speak to the second"), so its pairs keep their order.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from itertools import product
+from typing import Dict, List, Tuple
+
+
+FRAGMENT_CACHE_FILE = os.environ.get("FRAGMENT_CACHE_FILE", "insight_fragments.db")
+
+# Highest-ranked theme pairs used per section (a top-5 comparison has at most 25)
+FRAGMENTS_PER_SECTION = int(os.environ.get("FRAGMENTS_PER_SECTION", "12"))
+
+# Sections whose insights do not depend on which person holds which theme
+SYMMETRIC_SECTIONS = ("conflicts", "collaboration")
+
+ThemePair = Tuple[str, str]
+
+
+def canonical_pair(section: str, theme_a: str, theme_b: str) -> ThemePair:
+    """Return the stored form of a theme pair for a section."""
+    if section in SYMMETRIC_SECTIONS and theme_b < theme_a:
+        return theme_b, theme_a
+    return theme_a, theme_b
+
+
+def ranked_pairs(section: str, person1_strengths: List[str], person2_strengths: List[str],
+                 limit: int = FRAGMENTS_PER_SECTION) -> List[ThemePair]:
+    """
+    Pick the theme pairs that matter most for one section of a comparison.
+
+    Pairs are ordered by the combined rank of their two themes, so both
+    people's #1 strengths come first.
+
+    Args:
+        section (str): Comparison section
+        person1_strengths (list): Ranked strengths for person 1
+        person2_strengths (list): Ranked strengths for person 2
+        limit (int): Maximum number of pairs
+
+    Returns:
+        list: Distinct canonical (theme_a, theme_b) pairs, most important first
+    """
+    ordered = sorted(
+        product(enumerate(person1_strengths), enumerate(person2_strengths)),
+        key=lambda ranked: (ranked[0][0] + ranked[1][0], ranked[0][0])
+    )
+    pairs = {}
+    for (_, theme_a), (_, theme_b) in ordered:
+        pairs.setdefault(canonical_pair(section, theme_a, theme_b), None)
+    return list(pairs)[:limit]
+
+
+class FragmentStore:
+    """
+    SQLite-backed store of insight fragments keyed by section, theme pair and prompt version.
+    """
+
+    def __init__(self, path: str = FRAGMENT_CACHE_FILE):
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS fragments ("
+            " section TEXT NOT NULL,"
+            " theme_a TEXT NOT NULL,"
+            " theme_b TEXT NOT NULL,"
+            " version TEXT NOT NULL,"
+            " text TEXT NOT NULL,"
+            " created_at REAL NOT NULL,"
+            " PRIMARY KEY (section, theme_a, theme_b, version))"
+        )
+        self._conn.commit()
+
+    def get_many(self, section: str, pairs: List[ThemePair], version: str) -> Dict[ThemePair, str]:
+        """
+        Look up the fragments for several pairs of one section.
+
+        Args:
+            section (str): Comparison section
+            pairs (list): Canonical theme pairs
+            version (str): Fragment prompt version
+
+        Returns:
+            dict: Found fragments keyed by pair (missing pairs are absent)
+        """
+        if not pairs:
+            return {}
+        wanted = set(pairs)
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT theme_a, theme_b, text FROM fragments WHERE section = ? AND version = ? "
+                f"AND theme_a IN ({','.join('?' * len({a for a, _ in wanted}))})",
+                [section, version] + sorted({a for a, _ in wanted})
+            ).fetchall()
+            found = {(a, b): text for a, b, text in rows if (a, b) in wanted}
+            self.hits += len(found)
+            self.misses += len(wanted) - len(found)
+        return found
+
+    def set_many(self, section: str, fragments: Dict[ThemePair, str], version: str) -> None:
+        """
+        Store fragments for one section.
+
+        Args:
+            section (str): Comparison section
+            fragments (dict): Fragment text keyed by canonical pair
+            version (str): Fragment prompt version
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.executemany(
+                "INSERT INTO fragments (section, theme_a, theme_b, version, text, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(section, theme_a, theme_b, version) DO UPDATE SET "
+                "text = excluded.text, created_at = excluded.created_at",
+                [(section, a, b, version, text, now) for (a, b), text in fragments.items()]
+            )
+            self._conn.commit()
+
+    def clear(self) -> None:
+        """Remove every fragment and reset the counters."""
+        with self._lock:
+            self._conn.execute("DELETE FROM fragments")
+            self._conn.commit()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Report fragment counters.
+
+        Returns:
+            dict: hits and misses (counted per pair) and fragments currently stored
+        """
+        with self._lock:
+            count = self._conn.execute("SELECT COUNT(*) FROM fragments").fetchone()[0]
+            return {"hits": self.hits, "misses": self.misses, "fragments": count}
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_fragment_store() -> FragmentStore:
+    """
+    Return the process-wide fragment store.
+
+    Returns:
+        FragmentStore: The shared store
+    """
+    global _store
+
+    with _store_lock:
+        if _store is None:
+            _store = FragmentStore()
+        return _store
@@ -0,0 +1,284 @@
+"""
+Lightweight in-process instrumentation.
+
+Records timing spans for the app's hot-path stages and per-call OpenAI token
+usage with estimated cost, aggregated into histograms and counters. Metrics
+can be read as a snapshot, rendered in Prometheus text format (optionally
+served on METRICS_PORT), and/or emitted as JSON log lines when
+METRICS_JSON_LOG is enabled.
+"""
+
+import bisect
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional, Tuple
+
+
+METRICS_JSON_LOG = os.environ.get("METRICS_JSON_LOG", "0") in ("1", "true", "True")
+METRICS_PORT = os.environ.get("METRICS_PORT")
+
+# Histogram bucket upper bounds, in seconds
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# USD per 1M tokens: (input, cached input, output)
+MODEL_PRICES = {
+    "gpt-4o": (2.50, 1.25, 10.00),
+    "gpt-4o-mini": (0.15, 0.075, 0.60),
+}
+
+logger = logging.getLogger("strengths.metrics")
+if METRICS_JSON_LOG and not logger.handlers:
+    _handler = logging.StreamHandler()
+    _handler.setFormatter(logging.Formatter("%(message)s"))
+    logger.addHandler(_handler)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+
+def estimate_cost(model: str, prompt_tokens: int, completion_tokens: int, cached_tokens: int = 0) -> float:
+    """
+    Estimate the USD cost of a completion.
+
+    Args:
+        model (str): Model name (unknown models are priced as gpt-4o)
+        prompt_tokens (int): Prompt tokens, including cached ones
+        completion_tokens (int): Completion tokens
+        cached_tokens (int): Prompt tokens served from the prompt cache
+
+    Returns:
+        float: Estimated cost in USD
+    """
+    input_price, cached_price, output_price = MODEL_PRICES.get(model, MODEL_PRICES["gpt-4o"])
+    uncached = max(prompt_tokens - cached_tokens, 0)
+    return (uncached * input_price + cached_tokens * cached_price + completion_tokens * output_price) / 1_000_000
+
+
+class Histogram:
+    """Fixed-bucket histogram with sum and count (Prometheus style)."""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q: float) -> float:
+        """Estimate a quantile by linear interpolation within its bucket."""
+        if self.count == 0:
+            return 0.0
+        rank = q * self.count
+        cumulative = 0
+        for index, bucket_count in enumerate(self.counts):
+            if cumulative + bucket_count >= rank and bucket_count:
+                lower = self.buckets[index - 1] if index > 0 else 0.0
+                upper = self.buckets[index] if index < len(self.buckets) else self.buckets[-1]
+                return lower + (upper - lower) * (rank - cumulative) / bucket_count
+            cumulative += bucket_count
+        return self.buckets[-1]
+
+
+def _label_key(labels: Dict[str, str]) -> Tuple:
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+def _format_labels(label_key: Tuple, extra: Optional[Dict[str, str]] = None) -> str:
+    pairs = list(label_key) + list((extra or {}).items())
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{key}="{value}"' for key, value in pairs) + "}"
+
+
+class MetricsRegistry:
+    """Thread-safe store of histograms and counters keyed by name and labels."""
+
+    def __init__(self, prefix: str = "strengths"):
+        self.prefix = prefix
+        self._lock = threading.Lock()
+        self._histograms: Dict[Tuple[str, Tuple], Histogram] = {}
+        self._counters: Dict[Tuple[str, Tuple], float] = {}
+
+    def observe(self, name: str, value: float, **labels) -> None:
+        """Record a value in the named histogram."""
+        key = (name, _label_key(labels))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram()
+            histogram.observe(value)
+
+    def increment(self, name: str, amount: float = 1.0, **labels) -> None:
+        """Add to the named counter."""
+        key = (name, _label_key(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0.0) + amount
+
+    @contextmanager
+    def span(self, stage: str, **labels):
+        """Time a block of code as one observation of the given stage."""
+        started = time.perf_counter()
+        status = "ok"
+        try:
+            yield
+        except BaseException:
+            status = "error"
+            raise
+        finally:
+            elapsed = time.perf_counter() - started
+            self.observe("stage_duration_seconds", elapsed, stage=stage, **labels)
+            if METRICS_JSON_LOG:
+                logger.info(json.dumps({
+                    "event": "span", "stage": stage, "seconds": round(elapsed, 6),
+                    "status": status, **labels
+                }))
+
+    def record_usage(self, model: str, duration: float, prompt_tokens: int = 0,
+                     completion_tokens: int = 0, cached_tokens: int = 0, status: str = "ok") -> None:
+        """
+        Record one OpenAI API call.
+
+        Args:
+            model (str): Model name
+            duration (float): Call duration in seconds
+            prompt_tokens (int): Prompt tokens reported by the API
+            completion_tokens (int): Completion tokens reported by the API
+            cached_tokens (int): Cached prompt tokens reported by the API
+            status (str): "ok" or "error"
+        """
+        cost = estimate_cost(model, prompt_tokens, completion_tokens, cached_tokens)
+        self.observe("openai_request_duration_seconds", duration, model=model)
+        self.increment("openai_requests_total", model=model, status=status)
+        self.increment("openai_tokens_total", prompt_tokens, model=model, kind="prompt")
+        self.increment("openai_tokens_total", completion_tokens, model=model, kind="completion")
+        self.increment("openai_tokens_total", cached_tokens, model=model, kind="cached")
+        self.increment("openai_cost_usd_total", cost, model=model)
+        if METRICS_JSON_LOG:
+            logger.info(json.dumps({
+                "event": "openai_call", "model": model, "seconds": round(duration, 6),
+                "status": status, "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens, "cached_tokens": cached_tokens,
+                "cost_usd": round(cost, 6)
+            }))
+
+    def snapshot(self) -> Dict[str, list]:
+        """
+        Return all metrics as plain data.
+
+        Returns:
+            dict: "histograms" (name, labels, count, sum, p50, p95, p99) and
+                "counters" (name, labels, value)
+        """
+        with self._lock:
+            histograms = [
+                {
+                    "name": name,
+                    "labels": dict(labels),
+                    "count": histogram.count,
+                    "sum": histogram.sum,
+                    "p50": histogram.quantile(0.50),
+                    "p95": histogram.quantile(0.95),
+                    "p99": histogram.quantile(0.99),
+                }
+                for (name, labels), histogram in sorted(self._histograms.items())
+            ]
+            counters = [
+                {"name": name, "labels": dict(labels), "value": value}
+                for (name, labels), value in sorted(self._counters.items())
+            ]
+        return {"histograms": histograms, "counters": counters}
+
+    def render_prometheus(self) -> str:
+        """Render all metrics in the Prometheus text exposition format."""
+        lines = []
+        with self._lock:
+            seen = set()
+            for (name, labels), histogram in sorted(self._histograms.items()):
+                metric = f"{self.prefix}_{name}"
+                if metric not in seen:
+                    lines.append(f"# TYPE {metric} histogram")
+                    seen.add(metric)
+                cumulative = 0
+                for bound, bucket_count in zip(histogram.buckets, histogram.counts):
+                    cumulative += bucket_count
+                    lines.append(f"{metric}_bucket{_format_labels(labels, {'le': repr(bound)})} {cumulative}")
+                lines.append(f"{metric}_bucket{_format_labels(labels, {'le': '+Inf'})} {histogram.count}")
+                lines.append(f"{metric}_sum{_format_labels(labels)} {histogram.sum}")
+                lines.append(f"{metric}_count{_format_labels(labels)} {histogram.count}")
+            for (name, labels), value in sorted(self._counters.items()):
+                metric = f"{self.prefix}_{name}"
+                if metric not in seen:
+                    lines.append(f"# TYPE {metric} counter")
+                    seen.add(metric)
+                lines.append(f"{metric}{_format_labels(labels)} {value}")
+        return "\n".join(lines) + "\n"
+
+    def reset(self) -> None:
+        """Drop all recorded metrics."""
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+
+
+metrics = MetricsRegistry()
+
+
+_server = None
+_server_lock = threading.Lock()
+
+
+def start_metrics_server(port: int, host: str = "0.0.0.0"):
+    """
+    Serve /metrics in Prometheus text format on a background thread.
+
+    Idempotent: only the first call in a process starts a server.
+
+    Args:
+        port (int): Port to listen on
+        host (str): Interface to bind
+
+    Returns:
+        ThreadingHTTPServer: The running server
+    """
+    global _server
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def log_message(self, format, *args):
+            pass
+
+        def do_GET(self):
+            if self.path.rstrip("/") != "/metrics":
+                self.send_error(404)
+                return
+            body = metrics.render_prometheus().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    with _server_lock:
+        if _server is None:
+            _server = ThreadingHTTPServer((host, port), MetricsHandler)
+            _server.daemon_threads = True
+            threading.Thread(target=_server.serve_forever, name="metrics-server", daemon=True).start()
+        return _server
+
+
+def maybe_start_metrics_server():
+    """Start the metrics server if METRICS_PORT is configured; errors are logged, not raised."""
+    if not METRICS_PORT:
+        return None
+    try:
+        return start_metrics_server(int(METRICS_PORT))
+    except Exception as e:
+        print(f"Error starting metrics server: {e}")
+        return None
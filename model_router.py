@@ -0,0 +1,291 @@
+"""
+Latency-aware routing of comparison calls to a model and output budget.
+
+Each section call asks the router for a Route (tier, model, max_tokens). The
+router predicts how long the standard route would take as the expected wait
+in the shared API scheduler's queue plus the p95 service time it recently
+observed for that model. Service time is measured from the moment a request
+leaves the queue, so queueing is never counted twice. If the prediction
+misses the latency SLO it degrades to the next tier of the policy (by default
+a faster, cheaper model). If even the last tier would miss, it shrinks that
+tier's output budget. Every tier shares the same queue, so when the queue
+wait alone exceeds the SLO the standard route is kept: a smaller model or
+budget would lose quality without finishing any sooner. A "deep" request
+(the app's on-demand deep analysis) always gets the deep tier.
+
+Every decision and every call's measured latency, queue wait included, are
+recorded in metrics (``routes_total`` and ``route_latency_seconds``), so the
+p95 per route can be watched against the target. The service times alone
+give the p90 latencies after which hedging.py starts a second attempt.
+
+The policy is a JSON object; MODEL_ROUTING_POLICY may name a file that
+overrides any part of DEFAULT_POLICY:
+
+    {
+      "slo_seconds": 20,
+      "tiers": {
+        "standard": {"model": "gpt-4o", "max_tokens": 800},
+        "fast": {"model": "gpt-4o-mini", "max_tokens": 600,
+                 "sections": {"communication": 400}},
+        "deep": {"model": "gpt-4o", "max_tokens": 1600}
+      },
+      "degrade": ["standard", "fast"],
+      "min_max_tokens": 300
+    }
+"""
+
+import json
+import os
+import threading
+import time
+from collections import deque
+from typing import Dict, NamedTuple, Optional
+
+from metrics import metrics
+from rate_limiter import get_scheduler
+
+
+MODEL_ROUTING_ENABLED = os.environ.get("MODEL_ROUTING_ENABLED", "1") not in ("0", "false", "False")
+MODEL_ROUTING_POLICY = os.environ.get("MODEL_ROUTING_POLICY") or None
+
+# Recent call latencies kept per model for the prediction, and how long they count.
+# Samples age out so a model that was avoided under load is tried again later.
+ROUTING_WINDOW = int(os.environ.get("ROUTING_WINDOW", "100"))
+ROUTING_SAMPLE_TTL = float(os.environ.get("ROUTING_SAMPLE_TTL", "300"))
+
+# Analysis depths a caller can ask for
+DEPTHS = ("standard", "deep")
+
+DEFAULT_POLICY = {
+    "slo_seconds": float(os.environ.get("ROUTING_SLO_SECONDS", "20")),
+    "tiers": {
+        "standard": {"model": "gpt-4o", "max_tokens": 800},
+        "fast": {"model": "gpt-4o-mini", "max_tokens": 600},
+        "deep": {"model": "gpt-4o", "max_tokens": 1600},
+    },
+    "degrade": ["standard", "fast"],
+    "min_max_tokens": 300,
+}
+
+
+class Route(NamedTuple):
+    """Where one section call is sent."""
+    tier: str
+    model: str
+    max_tokens: int
+
+
+def load_policy(path: Optional[str] = MODEL_ROUTING_POLICY) -> Dict:
+    """
+    Build the routing policy from DEFAULT_POLICY and an optional JSON file.
+
+    Args:
+        path (str): JSON file whose keys override the defaults (tiers are merged by name)
+
+    Returns:
+        dict: The policy
+
+    Raises:
+        ValueError: If the file is unreadable or names an unknown tier
+    """
+    policy = json.loads(json.dumps(DEFAULT_POLICY))
+    if path:
+        try:
+            with open(path, 'r') as f:
+                overrides = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            raise ValueError(f"Cannot read MODEL_ROUTING_POLICY {path!r}: {e}")
+        for name, tier in overrides.pop("tiers", {}).items():
+            policy["tiers"].setdefault(name, {}).update(tier)
+        policy.update(overrides)
+
+    for name in list(policy["degrade"]) + ["deep"]:
+        tier = policy["tiers"].get(name)
+        if not tier or "model" not in tier or "max_tokens" not in tier:
+            raise ValueError(f"Routing policy tier {name!r} needs a model and max_tokens")
+    return policy
+
+
+def _percentile(values, q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(int(q * len(ordered)), len(ordered) - 1)]
+
+
+class ModelRouter:
+    """
+    Chooses a Route per section call from the policy, recent latencies and queue depth.
+    """
+
+    def __init__(self, policy: Optional[Dict] = None, scheduler=None, enabled: bool = MODEL_ROUTING_ENABLED):
+        self.policy = policy or load_policy()
+        self.scheduler = scheduler or get_scheduler()
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        # (time, service seconds per budgeted output token) for recent successful calls, per model
+        self._samples: Dict[str, deque] = {}
+        # (time, seconds to the first streamed token) for recent streams, per model
+        self._first_token: Dict[str, deque] = {}
+
+    def tier_route(self, tier: str, section: Optional[str] = None) -> Route:
+        """Return the unadjusted route of a tier for a section."""
+        config = self.policy["tiers"][tier]
+        max_tokens = config.get("sections", {}).get(section, config["max_tokens"])
+        return Route(tier, config["model"], int(max_tokens))
+
+    def default_route(self, section: Optional[str] = None, depth: str = "standard") -> Route:
+        """The route used without load adjustment: the deep tier, or the first tier of the policy."""
+        if depth == "deep":
+            return self.tier_route("deep", section)
+        return self.tier_route(self.policy["degrade"][0], section)
+
+    def queue_wait(self) -> float:
+        """Estimated seconds a new call waits in the scheduler queue."""
+        depth = self.scheduler.stats()["queue_depth"]
+        if not depth:
+            return 0.0
+        return depth / max(self.scheduler.requests.rate, 1e-9)
+
+    def _recent(self, samples_by_model: Dict[str, deque], model: str) -> list:
+        """Drop expired samples of a model and return the remaining values."""
+        with self._lock:
+            samples = samples_by_model.get(model)
+            if not samples:
+                return []
+            cutoff = time.monotonic() - ROUTING_SAMPLE_TTL
+            while samples and samples[0][0] < cutoff:
+                samples.popleft()
+            return [value for _, value in samples]
+
+    def predict_service(self, route: Route) -> float:
+        """
+        Predict the p95 service time of a route (after it leaves the queue).
+
+        Returns 0 for a model with no observations yet, so new routes are tried.
+        """
+        values = self._recent(self._samples, route.model)
+        if not values:
+            return 0.0
+        return _percentile(values, 0.95) * route.max_tokens
+
+    def predict(self, route: Route) -> float:
+        """Predict the p95 latency of a route: the current queue wait plus its p95 service time."""
+        return self.queue_wait() + self.predict_service(route)
+
+    def observed_p90(self, route: Route, first_token: bool = False) -> Optional[float]:
+        """
+        Return the p90 latency recently observed on a route.
+
+        Args:
+            route (Route): The route
+            first_token (bool): Time to the first streamed token instead of the whole call
+
+        Returns:
+            float: Seconds, or None without recent observations
+        """
+        if first_token:
+            values = self._recent(self._first_token, route.model)
+            return _percentile(values, 0.90) if values else None
+        values = self._recent(self._samples, route.model)
+        return _percentile(values, 0.90) * route.max_tokens if values else None
+
+    def route(self, section: Optional[str] = None, depth: str = "standard") -> Route:
+        """
+        Choose the route for one section call.
+
+        Args:
+            section (str): Comparison section (per-section budgets may apply)
+            depth (str): One of DEPTHS; "deep" always uses the deep tier
+
+        Returns:
+            Route: The chosen route
+        """
+        if depth not in DEPTHS:
+            raise ValueError(f"Unknown analysis depth: {depth!r}. Expected one of {', '.join(DEPTHS)}.")
+
+        slo = self.policy["slo_seconds"]
+        wait = self.queue_wait() if self.enabled and depth != "deep" else 0.0
+        if not self.enabled or depth == "deep" or wait >= slo:
+            # Every tier waits in the same queue, so no route would be faster when it dominates
+            chosen = self.default_route(section, depth)
+        else:
+            chosen = None
+            for tier in self.policy["degrade"]:
+                candidate = self.tier_route(tier, section)
+                service = self.predict_service(candidate)
+                if wait + service <= slo:
+                    chosen = candidate
+                    break
+            if chosen is None:
+                # Even the last tier misses the SLO: trim its output budget to the time left after queueing
+                budget = int(candidate.max_tokens * (slo - wait) / service)
+                chosen = candidate._replace(max_tokens=max(budget, self.policy["min_max_tokens"]))
+
+        metrics.increment("routes_total", tier=chosen.tier, model=chosen.model, section=section or "")
+        return chosen
+
+    def record(self, route: Route, latency: float, ok: bool = True, queued: float = 0.0) -> None:
+        """
+        Record a finished call on a route.
+
+        Args:
+            route (Route): The route the call used
+            latency (float): Service seconds, from the last send to the answer
+            ok (bool): False for failed calls (they are not used for prediction)
+            queued (float): Seconds spent before the last send (queue wait and
+                earlier failed attempts); only counted in the latency metric
+        """
+        metrics.observe("route_latency_seconds", queued + latency, tier=route.tier, model=route.model,
+                        status="ok" if ok else "error")
+        if not ok or route.max_tokens <= 0:
+            return
+        with self._lock:
+            samples = self._samples.setdefault(route.model, deque(maxlen=ROUTING_WINDOW))
+            samples.append((time.monotonic(), latency / route.max_tokens))
+
+    def record_first_token(self, route: Route, latency: float) -> None:
+        """Record the time a stream on a route took from being sent to its first token."""
+        with self._lock:
+            samples = self._first_token.setdefault(route.model, deque(maxlen=ROUTING_WINDOW))
+            samples.append((time.monotonic(), latency))
+
+    def stats(self) -> Dict:
+        """
+        Report the routing inputs.
+
+        Returns:
+            dict: slo_seconds, queue_wait_seconds and, per tier, the route and
+                its predicted p95 latency
+        """
+        tiers = {}
+        for tier in self.policy["tiers"]:
+            route = self.tier_route(tier)
+            tiers[tier] = {
+                "model": route.model,
+                "max_tokens": route.max_tokens,
+                "predicted_p95_seconds": round(self.predict(route), 3),
+            }
+        return {
+            "enabled": self.enabled,
+            "slo_seconds": self.policy["slo_seconds"],
+            "queue_wait_seconds": round(self.queue_wait(), 3),
+            "tiers": tiers,
+        }
+
+
+_router = None
+_router_lock = threading.Lock()
+
+
+def get_router() -> ModelRouter:
+    """
+    Return the process-wide model router.
+
+    Returns:
+        ModelRouter: The shared router
+    """
+    global _router
+
+    with _router_lock:
+        if _router is None:
+            _router = ModelRouter()
+        return _router
@@ -2,21 +2,139 @@
 OpenAI service module for CliftonStrengths comparison.
 """
 
+import asyncio
+import atexit
+import json
 import os
+import queue
+import threading
+import time
+from concurrent.futures import FIRST_EXCEPTION, ThreadPoolExecutor, wait
+
+import httpx
 import streamlit as st
-from openai import OpenAI
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient, DefaultHttpxClient, OpenAI
 
+from comparison_cache import get_comparison_cache, make_cache_key
+from fallbacks import fallback_section, is_degraded
+from hedging import SECTION_DEADLINE_SECONDS, DeadlineExceeded, hedge_delay, hedged_call, hedged_call_async
+from insight_fragments import canonical_pair, get_fragment_store, ranked_pairs
+from metrics import metrics
+from model_router import DEPTHS, get_router
+from rate_limiter import PRIORITY_INTERACTIVE, estimate_tokens, get_scheduler
+from singleflight import get_comparison_flights
 
-def get_openai_client():
+
+MODEL = "gpt-4o"
+DEFAULT_TEMPERATURE = 0.7
+
+# Bump whenever the prompt templates change so cached results are not reused
+PROMPT_VERSION = "1"
+COMBINED_PROMPT_VERSION = "1-combined"
+FRAGMENTS_PROMPT_VERSION = "1-fragments"
+
+# Bump whenever the theme-pair fragment template changes so stored fragments are regenerated
+FRAGMENT_PROMPT_VERSION = "1"
+
+SYSTEM_PROMPT = (
+    "You are an expert in CliftonStrengths assessment and workplace dynamics. "
+    "Provide insightful, practical, and empathetic advice about how people with "
+    "different strength profiles can work together effectively."
+)
+
+# Section names, in the order of the tuple returned by compare_strengths
+SECTIONS = ("conflicts", "collaboration", "communication")
+
+# Comparison execution modes: "sequential" sends the three prompts one after
+# another, "concurrent" sends them all at once from a small thread pool,
+# "combined" asks for all three sections in a single structured-output call,
+# and "fragments" assembles the answer from stored theme-pair insights with
+# one synthesis call (generating any missing insights first).
+COMPARISON_MODES = ("sequential", "concurrent", "combined", "fragments")
+DEFAULT_COMPARISON_MODE = os.environ.get("COMPARISON_MODE", "concurrent")
+
+# Cache-key prompt version for each mode whose output differs from the separate-prompt modes
+MODE_PROMPT_VERSIONS = {
+    "combined": COMBINED_PROMPT_VERSION,
+    "fragments": FRAGMENTS_PROMPT_VERSION,
+}
+
+# JSON schema for the single-call "combined" mode
+COMBINED_RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "strengths_comparison",
+        "strict": True,
+        "schema": {
+            "type": "object",
+            "properties": {section: {"type": "string"} for section in SECTIONS},
+            "required": list(SECTIONS),
+            "additionalProperties": False,
+        },
+    },
+}
+
+# JSON schema for generating theme-pair insight fragments
+FRAGMENT_RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "theme_pair_insights",
+        "strict": True,
+        "schema": {
+            "type": "object",
+            "properties": {
+                "insights": {
+                    "type": "array",
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "theme_a": {"type": "string"},
+                            "theme_b": {"type": "string"},
+                            "insight": {"type": "string"},
+                        },
+                        "required": ["theme_a", "theme_b", "insight"],
+                        "additionalProperties": False,
+                    },
+                },
+            },
+            "required": ["insights"],
+            "additionalProperties": False,
+        },
+    },
+}
+
+# What a fragment says about a pair of themes, per section
+FRAGMENT_TOPICS = {
+    "conflicts": "the potential conflicts or tension between a person with the first theme and a person with the second",
+    "collaboration": "how a person with the first theme and a person with the second can work well together",
+    "communication": "how a person with the first theme should speak to a person with the second to be most effective",
+}
+
+# Per-call timeout (seconds) applied to every completion request
+DEFAULT_CALL_TIMEOUT = float(os.environ.get("OPENAI_CALL_TIMEOUT", "60"))
+
+# Shared client settings: optional alternative endpoint, connection pool limits and timeouts
+OPENAI_BASE_URL = os.environ.get("OPENAI_BASE_URL") or None
+OPENAI_MAX_CONNECTIONS = int(os.environ.get("OPENAI_MAX_CONNECTIONS", "20"))
+OPENAI_MAX_KEEPALIVE_CONNECTIONS = int(os.environ.get("OPENAI_MAX_KEEPALIVE_CONNECTIONS", "10"))
+OPENAI_KEEPALIVE_EXPIRY = float(os.environ.get("OPENAI_KEEPALIVE_EXPIRY", "60"))
+OPENAI_CONNECT_TIMEOUT = float(os.environ.get("OPENAI_CONNECT_TIMEOUT", "10"))
+
+# How often (seconds) the API key is re-resolved to pick up a rotated key
+API_KEY_REFRESH_SECONDS = float(os.environ.get("OPENAI_KEY_REFRESH_SECONDS", "60"))
+
+
+class MissingApiKeyError(ValueError):
+    """Raised when no OpenAI API key is configured."""
+
+
+def get_api_key():
     """
-    Initialize and return OpenAI client.
+    Resolve the OpenAI API key.
     Works with both local .env and Streamlit Cloud secrets.
     
     Returns:
-        OpenAI: Configured OpenAI client
-        
-    Raises:
-        ValueError: If OPENAI_API_KEY is not set
+        str or None: The API key, or None if it is not configured
     """
     # Try Streamlit secrets first (for cloud deployment)
     api_key = None
@@ -31,13 +149,155 @@ def get_openai_client():
     if not api_key:
         api_key = os.environ.get("OPENAI_API_KEY")
     
-    if not api_key:
-        raise ValueError(
-            "OPENAI_API_KEY not found. "
-            "Please set it in Streamlit secrets (for cloud) or as an environment variable (for local)."
-        )
+    return api_key
+
+
+# Process-wide client registry: one pooled client, rebuilt only when the key changes
+_client = None
+_client_key = None
+_key_checked_at = 0.0
+_async_client = None
+_async_client_key = None
+_async_key_checked_at = 0.0
+_client_lock = threading.Lock()
+
+
+def get_openai_client():
+    """
+    Return the shared OpenAI client, creating it on first use.
+    
+    The client keeps a keep-alive connection pool that is reused across
+    comparisons, sessions and reruns. The API key is re-resolved at most every
+    API_KEY_REFRESH_SECONDS and the client is rebuilt only if the key changed.
+    Safe to call from Streamlit (including inside st.cache_resource) and from
+    plain Python.
+    
+    Returns:
+        OpenAI: Configured OpenAI client
+        
+    Raises:
+        MissingApiKeyError: If OPENAI_API_KEY is not set
+    """
+    global _client, _client_key, _key_checked_at
+    
+    with _client_lock:
+        now = time.monotonic()
+        if _client is not None and now - _key_checked_at < API_KEY_REFRESH_SECONDS:
+            return _client
+        
+        api_key = get_api_key()
+        _key_checked_at = now
+        
+        if not api_key:
+            raise MissingApiKeyError(
+                "OPENAI_API_KEY not found. "
+                "Please set it in Streamlit secrets (for cloud) or as an environment variable (for local)."
+            )
+        
+        if _client is None or api_key != _client_key:
+            # A replaced client is not closed here: other threads may still have
+            # requests in flight on it. Its pool is released when it is collected.
+            _client = OpenAI(
+                api_key=api_key,
+                base_url=OPENAI_BASE_URL,
+                max_retries=0,  # retries are handled by the shared scheduler
+                timeout=httpx.Timeout(DEFAULT_CALL_TIMEOUT, connect=OPENAI_CONNECT_TIMEOUT),
+                http_client=DefaultHttpxClient(
+                    limits=httpx.Limits(
+                        max_connections=OPENAI_MAX_CONNECTIONS,
+                        max_keepalive_connections=OPENAI_MAX_KEEPALIVE_CONNECTIONS,
+                        keepalive_expiry=OPENAI_KEEPALIVE_EXPIRY
+                    ),
+                    timeout=httpx.Timeout(DEFAULT_CALL_TIMEOUT, connect=OPENAI_CONNECT_TIMEOUT)
+                )
+            )
+            _client_key = api_key
+        
+        return _client
+
+
+def get_async_openai_client():
+    """
+    Return the shared AsyncOpenAI client used by the HTTP API, creating it on first use.
+    
+    Like get_openai_client, the key is re-resolved at most every
+    API_KEY_REFRESH_SECONDS. The client's connection pool belongs to the event
+    loop that first used it, so it must only be used from one loop (the API
+    server's).
+    
+    Returns:
+        AsyncOpenAI: Configured async OpenAI client
+        
+    Raises:
+        MissingApiKeyError: If OPENAI_API_KEY is not set
+    """
+    global _async_client, _async_client_key, _async_key_checked_at
+    
+    with _client_lock:
+        now = time.monotonic()
+        if _async_client is not None and now - _async_key_checked_at < API_KEY_REFRESH_SECONDS:
+            return _async_client
+        
+        api_key = get_api_key()
+        _async_key_checked_at = now
+        
+        if not api_key:
+            raise MissingApiKeyError(
+                "OPENAI_API_KEY not found. "
+                "Please set it in Streamlit secrets (for cloud) or as an environment variable (for local)."
+            )
+        
+        if _async_client is None or api_key != _async_client_key:
+            _async_client = AsyncOpenAI(
+                api_key=api_key,
+                base_url=OPENAI_BASE_URL,
+                max_retries=0,  # retries are handled by the shared scheduler
+                timeout=httpx.Timeout(DEFAULT_CALL_TIMEOUT, connect=OPENAI_CONNECT_TIMEOUT),
+                http_client=DefaultAsyncHttpxClient(
+                    limits=httpx.Limits(
+                        max_connections=OPENAI_MAX_CONNECTIONS,
+                        max_keepalive_connections=OPENAI_MAX_KEEPALIVE_CONNECTIONS,
+                        keepalive_expiry=OPENAI_KEEPALIVE_EXPIRY
+                    ),
+                    timeout=httpx.Timeout(DEFAULT_CALL_TIMEOUT, connect=OPENAI_CONNECT_TIMEOUT)
+                )
+            )
+            _async_client_key = api_key
+        
+        return _async_client
+
+
+async def close_async_openai_client():
+    """
+    Close the shared async client; call from the event loop that used it.
+    """
+    global _async_client, _async_client_key
+    
+    with _client_lock:
+        client = _async_client
+        _async_client = None
+        _async_client_key = None
+    
+    if client is not None:
+        await client.close()
+
+
+def close_openai_clients():
+    """
+    Close the shared client and its connection pool.
+    
+    Registered with atexit; safe to call more than once.
+    """
+    global _client, _client_key
     
-    return OpenAI(api_key=api_key)
+    with _client_lock:
+        if _client is not None:
+            _client.close()
+        _client = None
+        _client_key = None
+
+
+atexit.register(close_openai_clients)
 
 
 def create_comparison_prompts(person1_name, person1_strengths, person2_name, person2_strengths):
@@ -86,72 +346,1494 @@ def create_comparison_prompts(person1_name, person1_strengths, person2_name, per
     return conflicts_prompt, collaboration_prompt, communication_prompt
 
 
-def get_ai_response(client, prompt, temperature=0.7):
+def create_combined_prompt(person1_name, person1_strengths, person2_name, person2_strengths):
     """
-    Get a response from OpenAI GPT-4o.
+    Create a single prompt asking for all three comparison sections.
+    
+    The shared context is sent once instead of once per section.
+    
+    Args:
+        person1_name (str): Name of first person
+        person1_strengths (list): List of 5 CliftonStrengths for person 1
+        person2_name (str): Name of second person
+        person2_strengths (list): List of 5 CliftonStrengths for person 2
+        
+    Returns:
+        str: Prompt for a structured (JSON) response
+    """
+    strengths1_str = ", ".join(person1_strengths)
+    strengths2_str = ", ".join(person2_strengths)
+    
+    context = (
+        f"{person1_name}'s top 5 CliftonStrengths are: {strengths1_str}. "
+        f"{person2_name}'s top 5 CliftonStrengths are: {strengths2_str}."
+    )
+    
+    return (
+        f"{context}\n\n"
+        f"Answer the three questions below. Reply with a JSON object whose keys are "
+        f"\"conflicts\", \"collaboration\" and \"communication\"; each value is a "
+        f"Markdown-formatted answer.\n\n"
+        f"conflicts: Based on these CliftonStrengths profiles, what potential conflicts "
+        f"might arise between {person1_name} and {person2_name}? "
+        f"Please provide specific insights about how their different strengths "
+        f"might lead to misunderstandings or tension.\n\n"
+        f"collaboration: How can {person1_name} and {person2_name} work well together? "
+        f"What are the complementary aspects of their strengths? "
+        f"Please provide specific strategies for effective collaboration.\n\n"
+        f"communication: How should {person1_name} speak to {person2_name} to be most effective? "
+        f"What communication style, tone, and approach would resonate best with "
+        f"{person2_name} based on their CliftonStrengths?"
+    )
+
+
+def parse_combined_response(content):
+    """
+    Parse and validate a structured response from the combined mode.
+    
+    Args:
+        content (str): Raw JSON text returned by the model
+        
+    Returns:
+        tuple: (conflicts_response, collaboration_response, communication_response)
+        
+    Raises:
+        ValueError: If the content is not valid JSON or a section is missing or empty
+    """
+    try:
+        data = json.loads(content or "")
+    except json.JSONDecodeError as e:
+        raise ValueError(f"Combined response is not valid JSON: {e}")
+    
+    if not isinstance(data, dict):
+        raise ValueError("Combined response is not a JSON object.")
+    
+    sections = []
+    for section in SECTIONS:
+        text = data.get(section)
+        if not isinstance(text, str) or not text.strip():
+            raise ValueError(f"Combined response is missing the '{section}' section.")
+        sections.append(text.strip())
+    
+    return tuple(sections)
+
+
+def create_fragment_prompt(section, pairs):
+    """
+    Create a prompt asking for name-free insights about several theme pairs.
+    
+    Args:
+        section (str): One of SECTIONS
+        pairs (list): (theme_a, theme_b) pairs
+        
+    Returns:
+        str: Prompt for a structured (JSON) response
+    """
+    pair_lines = "\n".join(f"- {theme_a} | {theme_b}" for theme_a, theme_b in pairs)
+    return (
+        f"For each pair of CliftonStrengths themes below (first theme | second theme), "
+        f"write one or two sentences on {FRAGMENT_TOPICS[section]}. "
+        f"Do not use names. Reply with a JSON object whose \"insights\" list has one "
+        f"entry per pair, with the theme names copied exactly.\n\n"
+        f"{pair_lines}"
+    )
+
+
+def parse_fragment_response(content, section, pairs):
+    """
+    Parse generated fragments, keeping only the requested pairs.
+    
+    Args:
+        content (str): Raw JSON text returned by the model
+        section (str): One of SECTIONS
+        pairs (list): The canonical pairs that were requested
+        
+    Returns:
+        dict: Fragment text keyed by canonical pair
+        
+    Raises:
+        ValueError: If the content is not valid JSON or holds no usable insight
+    """
+    try:
+        data = json.loads(content or "")
+    except json.JSONDecodeError as e:
+        raise ValueError(f"Fragment response is not valid JSON: {e}")
+    
+    insights = data.get("insights") if isinstance(data, dict) else None
+    if not isinstance(insights, list):
+        raise ValueError("Fragment response has no 'insights' list.")
+    
+    wanted = set(pairs)
+    fragments = {}
+    for item in insights:
+        if not isinstance(item, dict) or not isinstance(item.get("insight"), str):
+            continue
+        pair = canonical_pair(section, str(item.get("theme_a", "")).strip(), str(item.get("theme_b", "")).strip())
+        if pair in wanted and item["insight"].strip():
+            fragments[pair] = item["insight"].strip()
+    
+    if not fragments:
+        raise ValueError(f"Fragment response holds none of the requested '{section}' pairs.")
+    return fragments
+
+
+def create_synthesis_prompt(person1_name, person1_strengths, person2_name, person2_strengths, fragments):
+    """
+    Create the prompt that turns theme-pair fragments into a personalised comparison.
+    
+    Args:
+        person1_name (str): Name of first person
+        person1_strengths (list): Ranked strengths for person 1
+        person2_name (str): Name of second person
+        person2_strengths (list): Ranked strengths for person 2
+        fragments (dict): For each section, fragment text keyed by canonical pair
+        
+    Returns:
+        str: Prompt for a structured (JSON) response
+    """
+    def ranked(strengths):
+        return ", ".join(f"#{rank} {theme}" for rank, theme in enumerate(strengths, start=1))
+    
+    rank1 = {theme: rank for rank, theme in enumerate(person1_strengths, start=1)}
+    rank2 = {theme: rank for rank, theme in enumerate(person2_strengths, start=1)}
+    
+    notes = []
+    for section in SECTIONS:
+        notes.append(f"{section} notes:")
+        for theme_a in person1_strengths:
+            for theme_b in person2_strengths:
+                text = fragments[section].get(canonical_pair(section, theme_a, theme_b))
+                if text:
+                    notes.append(
+                        f"- {person1_name}'s #{rank1[theme_a]} {theme_a} × "
+                        f"{person2_name}'s #{rank2[theme_b]} {theme_b}: {text}"
+                    )
+        notes.append("")
+    notes_text = "\n".join(notes)
+    
+    return (
+        f"{person1_name}'s top 5 CliftonStrengths, in rank order: {ranked(person1_strengths)}. "
+        f"{person2_name}'s top 5 CliftonStrengths, in rank order: {ranked(person2_strengths)}.\n\n"
+        f"Below are notes on how their individual themes interact. Using them, and giving "
+        f"more weight to higher-ranked themes, write a personalised answer to each question "
+        f"using both names. Reply with a JSON object whose keys are \"conflicts\", "
+        f"\"collaboration\" and \"communication\"; each value is a Markdown-formatted answer.\n\n"
+        f"conflicts: What potential conflicts might arise between {person1_name} and {person2_name}?\n"
+        f"collaboration: How can {person1_name} and {person2_name} work well together?\n"
+        f"communication: How should {person1_name} speak to {person2_name} to be most effective?\n\n"
+        f"{notes_text}"
+    )
+
+
+def compare_with_fragments(client, person1_name, person1_strengths, person2_name, person2_strengths,
+                           timeout=None, priority=PRIORITY_INTERACTIVE, deadline_at=None, cancel=None):
+    """
+    Compare two people from stored theme-pair fragments plus one synthesis call.
+    
+    Missing fragments are generated first (one call per section that has
+    gaps, sent concurrently) and stored for later comparisons.
+    
+    Args:
+        client: OpenAI client instance
+        person1_name (str): Name of first person
+        person1_strengths (list): Ranked strengths for person 1
+        person2_name (str): Name of second person
+        person2_strengths (list): Ranked strengths for person 2
+        timeout (float): Per-call timeout in seconds (defaults to DEFAULT_CALL_TIMEOUT)
+        priority (int): Scheduling priority for the API calls
+        deadline_at (float): Optional ``time.monotonic()`` time after which no
+            call is sent or retried
+        cancel (threading.Event): Optional event set once the result is no
+            longer wanted; no further call is then sent or retried
+        
+    Returns:
+        tuple: (conflicts_response, collaboration_response, communication_response)
+        
+    Raises:
+        DeadlineExceeded: If a call was still queued at ``deadline_at`` or was cancelled
+        ValueError: If a fragment or synthesis response cannot be used
+        Exception: If any API call fails
+    """
+    if timeout is None:
+        timeout = DEFAULT_CALL_TIMEOUT
+    
+    store = get_fragment_store()
+    wanted = {section: ranked_pairs(section, person1_strengths, person2_strengths) for section in SECTIONS}
+    
+    found = {}
+    for section in SECTIONS:
+        try:
+            found[section] = store.get_many(section, wanted[section], FRAGMENT_PROMPT_VERSION)
+        except Exception as e:
+            print(f"Error reading insight fragments: {e}")
+            found[section] = {}
+    
+    missing = {
+        section: [pair for pair in wanted[section] if pair not in found[section]]
+        for section in SECTIONS
+    }
+    hit_count = sum(len(found[section]) for section in SECTIONS)
+    miss_count = sum(len(missing[section]) for section in SECTIONS)
+    metrics.increment("fragment_lookups_total", hit_count, result="hit")
+    metrics.increment("fragment_lookups_total", miss_count, result="miss")
+    
+    calls = [
+        (lambda section=section, pairs=pairs: (section, parse_fragment_response(
+            get_ai_response(
+                client,
+                create_fragment_prompt(section, pairs),
+                timeout=timeout,
+                max_tokens=80 * len(pairs),
+                response_format=FRAGMENT_RESPONSE_FORMAT,
+                priority=priority,
+                deadline_at=deadline_at,
+                cancel=cancel
+            ),
+            section,
+            pairs
+        )))
+        for section, pairs in missing.items() if pairs
+    ]
+    if calls:
+        for section, generated in run_concurrently(calls, timeout=timeout + 5):
+            found[section].update(generated)
+            try:
+                store.set_many(section, generated, FRAGMENT_PROMPT_VERSION)
+            except Exception as e:
+                print(f"Error writing insight fragments: {e}")
+    
+    with metrics.span("prompt_build"):
+        prompt = create_synthesis_prompt(
+            person1_name, person1_strengths, person2_name, person2_strengths, found
+        )
+    return parse_combined_response(get_ai_response(
+        client,
+        prompt,
+        timeout=timeout,
+        max_tokens=800 * len(SECTIONS),
+        response_format=COMBINED_RESPONSE_FORMAT,
+        priority=priority,
+        deadline_at=deadline_at,
+        cancel=cancel
+    ))
+
+
+def build_messages(prompt):
+    """
+    Build the chat messages for a prompt.
+    
+    Args:
+        prompt (str): The user prompt
+        
+    Returns:
+        list: System and user messages
+    """
+    return [
+        {
+            "role": "system",
+            "content": SYSTEM_PROMPT
+        },
+        {
+            "role": "user",
+            "content": prompt
+        }
+    ]
+
+
+def usage_counts(usage):
+    """
+    Extract token counts from a completion's usage block.
+    
+    Args:
+        usage: The ``usage`` object of a completion (may be None)
+        
+    Returns:
+        dict: prompt_tokens, completion_tokens and cached_tokens
+    """
+    if usage is None:
+        return {"prompt_tokens": 0, "completion_tokens": 0, "cached_tokens": 0}
+    
+    details = getattr(usage, "prompt_tokens_details", None)
+    return {
+        "prompt_tokens": usage.prompt_tokens or 0,
+        "completion_tokens": usage.completion_tokens or 0,
+        "cached_tokens": (getattr(details, "cached_tokens", None) or 0) if details else 0,
+    }
+
+
+def request_timeout(timeout, deadline_at=None):
+    """
+    Build the per-request timeout option, shortened to the time left before a deadline.
+    
+    Args:
+        timeout (float): Per-call timeout in seconds, or None for the client default
+        deadline_at (float): Optional ``time.monotonic()`` deadline
+        
+    Returns:
+        dict: ``{"timeout": seconds}``, or an empty dict for the client default
+    """
+    if deadline_at is not None:
+        remaining = max(deadline_at - time.monotonic(), 0.001)
+        timeout = remaining if timeout is None else min(timeout, remaining)
+    return {} if timeout is None else {"timeout": timeout}
+
+
+def get_ai_response(client, prompt, temperature=DEFAULT_TEMPERATURE, timeout=None,
+                    max_tokens=800, response_format=None, priority=PRIORITY_INTERACTIVE, model=MODEL,
+                    deadline_at=None, on_send=None, cancel=None):
+    """
+    Get a response from OpenAI (GPT-4o unless another model is given).
+    
+    The request goes through the shared scheduler, which applies the rate
+    limits and retries transient failures with backoff.
     
     Args:
         client (OpenAI): OpenAI client instance
         prompt (str): The prompt to send
         temperature (float): Temperature parameter for response variability
+        timeout (float): Optional per-call timeout in seconds
+        max_tokens (int): Maximum number of completion tokens
+        response_format (dict): Optional structured-output format
+        priority (int): Scheduling priority (lower is served first)
+        model (str): Model to call
+        deadline_at (float): Optional ``time.monotonic()`` time after which the
+            request is neither sent nor retried
+        on_send (callable): Optional zero-argument callback run each time the
+            request leaves the scheduler queue
+        cancel (threading.Event): Optional event set once the answer is no
+            longer wanted; the request is then neither sent nor retried
         
     Returns:
         str: AI-generated response
         
     Raises:
+        DeadlineExceeded: If the request was still queued at ``deadline_at``
+            or was cancelled
         Exception: If API call fails
     """
+    request_options = {}
+    if response_format is not None:
+        request_options["response_format"] = response_format
+    
+    started = time.perf_counter()
     try:
-        response = client.chat.completions.create(
-            model="gpt-4o",
-            messages=[
-                {
-                    "role": "system",
-                    "content": (
-                        "You are an expert in CliftonStrengths assessment and workplace dynamics. "
-                        "Provide insightful, practical, and empathetic advice about how people with "
-                        "different strength profiles can work together effectively."
-                    )
-                },
-                {
-                    "role": "user",
-                    "content": prompt
-                }
-            ],
-            temperature=temperature,
-            max_tokens=800
+        response = get_scheduler().run(
+            lambda: client.chat.completions.create(
+                model=model,
+                messages=build_messages(prompt),
+                temperature=temperature,
+                max_tokens=max_tokens,
+                **request_options,
+                **request_timeout(timeout, deadline_at)
+            ),
+            tokens=estimate_tokens(SYSTEM_PROMPT + prompt) + max_tokens,
+            priority=priority,
+            usage=lambda response: response.usage.total_tokens if response.usage else None,
+            deadline_at=deadline_at,
+            on_send=on_send,
+            cancel=cancel
+        )
+    except DeadlineExceeded:
+        metrics.record_usage(model, time.perf_counter() - started, status="error")
+        raise
+    except Exception as e:
+        metrics.record_usage(model, time.perf_counter() - started, status="error")
+        raise Exception(f"OpenAI API error: {str(e)}")
+    
+    metrics.record_usage(model, time.perf_counter() - started, **usage_counts(response.usage))
+    return response.choices[0].message.content
+
+
+def stream_ai_response(client, prompt, temperature=DEFAULT_TEMPERATURE, timeout=None,
+                       priority=PRIORITY_INTERACTIVE, model=MODEL, max_tokens=800,
+                       deadline_at=None, on_send=None, cancel=None):
+    """
+    Stream a response from OpenAI (GPT-4o unless another model is given).
+    
+    Opening the stream goes through the shared scheduler; failures after the
+    first delta has been yielded are not retried.
+    
+    Args:
+        client (OpenAI): OpenAI client instance
+        prompt (str): The prompt to send
+        temperature (float): Temperature parameter for response variability
+        timeout (float): Optional per-call timeout in seconds
+        priority (int): Scheduling priority (lower is served first)
+        model (str): Model to call
+        max_tokens (int): Maximum number of completion tokens
+        deadline_at (float): Optional ``time.monotonic()`` time after which the
+            stream is neither opened nor retried
+        on_send (callable): Optional zero-argument callback run each time the
+            request leaves the scheduler queue
+        cancel (threading.Event): Optional event set once the stream is no
+            longer wanted; it is then neither opened nor retried
+        
+    Yields:
+        str: Content deltas as they arrive
+        
+    Raises:
+        DeadlineExceeded: If the request was still queued at ``deadline_at``
+            or was cancelled
+        Exception: If API call fails
+    """
+    started = time.perf_counter()
+    usage = None
+    try:
+        stream = get_scheduler().run(
+            lambda: client.chat.completions.create(
+                model=model,
+                messages=build_messages(prompt),
+                temperature=temperature,
+                max_tokens=max_tokens,
+                stream=True,
+                stream_options={"include_usage": True},
+                **request_timeout(timeout, deadline_at)
+            ),
+            tokens=estimate_tokens(SYSTEM_PROMPT + prompt) + max_tokens,
+            priority=priority,
+            deadline_at=deadline_at,
+            on_send=on_send,
+            cancel=cancel
         )
-        return response.choices[0].message.content
+        try:
+            for chunk in stream:
+                if getattr(chunk, "usage", None):
+                    usage = chunk.usage
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+        finally:
+            stream.close()
+    except DeadlineExceeded:
+        metrics.record_usage(model, time.perf_counter() - started, status="error")
+        raise
     except Exception as e:
+        metrics.record_usage(model, time.perf_counter() - started, status="error")
         raise Exception(f"OpenAI API error: {str(e)}")
+    
+    metrics.record_usage(model, time.perf_counter() - started, **usage_counts(usage))
 
 
-def compare_strengths(person1_name, person1_strengths, person2_name, person2_strengths):
+def run_concurrently(calls, timeout=None):
+    """
+    Run zero-argument callables in parallel and collect their results.
+    
+    The first failure cancels every sibling that has not started yet and is
+    re-raised; siblings already in flight are abandoned (they are bounded by
+    their own per-call timeout).
+    
+    Args:
+        calls (list): Callables to run
+        timeout (float): Optional overall timeout in seconds
+        
+    Returns:
+        list: Results in the same order as ``calls``
+        
+    Raises:
+        Exception: The first exception raised by any call, or a timeout error
+    """
+    executor = ThreadPoolExecutor(max_workers=len(calls), thread_name_prefix="openai-call")
+    futures = [executor.submit(call) for call in calls]
+    
+    try:
+        done, not_done = wait(futures, timeout=timeout, return_when=FIRST_EXCEPTION)
+        
+        for future in futures:
+            if future in done and future.exception() is not None:
+                raise future.exception()
+        
+        if not_done:
+            raise Exception(f"OpenAI API error: request timed out after {timeout:.0f}s")
+        
+        return [future.result() for future in futures]
+    finally:
+        for future in futures:
+            future.cancel()
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+async def get_ai_response_async(client, prompt, temperature=DEFAULT_TEMPERATURE, timeout=None,
+                                max_tokens=800, response_format=None, model=MODEL, deadline_at=None,
+                                on_send=None):
+    """
+    Async counterpart of get_ai_response for the AsyncOpenAI client.
+    
+    Args:
+        client (AsyncOpenAI): Async OpenAI client instance
+        prompt (str): The prompt to send
+        temperature (float): Temperature parameter for response variability
+        timeout (float): Optional per-call timeout in seconds
+        max_tokens (int): Maximum number of completion tokens
+        response_format (dict): Optional structured-output format
+        model (str): Model to call
+        deadline_at (float): Optional ``time.monotonic()`` time after which the
+            request is neither sent nor retried
+        on_send (callable): Optional zero-argument callback run each time the
+            request is about to be sent
+        
+    Returns:
+        str: AI-generated response
+        
+    Raises:
+        DeadlineExceeded: If the request could not be sent before ``deadline_at``
+        Exception: If API call fails
+    """
+    request_options = {}
+    if response_format is not None:
+        request_options["response_format"] = response_format
+    
+    started = time.perf_counter()
+    try:
+        response = await get_scheduler().run_async(
+            lambda: client.chat.completions.create(
+                model=model,
+                messages=build_messages(prompt),
+                temperature=temperature,
+                max_tokens=max_tokens,
+                **request_options,
+                **request_timeout(timeout, deadline_at)
+            ),
+            tokens=estimate_tokens(SYSTEM_PROMPT + prompt) + max_tokens,
+            usage=lambda response: response.usage.total_tokens if response.usage else None,
+            deadline_at=deadline_at,
+            on_send=on_send
+        )
+    except DeadlineExceeded:
+        metrics.record_usage(model, time.perf_counter() - started, status="error")
+        raise
+    except Exception as e:
+        metrics.record_usage(model, time.perf_counter() - started, status="error")
+        raise Exception(f"OpenAI API error: {str(e)}")
+    
+    metrics.record_usage(model, time.perf_counter() - started, **usage_counts(response.usage))
+    return response.choices[0].message.content
+
+
+async def gather_or_fail(calls, timeout=None):
+    """
+    Await coroutines concurrently; the first failure or the timeout cancels the rest.
+    
+    Args:
+        calls (list): Coroutines to await
+        timeout (float): Optional overall timeout in seconds
+        
+    Returns:
+        list: Results in the same order as ``calls``
+        
+    Raises:
+        Exception: The first exception raised by any call, or a timeout error
+    """
+    tasks = [asyncio.ensure_future(call) for call in calls]
+    try:
+        done, not_done = await asyncio.wait(tasks, timeout=timeout, return_when=asyncio.FIRST_EXCEPTION)
+        
+        for task in tasks:
+            if task in done and task.exception() is not None:
+                raise task.exception()
+        
+        if not_done:
+            raise Exception(f"OpenAI API error: request timed out after {timeout:.0f}s")
+        
+        return [task.result() for task in tasks]
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+def default_routes(depth="standard"):
+    """
+    Return the unadjusted route of every section for an analysis depth.
+    
+    Args:
+        depth (str): One of DEPTHS
+        
+    Returns:
+        list: One Route per entry in SECTIONS
+    """
+    router = get_router()
+    return [router.default_route(section, depth) for section in SECTIONS]
+
+
+def route_signature(routes):
+    """
+    Describe the routes of a comparison for its cache key.
+    
+    The built-in standard routes map to MODEL, so those cache keys are the
+    same as before routing existed; any other set of routes gets its own key.
+    
+    Args:
+        routes (list): One Route per entry in SECTIONS
+        
+    Returns:
+        str: Model component of the cache key
+    """
+    if all(route.model == MODEL and route.max_tokens == 800 for route in routes):
+        return MODEL
+    return "|".join(f"{route.model}/{route.max_tokens}" for route in routes)
+
+
+def record_service_time(router, route, started, sent, ok=True):
+    """
+    Record a routed call with the router, separating queue wait from service time.
+    
+    Args:
+        router (ModelRouter): The router
+        route (Route): The route the call used
+        started (float): ``time.perf_counter()`` when the call was made
+        sent (list): ``time.perf_counter()`` of each send, empty if nothing was sent
+        ok (bool): False for failed calls
+    """
+    now = time.perf_counter()
+    sent_at = sent[-1] if sent else now
+    router.record(route, now - sent_at, ok=ok, queued=sent_at - started)
+
+
+def get_routed_response(client, section, prompt, depth="standard", timeout=None,
+                        priority=PRIORITY_INTERACTIVE, deadline=None):
+    """
+    Get one section response on the route chosen by the model router.
+    
+    With a deadline, a hedge (a second identical request) is sent once the
+    call passes the route's observed p90 latency and the first answer wins.
+    
+    Args:
+        client (OpenAI): OpenAI client instance
+        section (str): Section the prompt belongs to
+        prompt (str): The prompt to send
+        depth (str): One of DEPTHS
+        timeout (float): Optional per-call timeout in seconds
+        priority (int): Scheduling priority (lower is served first)
+        deadline (float): Optional overall deadline in seconds, including hedges and retries
+        
+    Returns:
+        tuple: (response, Route)
+        
+    Raises:
+        DeadlineExceeded: If the deadline passed without an answer
+        Exception: If API call fails
+    """
+    router = get_router()
+    route = router.route(section, depth)
+    deadline_at = time.monotonic() + deadline if deadline is not None else None
+    
+    def attempt(cancel=None):
+        started = time.perf_counter()
+        sent = []
+        try:
+            response = get_ai_response(
+                client, prompt, timeout=timeout, max_tokens=route.max_tokens,
+                priority=priority, model=route.model, deadline_at=deadline_at,
+                on_send=lambda: sent.append(time.perf_counter()), cancel=cancel
+            )
+        except Exception:
+            record_service_time(router, route, started, sent, ok=False)
+            raise
+        record_service_time(router, route, started, sent)
+        return response
+    
+    if deadline is None:
+        return attempt(), route
+    
+    tokens = estimate_tokens(SYSTEM_PROMPT + prompt) + route.max_tokens
+    response = hedged_call(
+        attempt,
+        deadline,
+        hedge_after=hedge_delay(router.observed_p90(route)),
+        can_hedge=lambda: get_scheduler().has_capacity(tokens),
+        label=section
+    )
+    return response, route
+
+
+async def get_routed_response_async(client, section, prompt, depth="standard", timeout=None, deadline=None):
+    """
+    Async counterpart of get_routed_response for the AsyncOpenAI client.
+    
+    Args:
+        client (AsyncOpenAI): Async OpenAI client instance
+        section (str): Section the prompt belongs to
+        prompt (str): The prompt to send
+        depth (str): One of DEPTHS
+        timeout (float): Optional per-call timeout in seconds
+        deadline (float): Optional overall deadline in seconds, including hedges and retries
+        
+    Returns:
+        tuple: (response, Route)
+        
+    Raises:
+        DeadlineExceeded: If the deadline passed without an answer
+        Exception: If API call fails
+    """
+    router = get_router()
+    route = router.route(section, depth)
+    deadline_at = time.monotonic() + deadline if deadline is not None else None
+    
+    async def attempt():
+        started = time.perf_counter()
+        sent = []
+        try:
+            response = await get_ai_response_async(
+                client, prompt, timeout=timeout, max_tokens=route.max_tokens, model=route.model,
+                deadline_at=deadline_at, on_send=lambda: sent.append(time.perf_counter())
+            )
+        except Exception:
+            record_service_time(router, route, started, sent, ok=False)
+            raise
+        record_service_time(router, route, started, sent)
+        return response
+    
+    if deadline is None:
+        return await attempt(), route
+    
+    tokens = estimate_tokens(SYSTEM_PROMPT + prompt) + route.max_tokens
+    response = await hedged_call_async(
+        attempt,
+        deadline,
+        hedge_after=hedge_delay(router.observed_p90(route)),
+        can_hedge=lambda: get_scheduler().has_capacity(tokens),
+        label=section
+    )
+    return response, route
+
+
+def fallback_sections(person1_name, person1_strengths, person2_name, person2_strengths, sections=SECTIONS):
+    """
+    Build offline fallback text for sections that missed their deadline.
+    
+    Args:
+        person1_name (str): Name of first person
+        person1_strengths (list): List of 5 CliftonStrengths for person 1
+        person2_name (str): Name of second person
+        person2_strengths (list): List of 5 CliftonStrengths for person 2
+        sections (tuple): Sections to build
+        
+    Returns:
+        dict: FallbackText keyed by section
+    """
+    texts = {}
+    for section in sections:
+        texts[section] = fallback_section(
+            section, person1_name, person1_strengths, person2_name, person2_strengths,
+            fragment_version=FRAGMENT_PROMPT_VERSION
+        )
+        metrics.increment("section_fallbacks_total", section=section, source=texts[section].source)
+    return texts
+
+
+def check_depth(mode, depth):
+    """
+    Validate an analysis depth and pick the mode that can serve it.
+    
+    Deep analysis needs per-section output budgets, so the single-call
+    "combined" and "fragments" modes fall back to concurrent section calls.
+    
+    Args:
+        mode (str): One of COMPARISON_MODES
+        depth (str): One of DEPTHS
+        
+    Returns:
+        str: The mode to run
+        
+    Raises:
+        ValueError: If the depth is unknown
+    """
+    if depth not in DEPTHS:
+        raise ValueError(f"Unknown analysis depth: {depth!r}. Expected one of {DEPTHS}.")
+    if depth == "deep" and mode in ("combined", "fragments"):
+        return "concurrent"
+    return mode
+
+
+def is_comparison_cached(person1_name, person1_strengths, person2_name, person2_strengths,
+                         depth="standard", mode=None):
+    """
+    Check whether a comparison is already cached for the streaming view.
+    
+    Args:
+        person1_name (str): Name of first person
+        person1_strengths (list): List of 5 CliftonStrengths for person 1
+        person2_name (str): Name of second person
+        person2_strengths (list): List of 5 CliftonStrengths for person 2
+        depth (str): One of DEPTHS
+        mode (str): One of COMPARISON_MODES (defaults to DEFAULT_COMPARISON_MODE)
+        
+    Returns:
+        bool: True if stream_comparison would be served from the cache
+    """
+    cache = get_comparison_cache()
+    if cache is None:
+        return False
+    
+    # The same key compare_strengths and stream_comparison use for this mode
+    mode = check_depth(mode or DEFAULT_COMPARISON_MODE, depth)
+    signature = route_signature(default_routes(depth)) if mode in ("sequential", "concurrent") else MODEL
+    cache_key = make_cache_key(
+        person1_name, person1_strengths, person2_name, person2_strengths,
+        MODE_PROMPT_VERSIONS.get(mode, PROMPT_VERSION), signature, DEFAULT_TEMPERATURE
+    )
+    try:
+        return cache.contains(cache_key)
+    except Exception as e:
+        print(f"Error reading comparison cache: {e}")
+        return False
+
+
+def estimate_comparison_tokens(person1_name, person1_strengths, person2_name, person2_strengths):
+    """
+    Estimate the tokens a full (three-call) comparison will be charged against the rate limits.
+    
+    Args:
+        person1_name (str): Name of first person
+        person1_strengths (list): List of 5 CliftonStrengths for person 1
+        person2_name (str): Name of second person
+        person2_strengths (list): List of 5 CliftonStrengths for person 2
+        
+    Returns:
+        int: Estimated prompt plus completion tokens
+    """
+    prompts = create_comparison_prompts(person1_name, person1_strengths, person2_name, person2_strengths)
+    return sum(estimate_tokens(SYSTEM_PROMPT + prompt) + 800 for prompt in prompts)
+
+
+def comparison_flight_key(cache_key, priority, use_cache):
+    """
+    Build the single-flight key for a comparison.
+    
+    Only callers with the same priority and cache setting share a run, so an
+    interactive request never inherits a background run's place in the
+    scheduler queue, and a request that bypasses the cache never gets a
+    cached answer through another caller.
+    
+    Args:
+        cache_key (str): Key from make_cache_key
+        priority (int): Scheduling priority of the caller
+        use_cache (bool): Whether the caller reads and writes the cache
+        
+    Returns:
+        str: Key for the single-flight registry
+    """
+    return f"{cache_key}:{priority}:{'cached' if use_cache else 'fresh'}"
+
+
+def comparison_wait(mode, deadline):
+    """
+    Return how long a caller waits for an identical comparison run by someone else.
+    
+    That is as long as the caller's own run could take: one deadline per
+    stage (sequential sections run one after another; combined and
+    fragments may fall back to section calls) plus a small grace period.
+    
+    Args:
+        mode (str): One of COMPARISON_MODES
+        deadline (float): Seconds each stage may take
+        
+    Returns:
+        float: Seconds to wait
+    """
+    stages = {"sequential": len(SECTIONS), "concurrent": 1}.get(mode, 2)
+    return deadline * stages + 5
+
+
+def compare_strengths(person1_name, person1_strengths, person2_name, person2_strengths,
+                      mode=None, timeout=None, use_cache=True, priority=PRIORITY_INTERACTIVE,
+                      depth="standard", deadline=None):
     """
     Compare two people's CliftonStrengths using OpenAI.
     
+    Results are served from the persistent comparison cache when the same
+    comparison has been run before. Identical comparisons (at the same
+    priority and cache setting) requested while one is already running wait
+    for it and share its result or error; a caller still waiting when its
+    own run would have finished gets the offline fallback text instead.
+    
+    Section calls go to the model and output budget chosen by the model
+    router and are hedged once they pass the route's observed p90 latency.
+    A section that has not answered by its deadline is replaced by offline
+    fallback text (a FallbackText, see fallbacks.py). Results with a degraded
+    route or a fallback section are returned but not cached, so the next
+    request for them gets the standard answer again.
+    
     Args:
         person1_name (str): Name of first person
         person1_strengths (list): List of 5 CliftonStrengths for person 1
         person2_name (str): Name of second person
         person2_strengths (list): List of 5 CliftonStrengths for person 2
+        mode (str): One of COMPARISON_MODES (defaults to DEFAULT_COMPARISON_MODE)
+        timeout (float): Per-call timeout in seconds (defaults to DEFAULT_CALL_TIMEOUT)
+        use_cache (bool): Whether to read from and write to the comparison cache
+        priority (int): Scheduling priority for the API calls (lower is served first)
+        depth (str): One of DEPTHS; "deep" asks for the longer deep analysis
+        deadline (float): Seconds each section may take, including hedges and
+            retries (defaults to SECTION_DEADLINE_SECONDS)
         
     Returns:
         tuple: (conflicts_response, collaboration_response, communication_response)
         
     Raises:
+        ValueError: If the mode or depth is unknown or the API key is missing
         Exception: If any API call fails
     """
-    client = get_openai_client()
+    mode = mode or DEFAULT_COMPARISON_MODE
+    if mode not in COMPARISON_MODES:
+        raise ValueError(f"Unknown comparison mode: {mode!r}. Expected one of {COMPARISON_MODES}.")
+    mode = check_depth(mode, depth)
+    
+    if deadline is None:
+        deadline = SECTION_DEADLINE_SECONDS
+    timeout = min(timeout or DEFAULT_CALL_TIMEOUT, deadline)
+    
+    # Combined and fragments calls always use MODEL; section calls are routed
+    signature = route_signature(default_routes(depth)) if mode in ("sequential", "concurrent") else MODEL
+    cache = get_comparison_cache() if use_cache else None
+    cache_key = make_cache_key(
+        person1_name, person1_strengths, person2_name, person2_strengths,
+        MODE_PROMPT_VERSIONS.get(mode, PROMPT_VERSION), signature, DEFAULT_TEMPERATURE
+    )
+    
+    if cache is not None:
+        try:
+            cached = cache.get(cache_key)
+            if cached is not None:
+                return cached
+        except Exception as e:
+            print(f"Error reading comparison cache: {e}")
+    
+    def fallback(sections=SECTIONS):
+        return fallback_sections(person1_name, person1_strengths, person2_name, person2_strengths, sections)
+    
+    def answer(client, section, prompt):
+        try:
+            return get_routed_response(
+                client, section, prompt, depth, timeout=timeout, priority=priority, deadline=deadline
+            )
+        except DeadlineExceeded:
+            return fallback((section,))[section], None
+    
+    def run():
+        client = get_openai_client()
+        
+        result = None
+        routes = None
+        deadline_at = time.monotonic() + deadline
+        try:
+            if mode == "combined":
+                # One structured-output call; fall back to three calls if it cannot be parsed
+                with metrics.span("prompt_build"):
+                    combined_prompt = create_combined_prompt(
+                        person1_name, person1_strengths, person2_name, person2_strengths
+                    )
+                try:
+                    result = parse_combined_response(hedged_call(
+                        lambda cancel: get_ai_response(
+                            client,
+                            combined_prompt,
+                            timeout=timeout,
+                            max_tokens=800 * len(SECTIONS),
+                            response_format=COMBINED_RESPONSE_FORMAT,
+                            priority=priority,
+                            deadline_at=deadline_at,
+                            cancel=cancel
+                        ),
+                        deadline,
+                        label="combined"
+                    ))
+                except ValueError as e:
+                    print(f"Combined comparison failed, falling back to separate calls: {e}")
+            elif mode == "fragments":
+                # Stored theme-pair fragments plus one synthesis call; fall back to three calls on bad output
+                try:
+                    result = hedged_call(
+                        lambda cancel: compare_with_fragments(
+                            client, person1_name, person1_strengths, person2_name, person2_strengths,
+                            timeout=timeout, priority=priority, deadline_at=deadline_at, cancel=cancel
+                        ),
+                        deadline,
+                        label="fragments"
+                    )
+                except ValueError as e:
+                    print(f"Fragment comparison failed, falling back to separate calls: {e}")
+        except DeadlineExceeded:
+            result = tuple(fallback().values())
+        
+        if result is None:
+            # Create the three prompts
+            with metrics.span("prompt_build"):
+                prompts = create_comparison_prompts(
+                    person1_name, person1_strengths, person2_name, person2_strengths
+                )
+        
+            if mode == "sequential":
+                # Get responses for all three questions
+                responses = [answer(client, section, prompt) for section, prompt in zip(SECTIONS, prompts)]
+            else:
+                # Send all three prompts at once; wall-clock time is the slowest call.
+                # Each call stops at the deadline; the overall wait adds a small grace period.
+                calls = [
+                    (lambda section=section, prompt=prompt: answer(client, section, prompt))
+                    for section, prompt in zip(SECTIONS, prompts)
+                ]
+                responses = run_concurrently(calls, timeout=deadline + 5)
+            result = tuple(response for response, _ in responses)
+            routes = [route for _, route in responses]
+        
+        store_key, store_signature = cache_key, signature
+        if routes is not None and mode in ("combined", "fragments"):
+            # Separate calls give the concurrent answer; cache it under that mode's key
+            store_signature = route_signature(default_routes(depth))
+            store_key = make_cache_key(
+                person1_name, person1_strengths, person2_name, person2_strengths,
+                PROMPT_VERSION, store_signature, DEFAULT_TEMPERATURE
+            )
+        
+        # Answers on a degraded route or from a fallback are not cached
+        cacheable = not any(is_degraded(text) for text in result) and (
+            routes is None or route_signature(routes) == store_signature
+        )
+        if cache is not None and cacheable:
+            try:
+                cache.set(store_key, result)
+            except Exception as e:
+                print(f"Error writing comparison cache: {e}")
+        
+        return result
+    
+    try:
+        return get_comparison_flights().do(
+            comparison_flight_key(cache_key, priority, use_cache), run, timeout=comparison_wait(mode, deadline)
+        )
+    except TimeoutError:
+        # We joined another caller's run and it missed our deadline; it keeps running for its own callers
+        return tuple(fallback().values())
+
+
+async def compare_strengths_async(person1_name, person1_strengths, person2_name, person2_strengths,
+                                  mode=None, timeout=None, use_cache=True, depth="standard", deadline=None):
+    """
+    Async counterpart of compare_strengths, used by the HTTP API.
+    
+    Shares the comparison cache and the single-flight registry with
+    compare_strengths, so identical comparisons from the app and the API are
+    only run once. Cache reads and writes, and fallback text, are built in a
+    worker thread; the "fragments" mode runs the synchronous implementation
+    in a worker thread.
+    
+    Args:
+        person1_name (str): Name of first person
+        person1_strengths (list): List of 5 CliftonStrengths for person 1
+        person2_name (str): Name of second person
+        person2_strengths (list): List of 5 CliftonStrengths for person 2
+        mode (str): One of COMPARISON_MODES (defaults to DEFAULT_COMPARISON_MODE)
+        timeout (float): Per-call timeout in seconds (defaults to DEFAULT_CALL_TIMEOUT)
+        use_cache (bool): Whether to read from and write to the comparison cache
+        depth (str): One of DEPTHS; "deep" asks for the longer deep analysis
+        deadline (float): Seconds each section may take, including hedges and
+            retries (defaults to SECTION_DEADLINE_SECONDS)
+        
+    Returns:
+        tuple: (conflicts_response, collaboration_response, communication_response)
+        
+    Raises:
+        ValueError: If the mode or depth is unknown or the API key is missing
+        Exception: If any API call fails
+    """
+    mode = mode or DEFAULT_COMPARISON_MODE
+    if mode not in COMPARISON_MODES:
+        raise ValueError(f"Unknown comparison mode: {mode!r}. Expected one of {COMPARISON_MODES}.")
+    mode = check_depth(mode, depth)
+    
+    if mode == "fragments":
+        return await asyncio.to_thread(
+            compare_strengths, person1_name, person1_strengths, person2_name, person2_strengths,
+            mode=mode, timeout=timeout, use_cache=use_cache, deadline=deadline
+        )
+    
+    if deadline is None:
+        deadline = SECTION_DEADLINE_SECONDS
+    timeout = min(timeout or DEFAULT_CALL_TIMEOUT, deadline)
     
-    # Create the three prompts
-    conflicts_prompt, collaboration_prompt, communication_prompt = create_comparison_prompts(
-        person1_name, person1_strengths, person2_name, person2_strengths
+    signature = route_signature(default_routes(depth)) if mode != "combined" else MODEL
+    cache = get_comparison_cache() if use_cache else None
+    cache_key = make_cache_key(
+        person1_name, person1_strengths, person2_name, person2_strengths,
+        MODE_PROMPT_VERSIONS.get(mode, PROMPT_VERSION), signature, DEFAULT_TEMPERATURE
     )
     
-    # Get responses for all three questions
-    conflicts_response = get_ai_response(client, conflicts_prompt)
-    collaboration_response = get_ai_response(client, collaboration_prompt)
-    communication_response = get_ai_response(client, communication_prompt)
+    if cache is not None:
+        try:
+            cached = await asyncio.to_thread(cache.get, cache_key)
+            if cached is not None:
+                return cached
+        except Exception as e:
+            print(f"Error reading comparison cache: {e}")
     
-    return conflicts_response, collaboration_response, communication_response
+    def fallback(sections=SECTIONS):
+        return asyncio.to_thread(
+            fallback_sections, person1_name, person1_strengths, person2_name, person2_strengths, sections
+        )
+    
+    async def answer(client, section, prompt):
+        try:
+            return await get_routed_response_async(
+                client, section, prompt, depth, timeout=timeout, deadline=deadline
+            )
+        except DeadlineExceeded:
+            return (await fallback((section,)))[section], None
+    
+    async def run():
+        client = get_async_openai_client()
+        
+        result = None
+        routes = None
+        deadline_at = time.monotonic() + deadline
+        if mode == "combined":
+            # One structured-output call; fall back to three calls if it cannot be parsed
+            combined_prompt = create_combined_prompt(
+                person1_name, person1_strengths, person2_name, person2_strengths
+            )
+            try:
+                result = parse_combined_response(await hedged_call_async(
+                    lambda: get_ai_response_async(
+                        client,
+                        combined_prompt,
+                        timeout=timeout,
+                        max_tokens=800 * len(SECTIONS),
+                        response_format=COMBINED_RESPONSE_FORMAT,
+                        deadline_at=deadline_at
+                    ),
+                    deadline,
+                    label="combined"
+                ))
+            except ValueError as e:
+                print(f"Combined comparison failed, falling back to separate calls: {e}")
+            except DeadlineExceeded:
+                result = tuple((await fallback()).values())
+        
+        if result is None:
+            prompts = create_comparison_prompts(
+                person1_name, person1_strengths, person2_name, person2_strengths
+            )
+            if mode == "sequential":
+                responses = [
+                    await answer(client, section, prompt) for section, prompt in zip(SECTIONS, prompts)
+                ]
+            else:
+                responses = await gather_or_fail(
+                    [answer(client, section, prompt) for section, prompt in zip(SECTIONS, prompts)],
+                    timeout=deadline + 5
+                )
+            result = tuple(response for response, _ in responses)
+            routes = [route for _, route in responses]
+        
+        store_key, store_signature = cache_key, signature
+        if routes is not None and mode == "combined":
+            # Separate calls give the concurrent answer; cache it under that mode's key
+            store_signature = route_signature(default_routes(depth))
+            store_key = make_cache_key(
+                person1_name, person1_strengths, person2_name, person2_strengths,
+                PROMPT_VERSION, store_signature, DEFAULT_TEMPERATURE
+            )
+        
+        # Answers on a degraded route or from a fallback are not cached
+        cacheable = not any(is_degraded(text) for text in result) and (
+            routes is None or route_signature(routes) == store_signature
+        )
+        if cache is not None and cacheable:
+            try:
+                await asyncio.to_thread(cache.set, store_key, result)
+            except Exception as e:
+                print(f"Error writing comparison cache: {e}")
+        
+        return result
+    
+    return await get_comparison_flights().do_async(
+        comparison_flight_key(cache_key, PRIORITY_INTERACTIVE, use_cache), run
+    )
+
+
+def stream_comparison(person1_name, person1_strengths, person2_name, person2_strengths,
+                      timeout=None, use_cache=True, mode=None, depth="standard", deadline=None):
+    """
+    Stream a comparison, yielding section-tagged token deltas.
+    
+    All three sections are requested at once, so deltas from different
+    sections are interleaved in arrival order. A cached comparison, or one
+    already running for another caller, is yielded as one delta per section.
+    The single-call "combined" and "fragments" modes cannot be streamed per
+    section; their finished result is yielded the same way.
+    
+    A section that misses its deadline yields its offline fallback as a
+    FallbackText delta (``is_degraded(delta)`` is True), which replaces
+    whatever was yielded for that section before.
+    
+    Args:
+        person1_name (str): Name of first person
+        person1_strengths (list): List of 5 CliftonStrengths for person 1
+        person2_name (str): Name of second person
+        person2_strengths (list): List of 5 CliftonStrengths for person 2
+        timeout (float): Per-call timeout in seconds (defaults to DEFAULT_CALL_TIMEOUT)
+        use_cache (bool): Whether to read from and write to the comparison cache
+        mode (str): Defaults to DEFAULT_COMPARISON_MODE; "combined" and "fragments"
+            run compare_strengths, the other modes stream three calls
+        depth (str): One of DEPTHS; "deep" asks for the longer deep analysis
+        deadline (float): Seconds each section may take (defaults to SECTION_DEADLINE_SECONDS)
+        
+    Yields:
+        tuple: (section, delta) where section is one of SECTIONS
+        
+    Raises:
+        ValueError: If the depth is unknown or the API key is missing
+        Exception: If any API call fails
+    """
+    mode = check_depth(mode or DEFAULT_COMPARISON_MODE, depth)
+    if mode in ("combined", "fragments"):
+        result = compare_strengths(
+            person1_name, person1_strengths, person2_name, person2_strengths,
+            mode=mode, timeout=timeout, use_cache=use_cache, deadline=deadline
+        )
+        for section, text in zip(SECTIONS, result):
+            yield section, text
+        return
+    
+    if deadline is None:
+        deadline = SECTION_DEADLINE_SECONDS
+    timeout = min(timeout or DEFAULT_CALL_TIMEOUT, deadline)
+    
+    signature = route_signature(default_routes(depth))
+    cache = get_comparison_cache() if use_cache else None
+    cache_key = make_cache_key(
+        person1_name, person1_strengths, person2_name, person2_strengths,
+        PROMPT_VERSION, signature, DEFAULT_TEMPERATURE
+    )
+    
+    if cache is not None:
+        try:
+            cached = cache.get(cache_key)
+        except Exception as e:
+            print(f"Error reading comparison cache: {e}")
+            cached = None
+        if cached is not None:
+            for section, text in zip(SECTIONS, cached):
+                yield section, text
+            return
+    
+    def fallback(section):
+        return fallback_sections(
+            person1_name, person1_strengths, person2_name, person2_strengths, (section,)
+        )[section]
+    
+    # Join an identical comparison that is already running, if any
+    flights = get_comparison_flights()
+    flight_key = comparison_flight_key(cache_key, PRIORITY_INTERACTIVE, use_cache)
+    flight, leader = flights.begin(flight_key)
+    if not leader:
+        try:
+            result = flight.result(timeout=comparison_wait("concurrent", deadline))
+        except TimeoutError:
+            # The other run missed our deadline; it keeps running for its own callers
+            result = tuple(fallback(section) for section in SECTIONS)
+        for section, text in zip(SECTIONS, result):
+            yield section, text
+        return
+    
+    parts = {section: [] for section in SECTIONS}
+    fallbacks = {}
+    router = get_router()
+    routes = [router.route(section, depth) for section in SECTIONS]
+    
+    try:
+        client = get_openai_client()
+        with metrics.span("prompt_build"):
+            prompts = create_comparison_prompts(
+                person1_name, person1_strengths, person2_name, person2_strengths
+            )
+        for section, delta in stream_sections(
+            client, prompts, timeout=timeout, routes=routes, deadline=deadline, fallback=fallback
+        ):
+            if is_degraded(delta):
+                fallbacks[section] = delta
+            else:
+                parts[section].append(delta)
+            yield section, delta
+    except GeneratorExit:
+        flights.end(flight_key, flight, error=Exception("Comparison was cancelled before it finished."))
+        raise
+    except BaseException as e:
+        flights.end(flight_key, flight, error=e)
+        raise
+    
+    result = tuple(fallbacks.get(section) or "".join(parts[section]) for section in SECTIONS)
+    flights.end(flight_key, flight, result=result)
+    
+    # Answers on a degraded route or from a fallback are not cached
+    if cache is not None and not fallbacks and route_signature(routes) == signature:
+        try:
+            cache.set(cache_key, result)
+        except Exception as e:
+            print(f"Error writing comparison cache: {e}")
+
+
+# Queued by a stream attempt when its request leaves the scheduler queue
+_SENT = object()
+
+
+def stream_sections(client, prompts, timeout=None, routes=None, deadline=None, fallback=None):
+    """
+    Stream the section prompts concurrently, yielding deltas in arrival order.
+    
+    A stream that has not produced its first token by the route's observed
+    p90 time to first token is hedged: a second identical stream is opened,
+    the first of the two to produce a token is kept and the other is stopped.
+    Each stream's latency is recorded with the model router.
+    
+    Args:
+        client (OpenAI): OpenAI client instance
+        prompts (tuple): One prompt per entry in SECTIONS
+        timeout (float): Per-call timeout in seconds, also the longest wait between
+            deltas once a stream has been sent (time queued in the scheduler
+            is bounded by the deadline instead)
+        routes (list): One Route per entry in SECTIONS (chosen by the router by default)
+        deadline (float): Seconds each section may take to finish (no deadline by default)
+        fallback (callable): Maps a section that missed the deadline (or stalled)
+            to its FallbackText, which is yielded in place of the section;
+            without it a missed deadline raises
+        
+    Yields:
+        tuple: (section, delta) where section is one of SECTIONS
+        
+    Raises:
+        DeadlineExceeded: If a section missed the deadline and there is no fallback
+        Exception: If any stream fails, or stalls without a fallback
+    """
+    # Each attempt pushes (section, attempt, delta, error) items; a None delta marks the end
+    deltas = queue.Queue()
+    router = get_router()
+    if routes is None:
+        routes = [router.route(section) for section in SECTIONS]
+    routes = dict(zip(SECTIONS, routes))
+    prompts = dict(zip(SECTIONS, prompts))
+    stops = {}
+    
+    def pump(section, attempt, stop):
+        route = routes[section]
+        started = time.perf_counter()
+        sent = []
+        
+        def on_send():
+            sent.append(time.perf_counter())
+            deltas.put((section, attempt, _SENT, None))
+        
+        first = True
+        try:
+            for delta in stream_ai_response(
+                client, prompts[section], timeout=timeout, model=route.model, max_tokens=route.max_tokens,
+                deadline_at=deadline_at, on_send=on_send, cancel=stop
+            ):
+                if stop.is_set():
+                    return
+                if first:
+                    router.record_first_token(route, time.perf_counter() - sent[-1])
+                    first = False
+                deltas.put((section, attempt, delta, None))
+            record_service_time(router, route, started, sent)
+            deltas.put((section, attempt, None, None))
+        except Exception as e:
+            record_service_time(router, route, started, sent, ok=False)
+            deltas.put((section, attempt, None, e))
+    
+    executor = ThreadPoolExecutor(max_workers=2 * len(SECTIONS), thread_name_prefix="openai-stream")
+    
+    def start(section):
+        attempt = sum(1 for name, _ in stops if name == section)
+        stops[(section, attempt)] = threading.Event()
+        executor.submit(pump, section, attempt, stops[(section, attempt)])
+    
+    def stop(section, keep=None):
+        for (name, attempt), event in stops.items():
+            if name == section and attempt != keep:
+                event.set()
+    
+    def can_hedge(section):
+        tokens = estimate_tokens(SYSTEM_PROMPT + prompts[section]) + routes[section].max_tokens
+        return get_scheduler().has_capacity(tokens)
+    
+    started = time.monotonic()
+    deadline_at = started + deadline if deadline is not None else None
+    hedge_at = {}
+    for section in SECTIONS:
+        start(section)
+        delay = hedge_delay(router.observed_p90(routes[section], first_token=True))
+        if delay is not None:
+            hedge_at[section] = started + delay
+    
+    pending = set(SECTIONS)
+    running = {section: 1 for section in SECTIONS}
+    winners = {}
+    # Stalls are timed from the last request sent or delta received, not from queueing
+    last_delta = None
+    try:
+        while pending:
+            now = time.monotonic()
+            stalled = last_delta is not None and now - last_delta >= timeout
+            if stalled or (deadline_at is not None and now >= deadline_at):
+                for section in [section for section in SECTIONS if section in pending]:
+                    stop(section)
+                    metrics.increment("deadlines_exceeded_total", section=section)
+                    if fallback is None:
+                        if stalled:
+                            raise Exception(f"OpenAI API error: request timed out after {timeout:.0f}s")
+                        raise DeadlineExceeded(f"{section} did not finish within {deadline:.0f}s")
+                    yield section, fallback(section)
+                return
+            
+            for section, due in list(hedge_at.items()):
+                if now >= due:
+                    del hedge_at[section]
+                    if section in pending and section not in winners and can_hedge(section):
+                        metrics.increment("hedges_total", section=section)
+                        start(section)
+                        running[section] += 1
+            
+            wake_times = list(hedge_at.values())
+            if last_delta is not None:
+                wake_times.append(last_delta + timeout)
+            if deadline_at is not None:
+                wake_times.append(deadline_at)
+            try:
+                section, attempt, delta, error = deltas.get(
+                    timeout=max(min(wake_times) - now, 0.001) if wake_times else None
+                )
+            except queue.Empty:
+                continue
+            if delta is _SENT:
+                last_delta = time.monotonic()
+                continue
+            if section not in pending or winners.get(section, attempt) != attempt:
+                # A stopped attempt that lost the race
+                continue
+            if error is not None:
+                running[section] -= 1
+                if running[section] and section not in winners:
+                    # The other attempt may still answer
+                    continue
+                if isinstance(error, DeadlineExceeded) and fallback is not None:
+                    # It could not be sent, or retried, before the deadline
+                    pending.discard(section)
+                    metrics.increment("deadlines_exceeded_total", section=section)
+                    yield section, fallback(section)
+                    continue
+                raise error
+            if delta is None:
+                pending.discard(section)
+                continue
+            if section not in winners:
+                winners[section] = attempt
+                stop(section, keep=attempt)
+                hedge_at.pop(section, None)
+                if attempt:
+                    metrics.increment("hedge_wins_total", section=section)
+            last_delta = time.monotonic()
+            yield section, delta
+    finally:
+        # Stop the other streams if the consumer bailed out or a section failed
+        for event in stops.values():
+            event.set()
+        executor.shutdown(wait=False, cancel_futures=True)
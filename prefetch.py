@@ -0,0 +1,242 @@
+"""
+Background prefetching of likely comparisons.
+
+When a person is selected or saved, the app queues the pairs the user is
+likely to compare next (the "Me" person against the person just selected,
+recently selected colleagues and newly saved profiles). A single worker
+thread runs them at background priority so their results land in the
+comparison cache before the user clicks Compare.
+
+Prefetching never competes with interactive work: the worker only sends a
+comparison when the shared API scheduler has nobody waiting and enough
+rate-limit headroom. It also stops once the hourly prefetch budget is spent.
+
+Every prefetched comparison is a paid one the user may never open, so
+prefetching is off unless PREFETCH_ENABLED is set, and it is skipped while
+the comparison cache is disabled.
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Callable, Dict, List, Tuple
+
+from metrics import metrics
+from comparison_cache import get_comparison_cache
+from openai_service import (
+    DEFAULT_COMPARISON_MODE, compare_strengths, estimate_comparison_tokens, is_comparison_cached
+)
+from rate_limiter import PRIORITY_BACKGROUND, get_scheduler
+
+
+PREFETCH_ENABLED = os.environ.get("PREFETCH_ENABLED", "0") not in ("0", "false", "False")
+
+# Comparisons (three API calls each) the worker may run per rolling hour
+PREFETCH_MAX_PER_HOUR = int(os.environ.get("PREFETCH_MAX_PER_HOUR", "20"))
+
+# Pending pairs kept; the oldest are dropped first
+PREFETCH_QUEUE_SIZE = int(os.environ.get("PREFETCH_QUEUE_SIZE", "20"))
+
+# How long to wait before checking again when the scheduler is busy or rate-limited
+PREFETCH_BACKOFF_SECONDS = float(os.environ.get("PREFETCH_BACKOFF_SECONDS", "2.0"))
+
+# A comparison job: (person1_name, person1_strengths, person2_name, person2_strengths)
+Job = Tuple[str, List[str], str, List[str]]
+
+
+def _job_key(job: Job) -> Tuple:
+    person1_name, person1_strengths, person2_name, person2_strengths = job
+    return (person1_name, tuple(person1_strengths), person2_name, tuple(person2_strengths))
+
+
+def background_compare(person1_name, person1_strengths, person2_name, person2_strengths):
+    """Run a comparison at background priority in the mode the streaming view reads from the cache."""
+    return compare_strengths(
+        person1_name, person1_strengths, person2_name, person2_strengths,
+        mode=DEFAULT_COMPARISON_MODE, priority=PRIORITY_BACKGROUND
+    )
+
+
+class PrefetchWorker:
+    """
+    Bounded most-recent-first queue of comparisons run by one daemon thread.
+    """
+
+    def __init__(self, compare_fn: Callable = background_compare,
+                 max_per_hour: int = PREFETCH_MAX_PER_HOUR,
+                 queue_size: int = PREFETCH_QUEUE_SIZE,
+                 backoff: float = PREFETCH_BACKOFF_SECONDS,
+                 scheduler=None):
+        self.compare_fn = compare_fn
+        self.max_per_hour = max_per_hour
+        self.queue_size = queue_size
+        self.backoff = backoff
+        self.scheduler = scheduler or get_scheduler()
+        self.completed = 0
+        self.failed = 0
+        self.skipped_cached = 0
+        self.dropped = 0
+        self.deferred = 0
+        self._cond = threading.Condition()
+        self._queue: "OrderedDict[Tuple, Job]" = OrderedDict()
+        self._started: deque = deque()
+        self._thread = None
+
+    def submit(self, jobs: List[Job]) -> int:
+        """
+        Queue comparisons to warm, most likely first.
+
+        Jobs already queued move to the front; when the queue is full the
+        least recently submitted jobs are dropped.
+
+        Args:
+            jobs (list): (person1_name, person1_strengths, person2_name, person2_strengths) tuples
+
+        Returns:
+            int: Number of jobs queued
+        """
+        queued = 0
+        with self._cond:
+            # Submit in reverse so the first job ends up at the front of the queue
+            for job in reversed(jobs):
+                if job[0] == job[2]:
+                    continue
+                key = _job_key(job)
+                self._queue.pop(key, None)
+                self._queue[key] = job
+                queued += 1
+            while len(self._queue) > self.queue_size:
+                self._queue.popitem(last=False)
+                self.dropped += 1
+            if queued:
+                self._ensure_thread()
+                self._cond.notify_all()
+        return queued
+
+    def _ensure_thread(self) -> None:
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name="prefetch-worker", daemon=True)
+            self._thread.start()
+
+    def budget_remaining(self) -> int:
+        """Comparisons still allowed in the current rolling hour."""
+        with self._cond:
+            self._expire_budget(time.monotonic())
+            return max(self.max_per_hour - len(self._started), 0)
+
+    def _expire_budget(self, now: float) -> None:
+        while self._started and now - self._started[0] > 3600:
+            self._started.popleft()
+
+    def _next_job(self) -> Job:
+        """Block until a job is queued, budget is available and the API has headroom."""
+        with self._cond:
+            while True:
+                while not self._queue:
+                    self._cond.wait()
+
+                now = time.monotonic()
+                self._expire_budget(now)
+                if len(self._started) >= self.max_per_hour:
+                    # Budget spent: drop the backlog and wait for the window to move
+                    self.dropped += len(self._queue)
+                    self._queue.clear()
+                    continue
+
+                key, job = self._queue.popitem(last=True)
+                if not self.scheduler.has_capacity(estimate_comparison_tokens(*job), requests=3):
+                    # Interactive or batch work is waiting, or the rate limits are tight
+                    self._queue[key] = job
+                    self.deferred += 1
+                    self._cond.wait(timeout=self.backoff)
+                    continue
+
+                self._started.append(now)
+                return job
+
+    def _run(self) -> None:
+        while True:
+            job = self._next_job()
+            if is_comparison_cached(*job):
+                with self._cond:
+                    self.skipped_cached += 1
+                    self._started.pop()
+                continue
+
+            try:
+                with metrics.span("prefetch"):
+                    self.compare_fn(*job)
+                with self._cond:
+                    self.completed += 1
+            except Exception as e:
+                print(f"Error prefetching comparison: {e}")
+                with self._cond:
+                    self.failed += 1
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Report prefetch counters.
+
+        Returns:
+            dict: queued, completed, failed, skipped_cached, dropped, deferred
+                and budget_remaining
+        """
+        budget_remaining = self.budget_remaining()
+        with self._cond:
+            return {
+                "queued": len(self._queue),
+                "completed": self.completed,
+                "failed": self.failed,
+                "skipped_cached": self.skipped_cached,
+                "dropped": self.dropped,
+                "deferred": self.deferred,
+                "budget_remaining": budget_remaining,
+            }
+
+
+_worker = None
+_worker_lock = threading.Lock()
+
+
+def get_prefetcher() -> PrefetchWorker:
+    """
+    Return the process-wide prefetch worker.
+
+    Returns:
+        PrefetchWorker: The shared worker (its thread starts on first submit)
+    """
+    global _worker
+
+    with _worker_lock:
+        if _worker is None:
+            _worker = PrefetchWorker()
+        return _worker
+
+
+def prefetch_pairs(me_name: str, me_strengths: List[str], others: List[Tuple[str, List[str]]]) -> int:
+    """
+    Queue "Me" against each of the given people, most likely first.
+
+    Args:
+        me_name (str): Name of the person compared from (person 1)
+        me_strengths (list): Their 5 strengths
+        others (list): (name, strengths) tuples, most likely first
+
+    Returns:
+        int: Number of comparisons queued (0 when prefetching or the cache is disabled)
+    """
+    if not PREFETCH_ENABLED or not me_name or not me_strengths:
+        return 0
+    if get_comparison_cache() is None:
+        # Results could not be kept for the user to read
+        return 0
+    try:
+        return get_prefetcher().submit([
+            (me_name, list(me_strengths), name, list(strengths))
+            for name, strengths in others
+            if name and strengths
+        ])
+    except Exception as e:
+        print(f"Error queueing prefetch: {e}")
+        return 0
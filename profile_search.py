@@ -0,0 +1,310 @@
+"""
+Top-k partner search over saved profiles.
+
+The index keeps every saved profile in precomputed NumPy arrays: a uint64
+theme bitmask and a rank-weighted theme vector (see scoring.py) per person.
+A query scores the whole set with a few vectorized operations and picks the
+best k with a partial sort, so it stays fast at tens of thousands of people.
+
+Supported metrics:
+
+- "shared": number of shared themes (popcount of the masks), ties broken by
+  rank-weighted similarity
+- "complementary": how well the other person's themes pair with the query
+  person's (the theme-interaction complementarity from scoring.py)
+- "similar": rank-weighted overlap of the two profiles
+
+The shared index follows data_storage: save_person and delete_person update
+it in place, while bulk saves and changes made by another process (seen as a
+changed store signature) trigger a full rebuild on the next query.
+"""
+
+import threading
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+import data_storage
+from scoring import INTERACTION_MATRIX, NUM_THEMES, RANK_WEIGHTS
+from strengths import StrengthProfile
+
+
+SEARCH_METRICS = ("shared", "complementary", "similar")
+
+# Larger batches of changes (e.g. bulk imports) mark the index for a full rebuild instead
+INCREMENTAL_UPDATE_LIMIT = 1000
+
+_POPCOUNT_TABLE = np.array([bin(value).count("1") for value in range(256)], dtype=np.uint8)
+
+
+def _popcount(values: np.ndarray) -> np.ndarray:
+    """Count set bits in each element of a uint64 array."""
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(values)
+    return _POPCOUNT_TABLE[values.view(np.uint8)].reshape(len(values), 8).sum(axis=1)
+
+
+def _weights(profile: StrengthProfile) -> np.ndarray:
+    """Rank-weighted theme vector for a profile, shape (34,)."""
+    vector = np.zeros(NUM_THEMES, dtype=np.float32)
+    indices = np.frombuffer(profile.indices, dtype=np.uint8)[:len(RANK_WEIGHTS)]
+    vector[indices] = RANK_WEIGHTS[:len(indices)]
+    return vector
+
+
+class ProfileIndex:
+    """
+    In-memory search index over named StrengthProfiles.
+
+    Rows are stored densely in growable arrays; deleting a person moves the
+    last row into the freed slot, so updates are O(1).
+    """
+
+    def __init__(self, profiles: Optional[Dict[str, StrengthProfile]] = None, capacity: int = 1024):
+        self._lock = threading.RLock()
+        self._names: List[str] = []
+        self._positions: Dict[str, int] = {}
+        self._masks = np.zeros(capacity, dtype=np.uint64)
+        self._weights = np.zeros((capacity, NUM_THEMES), dtype=np.float32)
+        self.signature = None
+        if profiles:
+            self.rebuild(profiles)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._names)
+
+    def __contains__(self, name) -> bool:
+        with self._lock:
+            return name in self._positions
+
+    def _grow(self, needed: int) -> None:
+        """Make room for at least ``needed`` rows."""
+        capacity = len(self._masks)
+        if needed <= capacity:
+            return
+        while capacity < needed:
+            capacity *= 2
+        masks = np.zeros(capacity, dtype=np.uint64)
+        weights = np.zeros((capacity, NUM_THEMES), dtype=np.float32)
+        count = len(self._names)
+        masks[:count] = self._masks[:count]
+        weights[:count] = self._weights[:count]
+        self._masks, self._weights = masks, weights
+
+    def rebuild(self, profiles: Dict[str, StrengthProfile]) -> None:
+        """
+        Replace the whole index.
+
+        Args:
+            profiles (dict): Names mapped to their profiles
+        """
+        with self._lock:
+            self._names = []
+            self._positions = {}
+            self._masks = np.zeros(max(len(self._masks), 1), dtype=np.uint64)
+            self._weights = np.zeros((len(self._masks), NUM_THEMES), dtype=np.float32)
+            self._grow(len(profiles))
+            self._names = list(profiles)
+            self._positions = {name: row for row, name in enumerate(self._names)}
+
+            count = len(self._names)
+            values = list(profiles.values())
+            self._masks[:count] = np.fromiter((profile.mask for profile in values), dtype=np.uint64, count=count)
+
+            # Full top-5 profiles are encoded in one vectorized step, others row by row
+            full_rows = [row for row, profile in enumerate(values) if len(profile) == len(RANK_WEIGHTS)]
+            if full_rows:
+                indices = np.frombuffer(
+                    b"".join(values[row].indices for row in full_rows), dtype=np.uint8
+                ).reshape(-1, len(RANK_WEIGHTS))
+                self._weights[np.array(full_rows)[:, None], indices] = RANK_WEIGHTS
+            if len(full_rows) != count:
+                full = set(full_rows)
+                for row, profile in enumerate(values):
+                    if row not in full:
+                        self._weights[row] = _weights(profile)
+
+    def upsert(self, name: str, profile: StrengthProfile) -> None:
+        """Add or replace one person."""
+        with self._lock:
+            row = self._positions.get(name)
+            if row is None:
+                row = len(self._names)
+                self._grow(row + 1)
+                self._names.append(name)
+                self._positions[name] = row
+            self._masks[row] = profile.mask
+            self._weights[row] = _weights(profile)
+
+    def remove(self, name: str) -> bool:
+        """Remove one person; returns False if they were not indexed."""
+        with self._lock:
+            row = self._positions.pop(name, None)
+            if row is None:
+                return False
+            last = len(self._names) - 1
+            if row != last:
+                moved = self._names[last]
+                self._names[row] = moved
+                self._positions[moved] = row
+                self._masks[row] = self._masks[last]
+                self._weights[row] = self._weights[last]
+            self._names.pop()
+            return True
+
+    def scores(self, profile: StrengthProfile, metric: str = "shared") -> np.ndarray:
+        """
+        Score a profile against every indexed person.
+
+        Args:
+            profile (StrengthProfile): Query profile
+            metric (str): One of SEARCH_METRICS
+
+        Returns:
+            ndarray: One score per indexed row, in index order
+
+        Raises:
+            ValueError: If the metric is unknown
+        """
+        if metric not in SEARCH_METRICS:
+            raise ValueError(f"Unknown search metric: {metric!r}. Expected one of {', '.join(SEARCH_METRICS)}.")
+
+        count = len(self._names)
+        weights = self._weights[:count]
+        vector = _weights(profile)
+        if metric == "complementary":
+            return (weights @ (INTERACTION_MATRIX @ vector) + 1.0) / 2.0
+
+        similar = np.minimum(weights, vector).sum(axis=1)
+        if metric == "similar":
+            return similar
+        # Shared-theme count, with rank-weighted similarity (at most 1) as a half-point tie-break
+        shared = _popcount(self._masks[:count] & np.uint64(profile.mask))
+        return shared + 0.5 * similar
+
+    def top_k(self, profile: StrengthProfile, metric: str = "shared", k: int = 5,
+              exclude=()) -> List[Tuple[str, float]]:
+        """
+        Find the k best-scoring people for a profile.
+
+        Args:
+            profile (StrengthProfile): Query profile
+            metric (str): One of SEARCH_METRICS
+            k (int): Number of results
+            exclude (iterable): Names to leave out (e.g. the query person)
+
+        Returns:
+            list: (name, score) tuples, best first. For "shared" the score is
+                the number of shared themes.
+        """
+        with self._lock:
+            scores = self.scores(profile, metric).astype(np.float64)
+            for name in exclude:
+                row = self._positions.get(name)
+                if row is not None:
+                    scores[row] = -np.inf
+
+            k = min(k, len(scores))
+            if k <= 0:
+                return []
+            if k < len(scores):
+                candidates = np.argpartition(-scores, k - 1)[:k]
+            else:
+                candidates = np.arange(len(scores))
+            best = candidates[np.argsort(-scores[candidates], kind="stable")]
+
+            results = []
+            for row in best:
+                if scores[row] == -np.inf:
+                    continue
+                score = float(scores[row])
+                if metric == "shared":
+                    score = float(int(score))
+                results.append((self._names[row], score))
+            return results
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def _on_people_changed(changes: Dict[str, Optional[List[str]]]) -> None:
+    """data_storage change listener keeping the shared index in step with saves and deletes."""
+    with _index_lock:
+        index = _index
+    if index is None:
+        return
+
+    with index._lock:
+        if len(changes) > INCREMENTAL_UPDATE_LIMIT:
+            # A vectorized rebuild on the next query is cheaper than row-by-row updates
+            index.signature = None
+            return
+
+        for name, strengths in changes.items():
+            profile = None
+            if strengths is not None:
+                try:
+                    profile = StrengthProfile.from_names(strengths)
+                except (TypeError, ValueError):
+                    profile = None
+            if profile is None:
+                index.remove(name)
+            else:
+                index.upsert(name, profile)
+        if index.signature is not None:
+            index.signature = data_storage.get_store().signature()
+
+
+def get_profile_index() -> ProfileIndex:
+    """
+    Return the shared index over saved people, building or refreshing it if needed.
+
+    Returns:
+        ProfileIndex: Index in sync with data_storage
+    """
+    global _index
+
+    with _index_lock:
+        if _index is None:
+            _index = ProfileIndex()
+            data_storage.add_change_listener(_on_people_changed)
+        index = _index
+
+    with index._lock:
+        signature = data_storage.get_store().signature()
+        if index.signature != signature:
+            index.rebuild(data_storage.load_saved_profiles())
+            index.signature = signature
+    return index
+
+
+def suggest_partners(name: str, metric: str = "shared", k: int = 5) -> List[Tuple[str, float]]:
+    """
+    Suggest the best partners for a saved person.
+
+    Args:
+        name (str): Saved person's name
+        metric (str): One of SEARCH_METRICS
+        k (int): Number of suggestions
+
+    Returns:
+        list: (name, score) tuples, best first; empty if the person is not saved
+            or their profile cannot be searched
+
+    Raises:
+        ValueError: If the metric is unknown
+    """
+    if metric not in SEARCH_METRICS:
+        raise ValueError(f"Unknown search metric: {metric!r}. Expected one of {', '.join(SEARCH_METRICS)}.")
+
+    try:
+        strengths = data_storage.get_person_strengths(name)
+        if not strengths:
+            return []
+        profile = StrengthProfile.from_names(strengths)
+        return get_profile_index().top_k(profile, metric, k, exclude=(name,))
+    except Exception as e:
+        print(f"Error searching saved people: {e}")
+        return []
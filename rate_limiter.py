@@ -0,0 +1,427 @@
+"""
+Process-wide scheduling for OpenAI API calls.
+
+Every request passes through a shared scheduler that enforces requests-per-
+minute and tokens-per-minute budgets with token buckets, serves waiting
+callers in priority order, and retries transient failures (429, 5xx,
+connection errors and timeouts) with jittered exponential backoff that
+honours Retry-After. A caller may give an absolute deadline (on the
+``time.monotonic()`` clock); it stops waiting and retrying once the request
+can no longer be sent before it. A caller may also pass a cancel event, set
+once the answer is no longer wanted (a hedge that lost, or an attempt
+abandoned at its deadline), so the request is never sent or retried.
+"""
+
+import asyncio
+import heapq
+import itertools
+import os
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Callable, Dict, Optional
+
+import openai
+
+
+OPENAI_RPM_LIMIT = float(os.environ.get("OPENAI_RPM_LIMIT", "500"))
+OPENAI_TPM_LIMIT = float(os.environ.get("OPENAI_TPM_LIMIT", "30000"))
+OPENAI_MAX_RETRIES = int(os.environ.get("OPENAI_MAX_RETRIES", "4"))
+BACKOFF_BASE_SECONDS = float(os.environ.get("OPENAI_BACKOFF_BASE", "1.0"))
+BACKOFF_MAX_SECONDS = float(os.environ.get("OPENAI_BACKOFF_MAX", "30.0"))
+
+# How often a queued caller that the scheduler cannot wake (an asyncio task,
+# or a caller with a cancel event) checks again
+QUEUE_POLL_SECONDS = 0.05
+
+# Request priorities; lower values are served first
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BATCH = 5
+PRIORITY_BACKGROUND = 9
+
+
+class DeadlineExceeded(Exception):
+    """Raised when a call has not answered by its deadline."""
+
+
+def estimate_tokens(text: str) -> int:
+    """Roughly estimate the token count of a text (about 4 characters per token)."""
+    return len(text) // 4 + 1
+
+
+class TokenBucket:
+    """
+    Token bucket refilled continuously at ``capacity`` per minute.
+
+    Not thread-safe on its own; the scheduler serialises access.
+    """
+
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.rate = self.capacity / 60.0
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def time_until(self, amount: float, now: float) -> float:
+        """Seconds until ``amount`` tokens are available (amounts above capacity wait for a full bucket)."""
+        self._refill(now)
+        amount = min(amount, self.capacity)
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / self.rate
+
+    def consume(self, amount: float) -> None:
+        """Take tokens out of the bucket (it may go negative for oversized requests)."""
+        self.tokens -= amount
+
+    def refund(self, amount: float) -> None:
+        """Return unused tokens to the bucket."""
+        self.tokens = min(self.capacity, self.tokens + amount)
+
+
+class ApiScheduler:
+    """
+    Priority queue in front of request and token buckets.
+
+    Callers block in ``acquire`` (asyncio callers await ``acquire_async``)
+    until they are at the head of the queue and both budgets allow the
+    request. A 429 pauses dispatch for everybody, so
+    one throttled call does not trigger a cascade of further 429s.
+    """
+
+    def __init__(self, rpm: float = OPENAI_RPM_LIMIT, tpm: float = OPENAI_TPM_LIMIT,
+                 max_retries: int = OPENAI_MAX_RETRIES):
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm)
+        self.max_retries = max_retries
+        self.retries = 0
+        self.throttled = 0
+        self._cond = threading.Condition()
+        self._waiting = []
+        self._sequence = itertools.count()
+        self._paused_until = 0.0
+
+    def acquire(self, tokens: int, priority: int = PRIORITY_INTERACTIVE,
+                deadline_at: Optional[float] = None, cancel: Optional[threading.Event] = None) -> None:
+        """
+        Block until a request of ``tokens`` estimated tokens may be sent.
+
+        Args:
+            tokens (int): Estimated prompt plus completion tokens
+            priority (int): Lower values are served first
+            deadline_at (float): Optional ``time.monotonic()`` time to give up at
+            cancel (threading.Event): Optional event; once set, stop waiting
+
+        Raises:
+            DeadlineExceeded: If the request could not be sent before
+                ``deadline_at``, or ``cancel`` was set
+        """
+        entry = (priority, next(self._sequence))
+        with self._cond:
+            heapq.heappush(self._waiting, entry)
+            try:
+                while True:
+                    now = time.monotonic()
+                    if deadline_at is not None and now >= deadline_at:
+                        raise DeadlineExceeded("Request was still queued at its deadline")
+                    if cancel is not None and cancel.is_set():
+                        raise DeadlineExceeded("Request was abandoned before it was sent")
+                    if self._waiting[0] == entry:
+                        delay = max(
+                            self._paused_until - now,
+                            self.requests.time_until(1, now),
+                            self.tokens.time_until(tokens, now),
+                        )
+                        if delay <= 0:
+                            self.requests.consume(1)
+                            self.tokens.consume(tokens)
+                            return
+                    else:
+                        delay = None
+                    if deadline_at is not None:
+                        delay = deadline_at - now if delay is None else min(delay, deadline_at - now)
+                    if cancel is not None:
+                        delay = QUEUE_POLL_SECONDS if delay is None else min(delay, QUEUE_POLL_SECONDS)
+                    self._cond.wait(timeout=delay)
+            finally:
+                self._waiting.remove(entry)
+                heapq.heapify(self._waiting)
+                self._cond.notify_all()
+
+    async def acquire_async(self, tokens: int, priority: int = PRIORITY_INTERACTIVE,
+                            deadline_at: Optional[float] = None) -> None:
+        """
+        Async counterpart of ``acquire``: wait in the same priority queue without blocking the loop.
+
+        A task cannot sleep on the scheduler's condition, so it checks its
+        place again every QUEUE_POLL_SECONDS. A task cancelled while queued
+        leaves the queue without being charged.
+
+        Args:
+            tokens (int): Estimated prompt plus completion tokens
+            priority (int): Lower values are served first
+            deadline_at (float): Optional ``time.monotonic()`` time to give up at
+
+        Raises:
+            DeadlineExceeded: If the request could not be sent before ``deadline_at``
+        """
+        entry = (priority, next(self._sequence))
+        with self._cond:
+            heapq.heappush(self._waiting, entry)
+        try:
+            while True:
+                with self._cond:
+                    now = time.monotonic()
+                    if deadline_at is not None and now >= deadline_at:
+                        raise DeadlineExceeded("Request was still queued at its deadline")
+                    delay = QUEUE_POLL_SECONDS
+                    if self._waiting[0] == entry:
+                        wait = max(
+                            self._paused_until - now,
+                            self.requests.time_until(1, now),
+                            self.tokens.time_until(tokens, now),
+                        )
+                        if wait <= 0:
+                            self.requests.consume(1)
+                            self.tokens.consume(tokens)
+                            return
+                        delay = min(delay, wait)
+                    if deadline_at is not None:
+                        delay = min(delay, deadline_at - now)
+                await asyncio.sleep(delay)
+        finally:
+            with self._cond:
+                self._waiting.remove(entry)
+                heapq.heapify(self._waiting)
+                self._cond.notify_all()
+
+    def settle(self, estimated: int, actual: Optional[int]) -> None:
+        """Refund the difference between the estimated and the actual token usage."""
+        if actual is None or actual >= estimated:
+            return
+        with self._cond:
+            self.tokens.refund(estimated - actual)
+            self._cond.notify_all()
+
+    def pause(self, seconds: float) -> None:
+        """Hold all dispatch for ``seconds`` (used when the API reports throttling)."""
+        with self._cond:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+            self._cond.notify_all()
+
+    def has_capacity(self, tokens: int, requests: int = 1) -> bool:
+        """
+        Whether requests could be sent right now without waiting.
+
+        Args:
+            tokens (int): Estimated total tokens of the requests
+            requests (int): Number of requests
+
+        Returns:
+            bool: False if anyone is queued, dispatch is paused, or either bucket is short
+        """
+        with self._cond:
+            now = time.monotonic()
+            return (
+                not self._waiting
+                and self._paused_until <= now
+                and self.requests.time_until(requests, now) <= 0
+                and self.tokens.time_until(tokens, now) <= 0
+            )
+
+    def queue_depth(self) -> int:
+        """Number of callers currently waiting to send a request."""
+        with self._cond:
+            return len(self._waiting)
+
+    def stats(self) -> Dict[str, float]:
+        """Report queue depth, retry and throttle counters."""
+        with self._cond:
+            return {
+                "queue_depth": len(self._waiting),
+                "retries": self.retries,
+                "throttled": self.throttled,
+            }
+
+    def run(self, call: Callable, tokens: int, priority: int = PRIORITY_INTERACTIVE,
+            usage: Callable = None, deadline_at: Optional[float] = None, on_send: Callable = None,
+            cancel: Optional[threading.Event] = None):
+        """
+        Run an API call under the rate limits, retrying transient failures.
+
+        Args:
+            call (callable): Zero-argument function performing the request
+            tokens (int): Estimated prompt plus completion tokens
+            priority (int): Lower values are served first
+            usage (callable): Optional function mapping the result to its
+                actual total token usage, used to refund over-estimates
+            deadline_at (float): Optional ``time.monotonic()`` time after which
+                the request is neither sent nor retried
+            on_send (callable): Optional zero-argument callback run each time
+                the request leaves the queue, just before it is sent, so
+                callers can tell queue wait from service time
+            cancel (threading.Event): Optional event set once the answer is no
+                longer wanted; the request is then neither sent nor retried
+
+        Returns:
+            The return value of ``call``
+
+        Raises:
+            DeadlineExceeded: If the request was still queued at ``deadline_at``,
+                failed and a retry could not start before it, or was cancelled
+            Exception: The last error once retries are exhausted, or any
+                non-retryable error immediately
+        """
+        for attempt in range(self.max_retries + 1):
+            self.acquire(tokens, priority, deadline_at, cancel)
+            if on_send is not None:
+                on_send()
+            try:
+                result = call()
+            except Exception as e:
+                if not is_retryable(e) or attempt == self.max_retries:
+                    raise
+                delay = retry_after_seconds(e)
+                if delay is None:
+                    delay = backoff_delay(attempt)
+                if deadline_at is not None and time.monotonic() + delay >= deadline_at:
+                    raise DeadlineExceeded(f"No time left before the deadline to retry: {e}") from e
+                with self._cond:
+                    self.retries += 1
+                    if isinstance(e, openai.RateLimitError):
+                        self.throttled += 1
+                if isinstance(e, openai.RateLimitError):
+                    self.pause(delay)
+                if cancel is None:
+                    time.sleep(delay)
+                elif cancel.wait(delay):
+                    raise DeadlineExceeded(f"Request was abandoned before it was retried: {e}") from e
+                continue
+
+            if usage is not None:
+                try:
+                    self.settle(tokens, usage(result))
+                except Exception:
+                    pass
+            return result
+
+    async def run_async(self, call: Callable, tokens: int, priority: int = PRIORITY_INTERACTIVE,
+                        usage: Callable = None, deadline_at: Optional[float] = None,
+                        on_send: Callable = None):
+        """
+        Async counterpart of ``run`` for coroutine-based API calls.
+
+        Args:
+            call (callable): Zero-argument function returning an awaitable request
+            tokens (int): Estimated prompt plus completion tokens
+            priority (int): Lower values are served first
+            usage (callable): Optional function mapping the result to its
+                actual total token usage, used to refund over-estimates
+            deadline_at (float): Optional ``time.monotonic()`` time after which
+                the request is neither sent nor retried
+            on_send (callable): Optional zero-argument callback run each time
+                the request is about to be sent
+
+        Returns:
+            The result of awaiting ``call()``
+
+        Raises:
+            DeadlineExceeded: If the request could not be sent before ``deadline_at``,
+                or failed and a retry could not start before it
+            Exception: The last error once retries are exhausted, or any
+                non-retryable error immediately
+        """
+        for attempt in range(self.max_retries + 1):
+            # A task cancelled while queued (a lost hedge, a missed deadline) never sends its request
+            await self.acquire_async(tokens, priority, deadline_at)
+            if on_send is not None:
+                on_send()
+            try:
+                result = await call()
+            except Exception as e:
+                if not is_retryable(e) or attempt == self.max_retries:
+                    raise
+                delay = retry_after_seconds(e)
+                if delay is None:
+                    delay = backoff_delay(attempt)
+                if deadline_at is not None and time.monotonic() + delay >= deadline_at:
+                    raise DeadlineExceeded(f"No time left before the deadline to retry: {e}") from e
+                with self._cond:
+                    self.retries += 1
+                    if isinstance(e, openai.RateLimitError):
+                        self.throttled += 1
+                if isinstance(e, openai.RateLimitError):
+                    self.pause(delay)
+                await asyncio.sleep(delay)
+                continue
+
+            if usage is not None:
+                try:
+                    self.settle(tokens, usage(result))
+                except Exception:
+                    pass
+            return result
+
+
+def is_retryable(error: Exception) -> bool:
+    """Return True for throttling, server-side and transport errors."""
+    if isinstance(error, (openai.RateLimitError, openai.APIConnectionError, openai.APITimeoutError)):
+        return True
+    if isinstance(error, openai.APIStatusError):
+        return error.status_code >= 500 or error.status_code in (408, 409)
+    return False
+
+
+def retry_after_seconds(error: Exception) -> Optional[float]:
+    """
+    Read the server's requested delay from a failed response, if any.
+
+    Supports ``retry-after-ms`` and ``retry-after`` (seconds or HTTP date).
+    """
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+
+    try:
+        if headers.get("retry-after-ms"):
+            return min(float(headers["retry-after-ms"]) / 1000.0, BACKOFF_MAX_SECONDS)
+        value = headers.get("retry-after")
+        if not value:
+            return None
+        try:
+            seconds = float(value)
+        except ValueError:
+            seconds = parsedate_to_datetime(value).timestamp() - time.time()
+        return min(max(seconds, 0.0), BACKOFF_MAX_SECONDS)
+    except Exception:
+        return None
+
+
+def backoff_delay(attempt: int) -> float:
+    """Full-jitter exponential backoff for the given (zero-based) attempt."""
+    return random.uniform(0, min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * (2 ** attempt)))
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler() -> ApiScheduler:
+    """
+    Return the process-wide API scheduler.
+
+    Returns:
+        ApiScheduler: The shared scheduler
+    """
+    global _scheduler
+
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = ApiScheduler()
+        return _scheduler
@@ -0,0 +1,208 @@
+"""
+Offline compatibility scoring for CliftonStrengths profiles.
+
+Profiles are encoded as rank-weighted vectors over the 34 themes (the #1
+strength carries the most weight). Three deterministic scores are computed
+with NumPy, each in the range 0-1:
+
+- overlap: how much of the two profiles is shared, weighted by rank
+- complementarity: how well the themes of one profile pair with the
+  other's, using a 34×34 theme-interaction matrix
+- domain_coverage: how evenly the pair covers Gallup's four domains
+
+All scoring functions are batched so one call can score a person against
+thousands of others or produce a full pairwise matrix.
+"""
+
+from typing import Dict, List
+
+import numpy as np
+
+from strengths import CLIFTON_STRENGTHS, DOMAINS, STRENGTH_DOMAINS, STRENGTH_INDEX
+
+
+NUM_THEMES = len(CLIFTON_STRENGTHS)
+THEME_INDEX = STRENGTH_INDEX
+
+# Weight of each rank position (#1 to #5), normalised to sum to 1
+RANK_WEIGHTS = np.array([5, 4, 3, 2, 1], dtype=np.float32) / 15
+
+# One-hot theme → domain matrix, shape (34, 4)
+DOMAIN_MATRIX = np.zeros((NUM_THEMES, len(DOMAINS)), dtype=np.float32)
+for _name, _index in THEME_INDEX.items():
+    DOMAIN_MATRIX[_index, DOMAINS.index(STRENGTH_DOMAINS[_name])] = 1.0
+
+# Baseline interaction between domains (rows/columns in DOMAINS order).
+# Themes from different domains tend to fill each other's gaps; themes from
+# the same domain mostly reinforce each other.
+DOMAIN_INTERACTION = np.array([
+    [0.1, 0.5, 0.4, 0.6],
+    [0.5, 0.0, 0.5, 0.4],
+    [0.4, 0.5, 0.2, 0.4],
+    [0.6, 0.4, 0.4, 0.1],
+], dtype=np.float32)
+
+# Theme pairs known for notable synergy (positive) or friction (negative)
+THEME_PAIR_ADJUSTMENTS = {
+    ("Activator", "Deliberative"): -0.6,
+    ("Activator", "Strategic"): 0.4,
+    ("Adaptability", "Discipline"): -0.4,
+    ("Adaptability", "Focus"): -0.3,
+    ("Command", "Harmony"): -0.6,
+    ("Competition", "Includer"): -0.4,
+    ("Context", "Futuristic"): 0.3,
+    ("Developer", "Maximizer"): 0.2,
+    ("Ideation", "Arranger"): 0.3,
+    ("Ideation", "Achiever"): 0.3,
+    ("Analytical", "Positivity"): -0.2,
+    ("Relator", "Woo"): 0.2,
+    ("Empathy", "Command"): -0.3,
+    ("Consistency", "Individualization"): -0.3,
+    ("Futuristic", "Activator"): 0.3,
+    ("Restorative", "Positivity"): -0.2,
+}
+
+
+def build_interaction_matrix() -> np.ndarray:
+    """
+    Build the symmetric 34×34 theme-interaction matrix.
+
+    Entries lie in [-1, 1]; the diagonal is zero because shared themes are
+    measured by the overlap score instead.
+
+    Returns:
+        ndarray: float32 array of shape (34, 34)
+    """
+    matrix = DOMAIN_MATRIX @ DOMAIN_INTERACTION @ DOMAIN_MATRIX.T
+    for (theme1, theme2), adjustment in THEME_PAIR_ADJUSTMENTS.items():
+        i, j = THEME_INDEX[theme1], THEME_INDEX[theme2]
+        matrix[i, j] += adjustment
+        matrix[j, i] += adjustment
+    np.fill_diagonal(matrix, 0.0)
+    return np.clip(matrix, -1.0, 1.0).astype(np.float32)
+
+
+INTERACTION_MATRIX = build_interaction_matrix()
+
+
+def encode_profile(strengths: List[str]) -> np.ndarray:
+    """
+    Encode a ranked list of strengths as a rank-weighted theme vector.
+
+    Args:
+        strengths (list): Up to 5 theme names, #1 first
+
+    Returns:
+        ndarray: float32 vector of shape (34,)
+    """
+    vector = np.zeros(NUM_THEMES, dtype=np.float32)
+    for rank, name in enumerate(strengths[:len(RANK_WEIGHTS)]):
+        vector[THEME_INDEX[name]] = RANK_WEIGHTS[rank]
+    return vector
+
+
+def encode_profiles(profiles: List[List[str]]) -> np.ndarray:
+    """
+    Encode many profiles at once.
+
+    Args:
+        profiles (list): Ranked strength lists
+
+    Returns:
+        ndarray: float32 matrix of shape (N, 34)
+    """
+    matrix = np.zeros((len(profiles), NUM_THEMES), dtype=np.float32)
+    for row, strengths in enumerate(profiles):
+        for rank, name in enumerate(strengths[:len(RANK_WEIGHTS)]):
+            matrix[row, THEME_INDEX[name]] = RANK_WEIGHTS[rank]
+    return matrix
+
+
+def _domain_coverage(domain_weights: np.ndarray) -> np.ndarray:
+    """Normalised entropy of domain weight distributions along the last axis."""
+    totals = domain_weights.sum(axis=-1, keepdims=True)
+    p = np.divide(domain_weights, totals, out=np.zeros_like(domain_weights), where=totals > 0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        entropy = -np.where(p > 0, p * np.log(p), 0.0).sum(axis=-1)
+    return entropy / np.log(len(DOMAINS))
+
+
+def _overall(overlap, complementarity, domain_coverage):
+    """Blend the three scores into one compatibility score."""
+    return 0.25 * overlap + 0.45 * complementarity + 0.30 * domain_coverage
+
+
+def score_one_to_many(vector: np.ndarray, matrix: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    Score one encoded profile against many.
+
+    Args:
+        vector (ndarray): Encoded profile, shape (34,)
+        matrix (ndarray): Encoded profiles, shape (N, 34)
+
+    Returns:
+        dict: "overlap", "complementarity", "domain_coverage" and "overall",
+            each an array of shape (N,)
+    """
+    overlap = np.minimum(matrix, vector).sum(axis=1)
+    complementarity = (matrix @ (INTERACTION_MATRIX @ vector) + 1.0) / 2.0
+    domain_coverage = _domain_coverage((matrix + vector) @ DOMAIN_MATRIX)
+    return {
+        "overlap": overlap,
+        "complementarity": complementarity,
+        "domain_coverage": domain_coverage,
+        "overall": _overall(overlap, complementarity, domain_coverage),
+    }
+
+
+def pairwise_scores(matrix: np.ndarray, chunk_size: int = 256) -> Dict[str, np.ndarray]:
+    """
+    Score every pair of encoded profiles.
+
+    The overlap term is computed in row chunks to keep peak memory at
+    chunk_size × N × 34 floats.
+
+    Args:
+        matrix (ndarray): Encoded profiles, shape (N, 34)
+        chunk_size (int): Rows processed per chunk for the overlap term
+
+    Returns:
+        dict: "overlap", "complementarity", "domain_coverage" and "overall",
+            each an array of shape (N, N)
+    """
+    count = matrix.shape[0]
+
+    overlap = np.empty((count, count), dtype=np.float32)
+    for start in range(0, count, chunk_size):
+        block = matrix[start:start + chunk_size]
+        overlap[start:start + chunk_size] = np.minimum(block[:, None, :], matrix[None, :, :]).sum(axis=2)
+
+    complementarity = (matrix @ INTERACTION_MATRIX @ matrix.T + 1.0) / 2.0
+
+    domain_weights = matrix @ DOMAIN_MATRIX
+    domain_coverage = _domain_coverage(domain_weights[:, None, :] + domain_weights[None, :, :])
+
+    return {
+        "overlap": overlap,
+        "complementarity": complementarity,
+        "domain_coverage": domain_coverage,
+        "overall": _overall(overlap, complementarity, domain_coverage),
+    }
+
+
+def score_pair(person1_strengths: List[str], person2_strengths: List[str]) -> Dict[str, float]:
+    """
+    Score a single pair of profiles.
+
+    Args:
+        person1_strengths (list): Ranked strengths for person 1
+        person2_strengths (list): Ranked strengths for person 2
+
+    Returns:
+        dict: "overlap", "complementarity", "domain_coverage" and "overall" as floats
+    """
+    scores = score_one_to_many(
+        encode_profile(person1_strengths),
+        encode_profile(person2_strengths)[None, :]
+    )
+    return {key: float(value[0]) for key, value in scores.items()}
@@ -0,0 +1,229 @@
+"""
+Bounded per-session history of comparison results.
+
+Streamlit only shows a comparison during the rerun in which Compare was
+clicked. The app keeps each finished comparison in a ComparisonHistory held
+in ``st.session_state``, so results survive later reruns, earlier results can
+be reopened without any API call, and any of them can be exported. An entry
+upgraded to a deep analysis replaces the standard one for the same people.
+Entries record which sections were offline fallbacks (``degraded``), so the
+app can run those comparisons again instead of reusing them.
+
+The history is a least-recently-used list capped both by entry count and by
+the total size of the stored text, so a long session cannot grow without
+limit. This module has no Streamlit dependency; the app owns the session
+state.
+"""
+
+import json
+import os
+import re
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+from fallbacks import is_degraded
+
+
+SESSION_HISTORY_MAX_ENTRIES = int(os.environ.get("SESSION_HISTORY_MAX_ENTRIES", "10"))
+SESSION_HISTORY_MAX_BYTES = int(os.environ.get("SESSION_HISTORY_MAX_BYTES", "262144"))
+
+# Session state key holding the history object
+SESSION_STATE_KEY = "comparison_history"
+
+
+def history_key(person1_name: str, person1_strengths: List[str],
+                person2_name: str, person2_strengths: List[str]) -> str:
+    """Return the key identifying one comparison (names and ranked strengths)."""
+    return json.dumps(
+        [person1_name, list(person1_strengths), person2_name, list(person2_strengths)],
+        separators=(",", ":")
+    )
+
+
+def _entry_size(entry: Dict) -> int:
+    """Approximate memory held by an entry: its text in UTF-8 bytes."""
+    text = [entry["person1_name"], entry["person2_name"]]
+    text += entry["person1_strengths"] + entry["person2_strengths"]
+    text += list(entry["sections"].values())
+    return sum(len(part.encode("utf-8")) for part in text)
+
+
+class ComparisonHistory:
+    """
+    LRU history of finished comparisons, capped by count and by bytes.
+    """
+
+    def __init__(self, max_entries: int = SESSION_HISTORY_MAX_ENTRIES,
+                 max_bytes: int = SESSION_HISTORY_MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self._entries: "OrderedDict[str, Dict]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key) -> bool:
+        return key in self._entries
+
+    def add(self, person1_name: str, person1_strengths: List[str],
+            person2_name: str, person2_strengths: List[str], sections: Dict[str, str],
+            depth: str = "standard") -> Dict:
+        """
+        Store a finished comparison as the most recent entry.
+
+        Older entries are evicted until the history fits both caps; the new
+        entry is always kept, even if it alone exceeds the byte cap.
+
+        Args:
+            person1_name (str): Name of first person
+            person1_strengths (list): Ranked strengths for person 1
+            person2_name (str): Name of second person
+            person2_strengths (list): Ranked strengths for person 2
+            sections (dict): Result text keyed by section name
+            depth (str): Analysis depth the result was produced with
+
+        Returns:
+            dict: The stored entry
+        """
+        key = history_key(person1_name, person1_strengths, person2_name, person2_strengths)
+        self.remove(key)
+
+        entry = {
+            "key": key,
+            "person1_name": person1_name,
+            "person1_strengths": list(person1_strengths),
+            "person2_name": person2_name,
+            "person2_strengths": list(person2_strengths),
+            "sections": dict(sections),
+            "depth": depth,
+            "degraded": [section for section, text in sections.items() if is_degraded(text)],
+            "created_at": time.time(),
+        }
+        entry["bytes"] = _entry_size(entry)
+        self._entries[key] = entry
+        self.total_bytes += entry["bytes"]
+
+        while len(self._entries) > 1 and (
+            len(self._entries) > self.max_entries or self.total_bytes > self.max_bytes
+        ):
+            _, evicted = self._entries.popitem(last=False)
+            self.total_bytes -= evicted["bytes"]
+        return entry
+
+    def get(self, key: str) -> Optional[Dict]:
+        """Return an entry and mark it most recently used, or None."""
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+
+    def peek(self, key: str) -> Optional[Dict]:
+        """Return an entry without changing the eviction order."""
+        return self._entries.get(key)
+
+    def remove(self, key: str) -> bool:
+        """Forget one entry; returns False if it was not stored."""
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return False
+        self.total_bytes -= entry["bytes"]
+        return True
+
+    def entries(self) -> List[Dict]:
+        """Return the stored entries, most recently used first."""
+        return list(reversed(self._entries.values()))
+
+    def clear(self) -> None:
+        """Forget every entry."""
+        self._entries.clear()
+        self.total_bytes = 0
+
+
+def get_session_history(session_state) -> ComparisonHistory:
+    """
+    Return the history stored in a session, creating it on first use.
+
+    Args:
+        session_state: ``st.session_state`` (or any mapping)
+
+    Returns:
+        ComparisonHistory: The session's history
+    """
+    history = session_state.get(SESSION_STATE_KEY)
+    if not isinstance(history, ComparisonHistory):
+        history = ComparisonHistory()
+        session_state[SESSION_STATE_KEY] = history
+    return history
+
+
+def entry_label(entry: Dict) -> str:
+    """Short label for choosing an entry, e.g. "Ann → Bob · 14:02" or "Ann → Bob · deep · 14:05"."""
+    stamp = time.strftime("%H:%M", time.localtime(entry["created_at"]))
+    depth = " · deep" if entry.get("depth") == "deep" else ""
+    return f"{entry['person1_name']} → {entry['person2_name']}{depth} · {stamp}"
+
+
+def export_filename(entry: Dict, extension: str) -> str:
+    """File name for an exported comparison, safe on every platform."""
+    slug = re.sub(r"[^A-Za-z0-9]+", "-", f"{entry['person1_name']}-{entry['person2_name']}").strip("-")
+    return f"comparison-{slug or 'result'}.{extension}"
+
+
+def to_markdown(entry: Dict) -> str:
+    """
+    Format an entry as a Markdown document.
+
+    Args:
+        entry (dict): History entry
+
+    Returns:
+        str: Markdown text
+    """
+    name1, name2 = entry["person1_name"], entry["person2_name"]
+    sections = {
+        section: text + "\n\n_Offline summary: the AI analysis did not arrive in time._"
+        if section in entry.get("degraded", []) else text
+        for section, text in entry["sections"].items()
+    }
+    lines = [
+        f"# CliftonStrengths Comparison: {name1} and {name2}",
+        "",
+        f"**{name1}:** {', '.join(entry['person1_strengths'])}  ",
+        f"**{name2}:** {', '.join(entry['person2_strengths'])}",
+        "",
+        "## What conflicts might we have?",
+        "",
+        sections.get("conflicts", ""),
+        "",
+        "## How can we work well together?",
+        "",
+        sections.get("collaboration", ""),
+        "",
+        f"## How should {name1} speak to {name2}?",
+        "",
+        sections.get("communication", ""),
+        "",
+    ]
+    return "\n".join(lines)
+
+
+def to_json(entry: Dict) -> str:
+    """
+    Format an entry as a JSON document.
+
+    Args:
+        entry (dict): History entry
+
+    Returns:
+        str: Indented JSON text
+    """
+    return json.dumps({
+        "person1": {"name": entry["person1_name"], "strengths": entry["person1_strengths"]},
+        "person2": {"name": entry["person2_name"], "strengths": entry["person2_strengths"]},
+        "depth": entry.get("depth", "standard"),
+        "degraded_sections": entry.get("degraded", []),
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S%z", time.localtime(entry["created_at"])),
+        **entry["sections"],
+    }, indent=2, ensure_ascii=False)
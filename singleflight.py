@@ -0,0 +1,159 @@
+"""
+Single-flight coalescing of identical in-flight work.
+
+When several callers ask for the same key at the same time, only the first
+(the leader) does the work; the others wait on its future and share its
+result or its error.
+"""
+
+import asyncio
+import threading
+from concurrent.futures import Future
+from typing import Callable, Dict, Optional, Tuple
+
+
+class SingleFlight:
+    """
+    Registry of in-flight calls keyed by a canonical request key.
+    """
+
+    def __init__(self):
+        self.leaders = 0
+        self.coalesced = 0
+        self._lock = threading.Lock()
+        self._calls: Dict[str, Future] = {}
+
+    def begin(self, key: str) -> Tuple[Future, bool]:
+        """
+        Join the in-flight call for ``key`` or start a new one.
+
+        Args:
+            key (str): Canonical request key
+
+        Returns:
+            tuple: (future, is_leader). The leader must call ``end``;
+                followers wait on ``future.result()``.
+        """
+        with self._lock:
+            future = self._calls.get(key)
+            if future is not None:
+                self.coalesced += 1
+                return future, False
+
+            future = Future()
+            self._calls[key] = future
+            self.leaders += 1
+            return future, True
+
+    def end(self, key: str, future: Future, result=None, error: BaseException = None) -> None:
+        """
+        Publish the leader's outcome and retire the key.
+
+        Args:
+            key (str): Canonical request key
+            future (Future): The future returned by ``begin``
+            result: The result to share on success
+            error (BaseException): The error to share on failure
+        """
+        with self._lock:
+            if self._calls.get(key) is future:
+                del self._calls[key]
+
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+    def do(self, key: str, fn: Callable, timeout: Optional[float] = None):
+        """
+        Run ``fn`` once for all concurrent callers with the same key.
+
+        Args:
+            key (str): Canonical request key
+            fn (callable): Zero-argument function doing the work
+            timeout (float): Seconds a follower waits for the leader
+                (None waits for as long as the leader runs)
+
+        Returns:
+            The leader's result
+
+        Raises:
+            TimeoutError: If a follower gave up after ``timeout``; the
+                leader keeps running
+            Exception: The leader's error, re-raised in every caller
+        """
+        future, leader = self.begin(key)
+        if not leader:
+            return future.result(timeout=timeout)
+
+        try:
+            result = fn()
+        except BaseException as e:
+            self.end(key, future, error=e)
+            raise
+        self.end(key, future, result=result)
+        return result
+
+    async def do_async(self, key: str, fn: Callable):
+        """
+        Async counterpart of ``do``: run the coroutine ``fn()`` once per key.
+
+        Sync and async callers share the same registry, so a comparison
+        started by the app and one requested over the HTTP API coalesce.
+
+        Args:
+            key (str): Canonical request key
+            fn (callable): Zero-argument function returning an awaitable
+
+        Returns:
+            The leader's result
+
+        Raises:
+            Exception: The leader's error, re-raised in every caller; if the
+                leader is cancelled, followers get a TimeoutError
+        """
+        future, leader = self.begin(key)
+        if not leader:
+            # shield() keeps a cancelled follower from cancelling the shared future
+            return await asyncio.shield(asyncio.wrap_future(future))
+
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            # The leader's own timeout or disconnect must not cancel the followers;
+            # they get a regular error (a 504 from the HTTP API) instead
+            self.end(key, future, error=TimeoutError("Comparison was cancelled before it finished."))
+            raise
+        except BaseException as e:
+            self.end(key, future, error=e)
+            raise
+        self.end(key, future, result=result)
+        return result
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Report coalescing counters.
+
+        Returns:
+            dict: "leaders" (calls that did the work), "coalesced" (calls that
+                shared another call's result) and "in_flight"
+        """
+        with self._lock:
+            return {
+                "leaders": self.leaders,
+                "coalesced": self.coalesced,
+                "in_flight": len(self._calls),
+            }
+
+
+_comparisons = SingleFlight()
+
+
+def get_comparison_flights() -> SingleFlight:
+    """
+    Return the process-wide single-flight registry for comparisons.
+
+    Returns:
+        SingleFlight: The shared registry
+    """
+    return _comparisons
@@ -40,6 +40,207 @@ CLIFTON_STRENGTHS = [
     "Woo"
 ]
 
+# Gallup's four CliftonStrengths domains
+DOMAINS = [
+    "Executing",
+    "Influencing",
+    "Relationship Building",
+    "Strategic Thinking"
+]
+
+# Domain of each theme
+STRENGTH_DOMAINS = {
+    "Achiever": "Executing",
+    "Arranger": "Executing",
+    "Belief": "Executing",
+    "Consistency": "Executing",
+    "Deliberative": "Executing",
+    "Discipline": "Executing",
+    "Focus": "Executing",
+    "Responsibility": "Executing",
+    "Restorative": "Executing",
+    "Activator": "Influencing",
+    "Command": "Influencing",
+    "Communication": "Influencing",
+    "Competition": "Influencing",
+    "Maximizer": "Influencing",
+    "Self-Assurance": "Influencing",
+    "Significance": "Influencing",
+    "Woo": "Influencing",
+    "Adaptability": "Relationship Building",
+    "Connectedness": "Relationship Building",
+    "Developer": "Relationship Building",
+    "Empathy": "Relationship Building",
+    "Harmony": "Relationship Building",
+    "Includer": "Relationship Building",
+    "Individualization": "Relationship Building",
+    "Positivity": "Relationship Building",
+    "Relator": "Relationship Building",
+    "Analytical": "Strategic Thinking",
+    "Context": "Strategic Thinking",
+    "Futuristic": "Strategic Thinking",
+    "Ideation": "Strategic Thinking",
+    "Input": "Strategic Thinking",
+    "Intellection": "Strategic Thinking",
+    "Learner": "Strategic Thinking",
+    "Strategic": "Strategic Thinking"
+}
+
+# One-line description of each theme, used for offline fallback text
+STRENGTH_DESCRIPTIONS = {
+    "Achiever": "works hard, needs to get things done every day and takes satisfaction from being busy and productive",
+    "Activator": "turns ideas into action quickly and would rather start and adjust than keep talking",
+    "Adaptability": "goes with the flow, responds well to the moment and stays calm when plans change",
+    "Analytical": "looks for causes and evidence and wants ideas backed by data and sound reasoning",
+    "Arranger": "organises people and resources flexibly to find the most productive setup",
+    "Belief": "is guided by enduring core values and needs work to serve a meaningful purpose",
+    "Command": "takes charge, speaks plainly and is comfortable with confrontation and decisions",
+    "Communication": "puts thoughts into words easily and enjoys explaining, presenting and telling stories",
+    "Competition": "measures progress against others and is driven to win",
+    "Connectedness": "sees links between people and events and believes things happen for a reason",
+    "Consistency": "values fairness, treats people the same and prefers clear rules applied to everyone",
+    "Context": "looks to the past to understand the present and wants to know how things came to be",
+    "Deliberative": "is careful and vigilant, anticipates obstacles and decides only after weighing the risks",
+    "Developer": "sees potential in others and enjoys helping them grow step by step",
+    "Discipline": "likes routine, structure and order, and plans to keep things predictable",
+    "Empathy": "senses how others feel and can see the world from their point of view",
+    "Focus": "sets clear goals, prioritises and stays on course until they are reached",
+    "Futuristic": "is inspired by what could be and energises others with a vision of the future",
+    "Harmony": "looks for consensus and common ground and avoids needless conflict",
+    "Ideation": "is fascinated by ideas and finds new connections and perspectives",
+    "Includer": "accepts others and makes sure no one is left out",
+    "Individualization": "notices what makes each person unique and tailors how they work with them",
+    "Input": "is curious, collects information and ideas, and likes to have resources at hand",
+    "Intellection": "enjoys thinking, reflection and deep discussion",
+    "Learner": "loves to learn and enjoys the process of getting better more than the result",
+    "Maximizer": "focuses on strengths and wants to turn something good into something excellent",
+    "Positivity": "brings enthusiasm and optimism and lifts the energy of the people around them",
+    "Relator": "prefers close, genuine relationships and works best with people they trust",
+    "Responsibility": "owns commitments, follows through and values honesty and loyalty",
+    "Restorative": "likes solving problems and figuring out what is wrong and fixing it",
+    "Self-Assurance": "trusts their own judgement and is confident in their decisions",
+    "Significance": "wants to make an impact and to be recognised for contributions that matter",
+    "Strategic": "quickly sees patterns and alternative routes and picks the best way forward",
+    "Woo": "enjoys meeting new people, breaking the ice and winning them over",
+}
+
+# O(1) name ↔ index lookups (indices follow CLIFTON_STRENGTHS order)
+STRENGTH_INDEX = {name: index for index, name in enumerate(CLIFTON_STRENGTHS)}
+STRENGTH_BY_INDEX = tuple(CLIFTON_STRENGTHS)
+
+
+class StrengthProfile:
+    """
+    Compact, immutable ranked set of themes.
+
+    Themes are held as one byte (uint8 index) per rank plus a 34-bit
+    membership mask, so a top-5 profile is a 5-byte string and an int, and
+    set operations between profiles are single integer operations.
+    """
+
+    __slots__ = ("indices", "mask")
+
+    def __init__(self, indices: bytes, mask: int):
+        object.__setattr__(self, "indices", indices)
+        object.__setattr__(self, "mask", mask)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("StrengthProfile is immutable")
+
+    @classmethod
+    def from_names(cls, names) -> "StrengthProfile":
+        """
+        Build a profile from theme names in rank order.
+
+        Args:
+            names (list): Distinct CliftonStrengths theme names
+
+        Returns:
+            StrengthProfile: The encoded profile
+
+        Raises:
+            ValueError: If a name is unknown or repeated
+        """
+        indices = bytearray()
+        mask = 0
+        for name in names:
+            index = STRENGTH_INDEX.get(name)
+            if index is None:
+                raise ValueError(f"Invalid strength: {name}")
+            bit = 1 << index
+            if mask & bit:
+                raise ValueError(f"Duplicate strength: {name}")
+            mask |= bit
+            indices.append(index)
+        return cls(bytes(indices), mask)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "StrengthProfile":
+        """
+        Decode a profile serialized with ``to_bytes``.
+
+        Args:
+            data (bytes): One theme index per byte, in rank order
+
+        Returns:
+            StrengthProfile: The decoded profile
+
+        Raises:
+            ValueError: If an index is out of range or repeated
+        """
+        mask = 0
+        for index in data:
+            if index >= len(STRENGTH_BY_INDEX) or mask >> index & 1:
+                raise ValueError(f"Invalid encoded profile: {bytes(data)!r}")
+            mask |= 1 << index
+        return cls(bytes(data), mask)
+
+    def to_bytes(self) -> bytes:
+        """Return the compact serialized form (one byte per theme)."""
+        return self.indices
+
+    def names(self) -> list:
+        """Return the theme names in rank order."""
+        return [STRENGTH_BY_INDEX[index] for index in self.indices]
+
+    def overlap(self, other: "StrengthProfile") -> int:
+        """Return the number of themes shared with another profile."""
+        return (self.mask & other.mask).bit_count()
+
+    def shared(self, other: "StrengthProfile") -> list:
+        """Return the shared themes, in this profile's rank order."""
+        common = self.mask & other.mask
+        return [STRENGTH_BY_INDEX[index] for index in self.indices if common >> index & 1]
+
+    def rank_of(self, name: str) -> int:
+        """Return the 0-based rank of a theme, or -1 if it is not in the profile."""
+        index = STRENGTH_INDEX.get(name)
+        if index is None or not self.mask >> index & 1:
+            return -1
+        return self.indices.index(index)
+
+    def __contains__(self, name) -> bool:
+        index = STRENGTH_INDEX.get(name)
+        return index is not None and bool(self.mask >> index & 1)
+
+    def __iter__(self):
+        return (STRENGTH_BY_INDEX[index] for index in self.indices)
+
+    def __len__(self) -> int:
+        return len(self.indices)
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, StrengthProfile) and self.indices == other.indices
+
+    def __hash__(self) -> int:
+        return hash(self.indices)
+
+    def __repr__(self) -> str:
+        return f"StrengthProfile({self.names()!r})"
+
+    def __reduce__(self):
+        return (StrengthProfile.from_bytes, (self.indices,))
+
 
 def validate_strengths(strengths):
     """
@@ -63,7 +264,7 @@ def validate_strengths(strengths):
         return False, "Please select 5 different strengths (no duplicates)."
     
     # Check if all are valid CliftonStrengths
-    invalid = [s for s in strengths if s not in CLIFTON_STRENGTHS]
+    invalid = [s for s in strengths if s not in STRENGTH_INDEX]
     if invalid:
         return False, f"Invalid strength(s): {', '.join(invalid)}"
     
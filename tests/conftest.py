@@ -0,0 +1,104 @@
+import os
+import tempfile
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+# Keep every store the code under test opens out of the working tree
+DATA_DIR = tempfile.mkdtemp(prefix="strengths-tests-")
+os.environ["COMPARISON_CACHE_FILE"] = os.path.join(DATA_DIR, "comparison_cache.db")
+os.environ["FRAGMENT_CACHE_FILE"] = os.path.join(DATA_DIR, "insight_fragments.db")
+os.environ["PEOPLE_DB_FILE"] = os.path.join(DATA_DIR, "saved_people.db")
+os.environ["BATCH_STATE_DIR"] = os.path.join(DATA_DIR, "batch_jobs")
+
+# The fake client answers instantly; keep the shared scheduler from pacing the suite
+os.environ["OPENAI_RPM_LIMIT"] = "1000000"
+os.environ["OPENAI_TPM_LIMIT"] = "100000000"
+
+import data_storage  # noqa: E402
+import openai_service  # noqa: E402
+from comparison_cache import ComparisonCache  # noqa: E402
+from data_storage import SqlitePeopleStore  # noqa: E402
+from insight_fragments import FragmentStore  # noqa: E402
+
+
+class FakeStream:
+    """Iterable of streamed chunks, one per word of the reply."""
+
+    def __init__(self, content):
+        self.words = [word + " " for word in content.split(" ")]
+        self.words[-1] = self.words[-1][:-1]
+        self.closed = False
+
+    def __iter__(self):
+        for word in self.words:
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=word))], usage=None)
+
+    def close(self):
+        self.closed = True
+
+
+class FakeClient:
+    """
+    Stand-in for the OpenAI client: ``chat.completions.create`` answers with
+    ``reply(prompt, request)`` (the prompt itself by default) after ``delay``
+    seconds. A reply that is an exception is raised instead.
+    """
+
+    def __init__(self, reply=None, delay=0.0):
+        self.reply = reply or (lambda prompt, request: prompt)
+        self.delay = delay
+        self.requests = []
+        self._lock = threading.Lock()
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def prompts(self):
+        with self._lock:
+            return [request["messages"][-1]["content"] for request in self.requests]
+
+    def create(self, **request):
+        with self._lock:
+            self.requests.append(request)
+        if self.delay:
+            time.sleep(self.delay)
+        content = self.reply(request["messages"][-1]["content"], request)
+        if isinstance(content, Exception):
+            raise content
+        if request.get("stream"):
+            return FakeStream(content)
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))], usage=None)
+
+
+@pytest.fixture
+def fake_openai(monkeypatch):
+    """Route openai_service's synchronous client to a FakeClient."""
+    client = FakeClient()
+    monkeypatch.setattr(openai_service, "get_openai_client", lambda: client)
+    return client
+
+
+@pytest.fixture
+def comparison_cache(tmp_path, monkeypatch):
+    """Give openai_service a fresh comparison cache in a temporary directory."""
+    cache = ComparisonCache(str(tmp_path / "comparison_cache.db"))
+    monkeypatch.setattr(openai_service, "get_comparison_cache", lambda: cache)
+    return cache
+
+
+@pytest.fixture
+def fragment_store(tmp_path, monkeypatch):
+    """Give openai_service a fresh insight fragment store in a temporary directory."""
+    store = FragmentStore(str(tmp_path / "insight_fragments.db"))
+    monkeypatch.setattr(openai_service, "get_fragment_store", lambda: store)
+    return store
+
+
+@pytest.fixture
+def people_store(tmp_path, monkeypatch):
+    """Make a fresh SQLite store in a temporary directory the module-wide people store."""
+    store = SqlitePeopleStore(str(tmp_path / "people.db"), str(tmp_path / "people.json"))
+    monkeypatch.setattr(data_storage, "_store", store)
+    monkeypatch.setattr(data_storage, "_read_cache", None)
+    return store
@@ -0,0 +1,114 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+import api_server
+from api_server import Overloaded
+from openai_service import MissingApiKeyError
+from rate_limiter import DeadlineExceeded
+
+ANN = ["Achiever", "Woo", "Focus", "Input", "Relator"]
+BOB = ["Harmony", "Achiever", "Context", "Ideation", "Learner"]
+PAIR = {"person1_name": "Ann", "person1_strengths": ANN, "person2_name": "Bob", "person2_strengths": BOB}
+
+
+@pytest.fixture
+def client(people_store):
+    with TestClient(api_server.app) as client:
+        yield client
+
+
+def comparing_with(monkeypatch, outcome):
+    """Make every comparison return ``outcome``, or raise it if it is an exception."""
+    async def compare_strengths_async(*args, **kwargs):
+        await asyncio.sleep(0)
+        if isinstance(outcome, BaseException):
+            raise outcome
+        return outcome
+
+    monkeypatch.setattr(api_server, "compare_strengths_async", compare_strengths_async)
+
+
+def test_compare_returns_each_section(client, monkeypatch):
+    comparing_with(monkeypatch, ("conflicts text", "collaboration text", "communication text"))
+
+    response = client.post("/compare", json=PAIR)
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["conflicts"] == "conflicts text"
+    assert body["communication"] == "communication text"
+
+
+@pytest.mark.parametrize("error, status", [
+    (Overloaded("Too many requests are waiting"), 503),
+    (DeadlineExceeded("Deadline passed before the request was sent"), 503),
+    (asyncio.TimeoutError(), 504),
+    (MissingApiKeyError("OpenAI API key not found."), 500),
+    (ValueError("Combined response is not valid JSON"), 422),
+    (Exception("OpenAI API error: upstream failed"), 502),
+])
+def test_comparison_failures_map_to_status_codes(client, monkeypatch, error, status):
+    comparing_with(monkeypatch, error)
+
+    response = client.post("/compare", json=PAIR)
+
+    assert response.status_code == status
+    assert ("retry-after" in response.headers) == (status == 503)
+
+
+def test_full_queue_is_rejected_with_retry_after(client, monkeypatch):
+    comparing_with(monkeypatch, ("a", "b", "c"))
+    client.app.state.admission = api_server.AdmissionControl(limit=1, max_waiting=0)
+    client.app.state.admission._semaphore = asyncio.Semaphore(0)
+
+    response = client.post("/compare", json=PAIR)
+
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "1"
+
+
+def test_invalid_requests_are_rejected(client, monkeypatch):
+    comparing_with(monkeypatch, ("a", "b", "c"))
+
+    assert client.post("/compare", json={**PAIR, "mode": "psychic"}).status_code == 422
+    assert client.post("/compare", json={**PAIR, "depth": "bottomless"}).status_code == 422
+    assert client.post("/compare", json={**PAIR, "person1_strengths": ANN[:4]}).status_code == 422
+    unsaved = {"person1_name": "Ann", "person2_name": "Bob", "person2_strengths": BOB}
+    assert client.post("/compare", json=unsaved).status_code == 404
+
+
+def test_saved_people_can_be_compared_by_name(client, monkeypatch):
+    comparing_with(monkeypatch, ("a", "b", "c"))
+
+    assert client.put("/people/Ann", json={"strengths": ANN}).status_code == 200
+    assert client.put("/people/Bob", json={"strengths": BOB}).status_code == 200
+    assert client.get("/people/Ann").json() == {"name": "Ann", "strengths": ANN}
+
+    response = client.post("/compare", json={"person1_name": "Ann", "person2_name": "Bob"})
+    assert response.status_code == 200
+
+    assert client.delete("/people/Ann").status_code == 204
+    assert client.get("/people/Ann").status_code == 404
+    assert client.delete("/people/Ann").status_code == 404
+
+
+def test_batch_pairs_fail_independently(client, monkeypatch):
+    comparing_with(monkeypatch, ("a", "b", "c"))
+    unsaved = {"person1_name": "Ann", "person2_name": "Zed", "person1_strengths": ANN}
+
+    response = client.post("/compare/batch", json={"pairs": [PAIR, unsaved]})
+
+    assert response.status_code == 200
+    body = response.json()
+    assert (body["completed"], body["failed"]) == (1, 1)
+    assert [item["status"] for item in body["results"]] == ["done", "failed"]
+
+
+def test_token_is_required_when_configured(client, monkeypatch):
+    monkeypatch.setattr(api_server, "API_TOKEN", "secret")
+
+    assert client.get("/people").status_code == 401
+    assert client.get("/people", headers={"Authorization": "Bearer secret"}).status_code == 200
+    assert client.get("/health").status_code == 200
@@ -0,0 +1,100 @@
+import threading
+import time
+
+from batch_compare import DONE, FAILED, PENDING, BatchJobState, iter_pairs, run_batch
+
+TEAM = {
+    "Ann": ["Achiever", "Woo", "Focus", "Input", "Relator"],
+    "Bob": ["Harmony", "Achiever", "Context", "Ideation", "Learner"],
+    "Cat": ["Strategic", "Command", "Activator", "Maximizer", "Self-Assurance"],
+}
+
+
+def fake_compare(fail=()):
+    def compare(name1, strengths1, name2, strengths2, **kwargs):
+        if (name1, name2) in fail:
+            raise Exception("OpenAI API error: boom")
+        return (f"{name1}-{name2} conflicts", f"{name1}-{name2} collaboration", f"{name1}-{name2} communication")
+    return compare
+
+
+def test_iter_pairs_unordered_and_ordered():
+    names = ["Ann", "Bob", "Cat"]
+
+    assert list(iter_pairs(names)) == [("Ann", "Bob"), ("Ann", "Cat"), ("Bob", "Cat")]
+    assert len(list(iter_pairs(names, ordered=True))) == 6
+
+
+def test_resume_restores_finished_jobs_and_retries_failed(tmp_path):
+    state = BatchJobState.load_or_create(list(TEAM), state_dir=str(tmp_path), strengths_by_name=TEAM)
+    results = list(run_batch(state, TEAM, max_workers=2, compare_fn=fake_compare(fail={("Bob", "Cat")})))
+
+    assert len(results) == 3
+    assert state.progress() == {DONE: 2, FAILED: 1, PENDING: 0, "total": 3}
+
+    resumed = BatchJobState.load_or_create(list(TEAM), state_dir=str(tmp_path), strengths_by_name=TEAM)
+    assert resumed.get(("Ann", "Bob"))["status"] == DONE
+    assert resumed.get(("Ann", "Bob"))["result"][0] == "Ann-Bob conflicts"
+    assert resumed.pending_pairs() == [("Bob", "Cat")]
+
+    calls = []
+
+    def counting(*args, **kwargs):
+        calls.append(args[0::2])
+        return fake_compare()(*args)
+
+    list(run_batch(resumed, TEAM, compare_fn=counting))
+    assert calls == [("Bob", "Cat")]
+    assert resumed.progress()[DONE] == 3
+
+
+def test_changed_strengths_invalidate_finished_result(tmp_path):
+    state = BatchJobState.load_or_create(list(TEAM), state_dir=str(tmp_path), strengths_by_name=TEAM)
+    list(run_batch(state, TEAM, compare_fn=fake_compare()))
+
+    changed = dict(TEAM, Ann=["Woo", "Achiever", "Focus", "Input", "Relator"])
+    resumed = BatchJobState.load_or_create(list(TEAM), state_dir=str(tmp_path), strengths_by_name=changed)
+
+    assert sorted(resumed.pending_pairs()) == [("Ann", "Bob"), ("Ann", "Cat")]
+    assert resumed.get(("Bob", "Cat"))["status"] == DONE
+
+
+def test_results_are_not_restored_without_strengths(tmp_path):
+    state = BatchJobState.load_or_create(list(TEAM), state_dir=str(tmp_path), strengths_by_name=TEAM)
+    list(run_batch(state, TEAM, compare_fn=fake_compare()))
+
+    resumed = BatchJobState.load_or_create(list(TEAM), state_dir=str(tmp_path))
+    assert len(resumed.pending_pairs()) == 3
+
+
+def test_torn_last_line_is_ignored(tmp_path):
+    state = BatchJobState.load_or_create(list(TEAM), state_dir=str(tmp_path), strengths_by_name=TEAM)
+    list(run_batch(state, TEAM, compare_fn=fake_compare()))
+    with open(state.path, "a") as f:
+        f.write('{"pair": ["Ann", "Bob"], "status": "fai')
+
+    resumed = BatchJobState.load_or_create(list(TEAM), state_dir=str(tmp_path), strengths_by_name=TEAM)
+    assert resumed.progress()[DONE] == 3
+
+
+def test_run_batch_bounds_concurrency(tmp_path):
+    names = [f"P{i}" for i in range(6)]
+    team = {name: TEAM["Ann"] for name in names}
+    running = []
+    peak = []
+    lock = threading.Lock()
+
+    def slow(name1, strengths1, name2, strengths2, **kwargs):
+        with lock:
+            running.append(1)
+            peak.append(len(running))
+        time.sleep(0.01)
+        with lock:
+            running.pop()
+        return ("a", "b", "c")
+
+    state = BatchJobState.load_or_create(names, state_dir=str(tmp_path), strengths_by_name=team)
+    results = list(run_batch(state, team, max_workers=3, compare_fn=slow))
+
+    assert len(results) == 15
+    assert max(peak) <= 3
@@ -0,0 +1,107 @@
+import io
+import json
+import sys
+
+import pytest
+
+import batch_runner
+from batch_runner import RunReport, read_finished, read_pairs, run
+
+PEOPLE = {
+    "Ann": ["Achiever", "Woo", "Focus", "Input", "Relator"],
+    "Bob": ["Harmony", "Achiever", "Context", "Ideation", "Learner"],
+    "Cat": ["Harmony", "Achiever", "Context", "Ideation", "Strategic"],
+}
+
+
+def fake_compare(person1_name, person1_strengths, person2_name, person2_strengths, **kwargs):
+    return (f"{person1_name} vs {person2_name}", "together", "talk")
+
+
+def lines(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+def run_main(monkeypatch, *args):
+    monkeypatch.setattr(sys, "argv", ["batch_runner.py", *args])
+    with pytest.raises(SystemExit) as exit_info:
+        batch_runner.main()
+    return exit_info.value.code
+
+
+def test_read_pairs_parses_csv_and_jsonl():
+    assert list(read_pairs(io.StringIO("person1,person2\nAnn, Bob\n"), "csv")) == [("Ann", "Bob")]
+    assert list(read_pairs(io.StringIO('{"person1": "Ann", "person2": "Bob"}\n\n'), "jsonl")) == [("Ann", "Bob")]
+    with pytest.raises(ValueError):
+        list(read_pairs(io.StringIO("a,b\nAnn,Bob\n"), "csv"))
+    with pytest.raises(ValueError):
+        list(read_pairs(io.StringIO('{"person1": "Ann"}\n'), "jsonl"))
+
+
+def test_read_finished_keeps_done_pairs_and_cuts_a_partial_line(tmp_path):
+    path = tmp_path / "results.jsonl"
+    path.write_text(
+        json.dumps({"person1": "Ann", "person2": "Bob", "status": "done"}) + "\n"
+        + json.dumps({"person1": "Ann", "person2": "Cat", "status": "failed"}) + "\n"
+        + '{"person1": "Bob", "person2": "Ca'
+    )
+
+    assert read_finished(str(path)) == {("Ann", "Bob")}
+    assert path.read_text().endswith("\n")
+    assert len(path.read_text().splitlines()) == 2
+    assert read_finished(str(tmp_path / "missing.jsonl")) == set()
+
+
+def test_run_writes_a_line_per_pair(monkeypatch):
+    output = io.StringIO()
+    pairs = [("Ann", "Bob"), ("Ann", "Ann"), ("Ann", "Zed"), ("Bob", "Cat")]
+
+    report = run(pairs, PEOPLE, output, finished={("Bob", "Cat")}, max_workers=2, compare_fn=fake_compare)
+
+    records = [json.loads(line) for line in output.getvalue().splitlines()]
+    assert {(r["person1"], r["person2"], r["status"]) for r in records} == {
+        ("Ann", "Bob", "done"), ("Ann", "Zed", "failed")
+    }
+    assert (report.done, report.failed, report.skipped) == (1, 1, 2)
+
+
+def test_report_percentiles_stay_within_the_samples():
+    report = RunReport()
+    for elapsed in (0.1, 0.2, 0.3):
+        report.record(None, elapsed)
+
+    summary = report.summary()
+    assert summary["done"] == 3
+    assert 100 <= summary["p50_ms"] <= summary["p99_ms"] <= summary["max_ms"] == 300.0
+
+
+def test_resume_retries_only_unfinished_pairs(tmp_path, monkeypatch):
+    people = tmp_path / "people.jsonl"
+    people.write_text("".join(json.dumps({"name": n, "strengths": s}) + "\n" for n, s in PEOPLE.items()))
+    team = tmp_path / "team.txt"
+    team.write_text("Ann\nBob\nCat\n")
+    output = tmp_path / "results.jsonl"
+    calls = []
+    failing = {"Cat"}
+
+    def compare(person1_name, person1_strengths, person2_name, person2_strengths, **kwargs):
+        calls.append((person1_name, person2_name))
+        if person2_name in failing:
+            raise Exception("OpenAI API error: boom")
+        return fake_compare(person1_name, person1_strengths, person2_name, person2_strengths)
+
+    monkeypatch.setattr(batch_runner, "compare_strengths", compare)
+    args = ["--team", str(team), "--people", str(people), "--output", str(output), "--workers", "2"]
+
+    assert run_main(monkeypatch, *args) == 1
+    assert sorted(calls) == [("Ann", "Bob"), ("Ann", "Cat"), ("Bob", "Cat")]
+
+    calls.clear()
+    failing.clear()
+    assert run_main(monkeypatch, *args, "--resume") == 0
+    assert sorted(calls) == [("Ann", "Cat"), ("Bob", "Cat")]
+
+    done = {(r["person1"], r["person2"]) for r in lines(output) if r["status"] == "done"}
+    assert done == {("Ann", "Bob"), ("Ann", "Cat"), ("Bob", "Cat")}
+    assert len(lines(output)) == 5
@@ -0,0 +1,138 @@
+import json
+import sqlite3
+
+import openai
+import pytest
+
+from benchmarks.load_test import LoadStats, SessionFailed, check_store, latency_stats
+from benchmarks.run_benchmarks import percentile, random_profiles, summarize
+from benchmarks.stub_server import StubConfig, start_stub_server
+
+SCHEMA_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {"name": "answer", "schema": {"type": "object", "properties": {"a": {}, "b": {}}}},
+}
+
+
+@pytest.fixture
+def stub():
+    config = StubConfig(latency=0.0, tokens_per_second=10_000, completion_tokens=20, seed=1)
+    server, base_url = start_stub_server(config=config)
+    client = openai.OpenAI(base_url=base_url, api_key="stub", max_retries=0)
+    yield config, client
+    client.close()
+    server.shutdown()
+    server.server_close()
+
+
+def ask(client, **kwargs):
+    return client.chat.completions.create(
+        model="gpt-4o", messages=[{"role": "user", "content": "Compare us"}], **kwargs
+    )
+
+
+def test_percentile_interpolates():
+    assert percentile([], 50) == 0.0
+    assert percentile([3.0, 1.0, 2.0], 50) == 2.0
+    assert percentile([1.0, 2.0], 95) == pytest.approx(1.95)
+    assert summarize([0.001, 0.003]) == {"count": 2, "mean_ms": 2.0, "p50_ms": 2.0, "p95_ms": 2.9, "max_ms": 3.0}
+
+
+def test_random_profiles_are_valid_and_repeatable():
+    from strengths import validate_strengths
+
+    profiles = random_profiles(20, seed=3)
+    assert profiles == random_profiles(20, seed=3)
+    assert all(validate_strengths(strengths)[0] for strengths in profiles.values())
+
+
+def test_stub_answers_like_the_api(stub):
+    config, client = stub
+
+    response = ask(client, max_tokens=5)
+
+    assert len(response.choices[0].message.content.split()) == 5
+    assert response.usage.completion_tokens == 5
+    assert config.requests == 1
+
+
+def test_stub_streams_with_usage(stub):
+    _, client = stub
+
+    chunks = list(ask(client, stream=True, stream_options={"include_usage": True}))
+
+    text = "".join(chunk.choices[0].delta.content or "" for chunk in chunks if chunk.choices)
+    assert len(text.split()) == 20
+    assert chunks[-1].usage.completion_tokens == 20
+
+
+def test_stub_fills_json_schema_keys(stub):
+    _, client = stub
+
+    content = ask(client, response_format=SCHEMA_FORMAT).choices[0].message.content
+
+    assert set(json.loads(content)) == {"a", "b"}
+
+
+def test_stub_injects_errors(stub):
+    config, client = stub
+    config.error_rate = 1.0
+
+    with pytest.raises(openai.RateLimitError):
+        ask(client)
+    assert config.errors == 1
+
+
+def test_latency_stats_report_the_tail():
+    stats = latency_stats([0.01] * 98 + [1.0, 2.0])
+
+    assert stats["count"] == 100
+    assert stats["p50_ms"] == 10.0
+    assert stats["p95_ms"] == 10.0
+    assert 1000.0 <= stats["p99_ms"] <= stats["max_ms"] == 2000.0
+
+
+def test_load_stats_count_lost_updates_and_failures():
+    stats = LoadStats()
+    stats.record_save("User 1 A", ["Woo"], ["Woo"])
+    stats.record_save("User 1 A", ["Focus"], ["Woo"])
+    stats.record_failure(SessionFailed("compare", "no answer"))
+    stats.record_failure(RuntimeError("socket closed"))
+
+    assert stats.expected == {"User 1 A": ["Focus"]}
+    assert stats.lost_updates == 1
+    assert stats.failures == {"compare": 1, "exception": 1}
+    assert stats.failed == 2
+
+
+@pytest.mark.parametrize("backend", ["json", "sqlite"])
+def test_check_store_finds_lost_updates(tmp_path, backend):
+    import data_storage
+
+    ann = ["Achiever", "Woo", "Focus", "Input", "Relator"]
+    bob = ["Harmony", "Achiever", "Context", "Ideation", "Learner"]
+    if backend == "json":
+        path = str(tmp_path / "people.json")
+        data_storage.JsonPeopleStore(path).upsert_many({"Ann": ann, "Bob": bob})
+    else:
+        path = str(tmp_path / "people.db")
+        data_storage.SqlitePeopleStore(path, str(tmp_path / "people.json")).upsert_many({"Ann": ann, "Bob": bob})
+
+    assert check_store(backend, path, {"Ann": ann, "Bob": bob}) == {
+        "saved_people": 2, "corrupt": False, "lost_updates": 0
+    }
+    assert check_store(backend, path, {"Ann": bob})["lost_updates"] == 1
+
+
+def test_check_store_reports_corruption(tmp_path):
+    broken_json = tmp_path / "people.json"
+    broken_json.write_text('{"Ann": [')
+    broken_db = tmp_path / "people.db"
+    conn = sqlite3.connect(broken_db)
+    conn.execute("CREATE TABLE other (x)")
+    conn.commit()
+    conn.close()
+
+    assert check_store("json", str(broken_json), {})["corrupt"] is True
+    assert check_store("sqlite", str(broken_db), {})["corrupt"] is True
+    assert check_store("json", str(tmp_path / "missing.json"), None)["saved_people"] == 0
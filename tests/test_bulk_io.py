@@ -0,0 +1,97 @@
+import io
+import json
+
+import pytest
+
+import data_storage
+from bulk_io import detect_format, export_people_text, import_people
+
+ANN = ["Achiever", "Woo", "Focus", "Input", "Relator"]
+BOB = ["Harmony", "Achiever", "Context", "Ideation", "Learner"]
+HEADER = "name,strength_1,strength_2,strength_3,strength_4,strength_5\n"
+
+
+def csv_text(*rows):
+    return HEADER + "".join(",".join(row) + "\n" for row in rows)
+
+
+def test_detect_format():
+    assert detect_format("team.CSV") == "csv"
+    assert detect_format("team.ndjson") == "jsonl"
+    with pytest.raises(ValueError):
+        detect_format("team.xlsx")
+
+
+def test_bad_csv_rows_are_reported_and_skipped(people_store):
+    text = csv_text(
+        ["Ann"] + ANN,
+        [""] + BOB,
+        ["Bob"] + BOB[:4] + [""],
+        ["Cat"] + BOB[:4] + ["Harmony"],
+        ["Dan"] + BOB[:4] + ["Not a theme"],
+        ["Bob"] + BOB,
+    )
+    report = import_people(io.StringIO(text), "csv")
+
+    assert (report.imported, report.failed) == (2, 4)
+    assert [line for line, _ in report.errors] == [3, 4, 5, 6]
+    assert report.errors[0][1] == "Missing name"
+    assert "different" in report.errors[2][1]
+    assert "Not a theme" in report.errors[3][1]
+    assert data_storage.load_saved_people() == {"Ann": ANN, "Bob": BOB}
+
+
+def test_csv_without_the_expected_columns_is_rejected(people_store):
+    report = import_people(io.StringIO("person,top_theme\nAnn,Achiever\n"), "csv")
+
+    assert report.imported == 0
+    assert report.errors[0][0] == 1
+    assert "Missing column" in report.errors[0][1]
+
+
+def test_malformed_csv_stops_with_an_error(people_store):
+    text = csv_text(["Ann"] + ANN) + "Bob," + "x" * 200_000 + "\n"
+    report = import_people(io.StringIO(text), "csv")
+
+    assert report.imported == 1
+    assert report.errors[-1][1].startswith("Malformed CSV, import stopped")
+
+
+def test_bad_jsonl_lines_are_reported(people_store):
+    lines = [
+        json.dumps({"name": "Ann", "strengths": ANN}),
+        "{not json",
+        json.dumps(["Bob", BOB]),
+        json.dumps({"name": "Bob", "strengths": "Harmony"}),
+        "",
+        json.dumps({"name": "Bob", "strengths": BOB}),
+    ]
+    report = import_people(io.StringIO("\n".join(lines) + "\n"), "jsonl")
+
+    assert (report.imported, report.failed) == (2, 3)
+    assert [line for line, _ in report.errors] == [2, 3, 4]
+    assert report.errors[0][1].startswith("Invalid JSON")
+
+
+def test_import_commits_in_batches(people_store):
+    rows = [[f"P{i}"] + ANN for i in range(5)]
+    progress = []
+    report = import_people(io.StringIO(csv_text(*rows)), "csv", batch_size=2, progress=progress.append)
+
+    assert report.imported == 5
+    assert report.batches == 3
+    assert len(progress) == 3
+    assert len(data_storage.load_saved_people()) == 5
+
+
+@pytest.mark.parametrize("file_format", ["csv", "jsonl"])
+def test_export_round_trips(people_store, file_format):
+    data_storage.save_people_batch({"Ann": ANN, "Bob, Jr.": BOB})
+    text = export_people_text(file_format)
+
+    data_storage.delete_person("Ann")
+    data_storage.delete_person("Bob, Jr.")
+    report = import_people(io.StringIO(text), file_format)
+
+    assert report.imported == 2 and report.failed == 0
+    assert data_storage.load_saved_people() == {"Ann": ANN, "Bob, Jr.": BOB}
@@ -0,0 +1,87 @@
+import time
+
+from comparison_cache import ComparisonCache, make_cache_key
+
+ANN = ["Achiever", "Woo", "Focus", "Input", "Relator"]
+BOB = ["Harmony", "Achiever", "Context", "Ideation", "Learner"]
+
+
+def key(name1="Ann", strengths1=ANN, name2="Bob", strengths2=BOB, version="v1", model="gpt-4o", temperature=0.7):
+    return make_cache_key(name1, strengths1, name2, strengths2, version, model, temperature)
+
+
+def test_key_covers_everything_that_changes_the_answer():
+    base = key()
+
+    assert key(name1=" Ann ") == base
+    assert key(temperature=0.7000001) == base
+    assert key(name1="Bob", strengths1=BOB, name2="Ann", strengths2=ANN) != base
+    assert key(strengths1=list(reversed(ANN))) != base
+    assert key(version="v2") != base
+    assert key(model="gpt-4o-mini") != base
+    assert key(temperature=0.2) != base
+
+
+def test_hits_and_misses_are_counted(tmp_path):
+    cache = ComparisonCache(str(tmp_path / "cache.db"))
+
+    assert cache.get("a") is None
+    cache.set("a", ("one", "two", "three"))
+    assert cache.get("a") == ("one", "two", "three")
+    assert cache.get("a") == ("one", "two", "three")
+
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (2, 1, 1)
+
+
+def test_results_survive_a_restart(tmp_path):
+    path = str(tmp_path / "cache.db")
+    ComparisonCache(path).set("a", ("one", "two", "three"))
+
+    assert ComparisonCache(path).get("a") == ("one", "two", "three")
+
+
+def test_expired_entries_are_misses(tmp_path):
+    cache = ComparisonCache(str(tmp_path / "cache.db"), ttl=0.05)
+    cache.set("a", ("one",))
+    time.sleep(0.1)
+
+    assert cache.get("a") is None
+    assert cache.stats()["entries"] == 0
+    assert cache.stats()["misses"] == 1
+
+
+def test_least_recently_used_entry_is_evicted(tmp_path):
+    cache = ComparisonCache(str(tmp_path / "cache.db"), max_entries=2)
+    cache.set("a", ("a",))
+    time.sleep(0.01)
+    cache.set("b", ("b",))
+    time.sleep(0.01)
+    cache.get("a")
+    time.sleep(0.01)
+    cache.set("c", ("c",))
+
+    assert cache.get("b") is None
+    assert cache.get("a") == ("a",)
+    assert cache.get("c") == ("c",)
+
+
+def test_byte_cap_evicts_oldest(tmp_path):
+    cache = ComparisonCache(str(tmp_path / "cache.db"), max_bytes=250)
+    for name in ("a", "b", "c"):
+        cache.set(name, ("x" * 100,))
+        time.sleep(0.01)
+
+    stats = cache.stats()
+    assert stats["entries"] == 2
+    assert stats["bytes"] <= 250
+    assert cache.get("a") is None
+
+
+def test_clear_resets_entries_and_counters(tmp_path):
+    cache = ComparisonCache(str(tmp_path / "cache.db"))
+    cache.set("a", ("one",))
+    cache.get("a")
+    cache.clear()
+
+    assert cache.stats() == {"hits": 0, "misses": 0, "entries": 0, "bytes": 0}
@@ -0,0 +1,175 @@
+import json
+import sqlite3
+
+import pytest
+
+import data_storage
+from data_storage import JsonPeopleStore, PeopleReadCache, SqlitePeopleStore
+
+ANN = ["Achiever", "Woo", "Focus", "Input", "Relator"]
+BOB = ["Harmony", "Achiever", "Context", "Ideation", "Learner"]
+CAT = ["Strategic", "Command", "Activator", "Maximizer", "Self-Assurance"]
+
+
+class CountingStore:
+    """Wrap a store and count full loads and single-row reads."""
+
+    def __init__(self, store):
+        self.store = store
+        self.full_loads = 0
+        self.row_reads = 0
+
+    def load_profiles(self):
+        self.full_loads += 1
+        return self.store.load_profiles()
+
+    def get(self, name):
+        self.row_reads += 1
+        return self.store.get(name)
+
+    def __getattr__(self, name):
+        return getattr(self.store, name)
+
+
+@pytest.fixture
+def store(people_store, monkeypatch):
+    """Count the reads made of the module-wide store."""
+    store = CountingStore(people_store)
+    monkeypatch.setattr(data_storage, "_store", store)
+    return store
+
+
+def test_json_file_is_imported_once(tmp_path):
+    json_path = tmp_path / "people.json"
+    json_path.write_text(json.dumps({"Ann": ANN, "Bob": BOB}))
+
+    store = SqlitePeopleStore(str(tmp_path / "people.db"), str(json_path))
+    assert store.load_all() == {"Ann": ANN, "Bob": BOB}
+    assert list(store.load_all()) == ["Ann", "Bob"]
+
+    store.delete("Bob")
+    json_path.write_text(json.dumps({"Ann": BOB, "Bob": BOB, "Cat": CAT}))
+    reopened = SqlitePeopleStore(str(tmp_path / "people.db"), str(json_path))
+    assert reopened.load_all() == {"Ann": ANN}
+
+
+def test_sqlite_upsert_updates_one_row(tmp_path):
+    store = SqlitePeopleStore(str(tmp_path / "people.db"), str(tmp_path / "missing.json"))
+    store.upsert("Ann", ANN)
+    store.upsert("Bob", BOB)
+    store.upsert("Ann", CAT)
+
+    assert store.load_all() == {"Ann": CAT, "Bob": BOB}
+    assert store.get("Ann") == CAT
+    assert store.get("Nobody") is None
+    assert store.delete("Ann") is True
+    assert store.delete("Ann") is False
+
+    store.upsert_many({"Bob": ANN, "Cat": CAT})
+    assert store.load_all() == {"Bob": ANN, "Cat": CAT}
+
+
+def test_json_store_writes_atomically(tmp_path):
+    path = tmp_path / "people.json"
+    store = JsonPeopleStore(str(path))
+    store.upsert("Ann", ANN)
+    store.upsert_many({"Bob": BOB, "Cat": CAT})
+    store.delete("Cat")
+
+    assert json.loads(path.read_text()) == {"Ann": ANN, "Bob": BOB}
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["people.json"]
+
+
+def test_module_functions_round_trip(store):
+    assert data_storage.save_person("Ann", ANN)
+    assert data_storage.save_people_batch({"Bob": BOB, "Cat": CAT})
+
+    assert data_storage.get_person_strengths("Bob") == BOB
+    assert data_storage.load_saved_people() == {"Ann": ANN, "Bob": BOB, "Cat": CAT}
+    assert data_storage.delete_person("Bob")
+    assert not data_storage.delete_person("Bob")
+    assert data_storage.get_person_strengths("Bob") is None
+
+
+def test_repeated_reads_come_from_memory(store):
+    data_storage.save_person("Ann", ANN)
+    for _ in range(5):
+        data_storage.load_saved_people()
+
+    assert store.full_loads == 1
+    assert data_storage.read_cache_stats()["reads_avoided"] == 4
+
+
+def test_write_invalidates_the_cache(store):
+    data_storage.save_person("Ann", ANN)
+    assert data_storage.load_saved_people() == {"Ann": ANN}
+
+    data_storage.save_person("Ann", BOB)
+    assert data_storage.load_saved_people() == {"Ann": BOB}
+    assert data_storage.get_person_strengths("Ann") == BOB
+
+
+def test_external_change_is_picked_up(store, tmp_path):
+    data_storage.save_person("Ann", ANN)
+    assert data_storage.load_saved_people() == {"Ann": ANN}
+
+    other = SqlitePeopleStore(str(tmp_path / "people.db"), str(tmp_path / "people.json"))
+    other.upsert("Bob", BOB)
+    assert data_storage.load_saved_people() == {"Ann": ANN, "Bob": BOB}
+
+
+def test_lookup_after_write_reads_one_row(store):
+    data_storage.save_people_batch({"Ann": ANN, "Bob": BOB})
+    data_storage.load_saved_people()
+    data_storage.save_person("Cat", CAT)
+    loads = store.full_loads
+
+    assert data_storage.get_person_strengths("Bob") == BOB
+    assert data_storage.get_person_strengths("Bob") == BOB
+    assert data_storage.get_person_strengths("Nobody") is None
+    assert store.full_loads == loads
+    assert store.row_reads == 2
+
+
+def test_read_cache_serves_lookups_from_a_full_copy(tmp_path):
+    store = CountingStore(SqlitePeopleStore(str(tmp_path / "people.db"), str(tmp_path / "people.json")))
+    store.upsert("Ann", ANN)
+    cache = PeopleReadCache(store)
+    cache.get_all()
+
+    assert list(cache.get("Ann")) == ANN
+    assert store.row_reads == 0
+
+
+def test_profiles_are_stored_compactly(tmp_path):
+    path = str(tmp_path / "people.db")
+    store = SqlitePeopleStore(path, str(tmp_path / "people.json"))
+    store.upsert("Ann", ANN)
+    store.upsert("Odd", ["Achiever", "Achiever", "Not a theme"])
+
+    types = dict(sqlite3.connect(path).execute("SELECT name, typeof(strengths) FROM people"))
+    assert types == {"Ann": "blob", "Odd": "text"}
+    assert store.load_all() == {"Ann": ANN, "Odd": ["Achiever", "Achiever", "Not a theme"]}
+
+
+def test_legacy_json_rows_are_compacted(tmp_path):
+    path = str(tmp_path / "people.db")
+    SqlitePeopleStore(path, str(tmp_path / "people.json"))
+    with sqlite3.connect(path) as conn:
+        conn.execute("INSERT INTO people (name, strengths) VALUES (?, ?)", ("Ann", json.dumps(ANN)))
+
+    store = SqlitePeopleStore(path, str(tmp_path / "people.json"))
+    assert store.get("Ann") == ANN
+    assert sqlite3.connect(path).execute("SELECT typeof(strengths) FROM people").fetchone() == ("blob",)
+
+
+def test_generation_changes_only_when_people_change(store):
+    data_storage.save_person("Ann", ANN)
+    generation = data_storage.saved_people_generation()
+
+    assert data_storage.saved_people_generation() == generation
+    assert data_storage.list_saved_names() == ["Ann"]
+
+    data_storage.save_person("Bob", BOB)
+    assert data_storage.saved_people_generation() > generation
+    assert data_storage.list_saved_names() == ["Ann", "Bob"]
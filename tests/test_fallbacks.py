@@ -0,0 +1,70 @@
+from fallbacks import FALLBACK_ITEMS, FallbackText, fallback_section, is_degraded
+
+STRENGTHS_A = ["Achiever", "Woo", "Focus", "Input", "Relator"]
+STRENGTHS_B = ["Harmony", "Achiever", "Context", "Ideation", "Learner"]
+
+
+class FakeStore:
+    def __init__(self, found=None, error=None):
+        self.found = found or {}
+        self.error = error
+
+    def get_many(self, section, pairs, version):
+        if self.error:
+            raise self.error
+        return self.found
+
+
+def build(section, version=None):
+    return fallback_section(section, "Ann", STRENGTHS_A, "Bob", STRENGTHS_B, fragment_version=version)
+
+
+def test_fallback_text_is_marked_degraded():
+    text = build("conflicts")
+
+    assert isinstance(text, FallbackText)
+    assert is_degraded(text)
+    assert not is_degraded("plain answer")
+
+
+def test_descriptions_cover_every_section():
+    for section in ("conflicts", "collaboration", "communication"):
+        text = build(section)
+        assert text.source == "descriptions"
+        assert "Ann" in text and "Bob" in text
+
+
+def test_conflicts_list_top_pairs_of_different_themes():
+    lines = [line for line in build("conflicts").splitlines() if line.startswith("- ")]
+
+    assert len(lines) == FALLBACK_ITEMS
+    assert lines[0].startswith("- **Achiever** and **Harmony**")
+    assert not any("**Achiever** and **Achiever**" in line for line in lines)
+
+
+def test_collaboration_names_shared_themes():
+    assert "- **Achiever** (shared)" in build("collaboration")
+
+
+def test_fragments_are_used_when_stored(monkeypatch):
+    store = FakeStore({("Achiever", "Harmony"): "Pace versus consensus."})
+    monkeypatch.setattr("fallbacks.get_fragment_store", lambda: store)
+    text = build("conflicts", version="v1")
+
+    assert text.source == "fragments"
+    assert "**Achiever × Harmony:** Pace versus consensus." in text
+
+
+def test_fragment_store_errors_fall_back_to_descriptions(monkeypatch):
+    monkeypatch.setattr("fallbacks.get_fragment_store", lambda: FakeStore(error=OSError("locked")))
+
+    assert build("conflicts", version="v1").source == "descriptions"
+
+
+def test_no_fragment_version_skips_the_store(monkeypatch):
+    def unexpected():
+        raise AssertionError("fragment store read without a version")
+
+    monkeypatch.setattr("fallbacks.get_fragment_store", unexpected)
+
+    assert build("communication").source == "descriptions"
@@ -0,0 +1,143 @@
+import threading
+import time
+
+import httpx
+import openai
+import pytest
+
+import openai_service
+import rate_limiter
+from hedging import DeadlineExceeded, hedge_delay, hedged_call
+from rate_limiter import ApiScheduler
+
+
+def exhausted_scheduler():
+    """A scheduler whose request budget is empty until refilled by hand."""
+    scheduler = ApiScheduler(rpm=1, tpm=100000)
+    scheduler.acquire(1)
+    return scheduler
+
+
+def refill(scheduler):
+    scheduler.requests.tokens = scheduler.requests.capacity = 10
+    scheduler.pause(0)  # wakes the waiting callers
+
+
+class FakeClient:
+    """Counts completion requests instead of sending them."""
+
+    def __init__(self):
+        self.requests = 0
+        self.chat = self
+        self.completions = self
+
+    def create(self, **kwargs):
+        self.requests += 1
+        raise AssertionError("an abandoned attempt sent a request")
+
+
+def test_returns_primary_answer_without_hedging():
+    calls = []
+
+    def call(cancel):
+        calls.append(cancel)
+        return "answer"
+
+    assert hedged_call(call, deadline=1, hedge_after=5) == "answer"
+    assert len(calls) == 1
+    assert calls[0].is_set()
+
+
+def test_hedge_wins_and_loser_is_cancelled():
+    attempts = []
+
+    def call(cancel):
+        attempts.append(cancel)
+        if len(attempts) == 1:
+            cancel.wait(5)
+            return "slow"
+        return "hedge"
+
+    started = time.monotonic()
+    assert hedged_call(call, deadline=5, hedge_after=0.05) == "hedge"
+    assert time.monotonic() - started < 1
+    assert len(attempts) == 2
+    assert attempts[0].is_set()
+
+
+def test_hedge_skipped_when_not_allowed():
+    attempts = []
+
+    def call(cancel):
+        attempts.append(cancel)
+        time.sleep(0.2)
+        return "primary"
+
+    assert hedged_call(call, deadline=2, hedge_after=0.05, can_hedge=lambda: False) == "primary"
+    assert len(attempts) == 1
+
+
+def test_deadline_raises_and_cancels_attempt():
+    attempts = []
+
+    def call(cancel):
+        attempts.append(cancel)
+        cancel.wait(5)
+
+    started = time.monotonic()
+    with pytest.raises(DeadlineExceeded):
+        hedged_call(call, deadline=0.1)
+    assert time.monotonic() - started < 1
+    assert attempts[0].is_set()
+
+
+def test_every_attempt_failing_raises_last_error():
+    def call(cancel):
+        raise ValueError("bad answer")
+
+    with pytest.raises(ValueError):
+        hedged_call(call, deadline=1)
+
+
+def test_hedge_delay_has_a_floor_and_needs_observations():
+    assert hedge_delay(None) is None
+    assert hedge_delay(0.01) == pytest.approx(1.0)
+    assert hedge_delay(7.5) == pytest.approx(7.5)
+
+
+def test_queued_attempt_abandoned_at_deadline_sends_no_request(monkeypatch):
+    scheduler = exhausted_scheduler()
+    monkeypatch.setattr(openai_service, "get_scheduler", lambda: scheduler)
+    client = FakeClient()
+
+    with pytest.raises(DeadlineExceeded):
+        hedged_call(lambda cancel: openai_service.get_ai_response(client, "prompt", cancel=cancel), deadline=0.1)
+
+    # Capacity comes back after the caller gave up; the abandoned attempt must not use it
+    refill(scheduler)
+    time.sleep(0.3)
+    assert client.requests == 0
+    assert scheduler.queue_depth() == 0
+
+
+def test_losing_hedge_in_backoff_is_not_retried(monkeypatch):
+    monkeypatch.setattr(rate_limiter, "backoff_delay", lambda attempt: 0.3)
+    scheduler = ApiScheduler(rpm=1000, tpm=100000)
+    sent = []
+    primary_failed = threading.Event()
+
+    def request(attempt):
+        sent.append(attempt)
+        if attempt == "primary":
+            primary_failed.set()
+            raise openai.APIConnectionError(request=httpx.Request("POST", "https://api.openai.com"))
+        return "hedge"
+
+    def call(cancel):
+        attempt = "hedge" if primary_failed.is_set() else "primary"
+        return scheduler.run(lambda: request(attempt), tokens=1, cancel=cancel)
+
+    assert hedged_call(call, deadline=5, hedge_after=0.05) == "hedge"
+    time.sleep(0.5)
+    # The primary would have retried after its 0.3s backoff had it not been cancelled
+    assert sent == ["primary", "hedge"]
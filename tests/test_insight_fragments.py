@@ -0,0 +1,104 @@
+import json
+import re
+
+import pytest
+
+from conftest import FakeClient
+from insight_fragments import FragmentStore, canonical_pair, ranked_pairs
+from openai_service import SECTIONS, compare_with_fragments, parse_fragment_response
+
+ANN = ["Achiever", "Woo", "Focus", "Input", "Relator"]
+BOB = ["Harmony", "Achiever", "Context", "Ideation", "Learner"]
+CAT = ["Harmony", "Achiever", "Context", "Ideation", "Strategic"]
+
+
+def answer(prompt, request):
+    """Write a fragment for every requested pair, or a synthesis naming each section."""
+    if prompt.startswith("For each pair"):
+        pairs = re.findall(r"^- (.+) \| (.+)$", prompt, re.MULTILINE)
+        return json.dumps({"insights": [
+            {"theme_a": a, "theme_b": b, "insight": f"{a} meets {b}."} for a, b in pairs
+        ]})
+    return json.dumps({section: f"{section} advice" for section in SECTIONS})
+
+
+def fragment_calls(client):
+    return [prompt for prompt in client.prompts() if prompt.startswith("For each pair")]
+
+
+def test_symmetric_sections_store_pairs_in_one_order():
+    assert canonical_pair("conflicts", "Woo", "Achiever") == ("Achiever", "Woo")
+    assert canonical_pair("collaboration", "Woo", "Achiever") == ("Achiever", "Woo")
+    assert canonical_pair("communication", "Woo", "Achiever") == ("Woo", "Achiever")
+
+
+def test_ranked_pairs_put_top_strengths_first():
+    pairs = ranked_pairs("communication", ANN, BOB, limit=3)
+
+    assert pairs == [("Achiever", "Harmony"), ("Achiever", "Achiever"), ("Woo", "Harmony")]
+    assert len(ranked_pairs("communication", ANN, BOB, limit=100)) == 25
+
+
+def test_fragment_store_keeps_versions_apart(tmp_path):
+    store = FragmentStore(str(tmp_path / "fragments.db"))
+    store.set_many("conflicts", {("Achiever", "Woo"): "old"}, "1")
+    store.set_many("conflicts", {("Achiever", "Woo"): "new"}, "1")
+
+    assert store.get_many("conflicts", [("Achiever", "Woo"), ("Focus", "Woo")], "1") == {("Achiever", "Woo"): "new"}
+    assert store.get_many("conflicts", [("Achiever", "Woo")], "2") == {}
+    assert store.stats() == {"hits": 1, "misses": 2, "fragments": 1}
+
+
+def test_parse_fragment_response_keeps_requested_pairs():
+    content = json.dumps({"insights": [
+        {"theme_a": "Woo", "theme_b": "Achiever", "insight": " Energy. "},
+        {"theme_a": "Focus", "theme_b": "Input", "insight": "Not asked for."},
+        {"theme_a": "Relator", "theme_b": "Woo"},
+    ]})
+
+    assert parse_fragment_response(content, "conflicts", [("Achiever", "Woo")]) == {("Achiever", "Woo"): "Energy."}
+
+
+@pytest.mark.parametrize("content", [
+    "not json",
+    json.dumps(["Achiever", "Woo"]),
+    json.dumps({"insights": "Energy."}),
+    json.dumps({"insights": [{"theme_a": "Focus", "theme_b": "Input", "insight": "Not asked for."}]}),
+])
+def test_parse_fragment_response_rejects_unusable_output(content):
+    with pytest.raises(ValueError):
+        parse_fragment_response(content, "conflicts", [("Achiever", "Woo")])
+
+
+def test_fragments_are_generated_once_and_reused(fragment_store):
+    client = FakeClient(answer)
+
+    first = compare_with_fragments(client, "Ann", ANN, "Bob", BOB)
+    assert first == tuple(f"{section} advice" for section in SECTIONS)
+    assert len(fragment_calls(client)) == len(SECTIONS)
+    assert len(client.requests) == len(SECTIONS) + 1
+
+    client.requests.clear()
+    assert compare_with_fragments(client, "Ann", ANN, "Bob", BOB) == first
+    assert fragment_calls(client) == []
+    assert len(client.requests) == 1
+
+
+def test_new_pair_generates_only_missing_fragments(fragment_store):
+    client = FakeClient(answer)
+    compare_with_fragments(client, "Ann", ANN, "Bob", BOB)
+    client.requests.clear()
+
+    compare_with_fragments(client, "Ann", ANN, "Cat", CAT)
+    generated = fragment_calls(client)
+    assert generated
+    assert all("Strategic" in prompt for prompt in generated)
+    assert all(line.count("Strategic") == 1 for prompt in generated for line in prompt.splitlines()[2:])
+
+
+def test_synthesis_prompt_carries_stored_fragments(fragment_store):
+    client = FakeClient(answer)
+    compare_with_fragments(client, "Ann", ANN, "Bob", BOB)
+
+    synthesis = client.prompts()[-1]
+    assert "Ann's #1 Achiever × Bob's #1 Harmony: Achiever meets Harmony." in synthesis
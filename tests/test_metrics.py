@@ -0,0 +1,68 @@
+import pytest
+
+from metrics import Histogram, MetricsRegistry, estimate_cost
+
+
+def test_cost_counts_cached_tokens_at_the_cached_price():
+    assert estimate_cost("gpt-4o", 1_000_000, 0) == pytest.approx(2.50)
+    assert estimate_cost("gpt-4o", 1_000_000, 1_000_000, cached_tokens=1_000_000) == pytest.approx(11.25)
+    assert estimate_cost("unknown-model", 0, 1_000_000) == estimate_cost("gpt-4o", 0, 1_000_000)
+
+
+def test_histogram_quantiles_interpolate_within_buckets():
+    histogram = Histogram((1.0, 2.0, 4.0))
+    for value in (0.5, 1.5, 1.5, 3.0):
+        histogram.observe(value)
+
+    assert histogram.count == 4
+    assert histogram.sum == pytest.approx(6.5)
+    assert histogram.quantile(0.25) == pytest.approx(1.0)
+    assert histogram.quantile(0.5) == pytest.approx(1.5)
+    assert histogram.quantile(1.0) == pytest.approx(4.0)
+    assert Histogram().quantile(0.5) == 0.0
+
+
+def test_span_records_failures_and_reraises():
+    registry = MetricsRegistry()
+    with registry.span("prompt_build"):
+        pass
+    with pytest.raises(RuntimeError):
+        with registry.span("prompt_build"):
+            raise RuntimeError("boom")
+
+    [histogram] = registry.snapshot()["histograms"]
+    assert histogram["name"] == "stage_duration_seconds"
+    assert histogram["labels"] == {"stage": "prompt_build"}
+    assert histogram["count"] == 2
+
+
+def test_usage_is_counted_per_model():
+    registry = MetricsRegistry()
+    registry.record_usage("gpt-4o-mini", 0.2, prompt_tokens=100, completion_tokens=50)
+    registry.record_usage("gpt-4o-mini", 0.3, prompt_tokens=100, completion_tokens=50, status="error")
+
+    counters = {
+        (counter["name"], tuple(sorted(counter["labels"].items()))): counter["value"]
+        for counter in registry.snapshot()["counters"]
+    }
+    assert counters[("openai_tokens_total", (("kind", "prompt"), ("model", "gpt-4o-mini")))] == 200
+    assert counters[("openai_requests_total", (("model", "gpt-4o-mini"), ("status", "error")))] == 1
+    assert counters[("openai_cost_usd_total", (("model", "gpt-4o-mini"),))] == pytest.approx(
+        2 * estimate_cost("gpt-4o-mini", 100, 50)
+    )
+
+
+def test_prometheus_text_has_cumulative_buckets():
+    registry = MetricsRegistry(prefix="test")
+    registry.observe("latency_seconds", 0.003, stage="lookup")
+    registry.observe("latency_seconds", 0.2, stage="lookup")
+    registry.increment("hits_total", result="hit")
+
+    text = registry.render_prometheus()
+    assert "# TYPE test_latency_seconds histogram" in text
+    assert 'test_latency_seconds_bucket{stage="lookup",le="0.005"} 1' in text
+    assert 'test_latency_seconds_bucket{stage="lookup",le="+Inf"} 2' in text
+    assert 'test_hits_total{result="hit"} 1.0' in text
+
+    registry.reset()
+    assert registry.snapshot() == {"histograms": [], "counters": []}
@@ -0,0 +1,113 @@
+import pytest
+
+from model_router import ModelRouter, Route, load_policy
+
+
+class FakeScheduler:
+    """Just enough of ApiScheduler for queue_wait(): a queue depth and a request rate."""
+
+    def __init__(self, queue_depth=0, requests_per_second=1.0):
+        self.queue_depth = queue_depth
+        self.requests = type("Bucket", (), {"rate": requests_per_second})()
+
+    def stats(self):
+        return {"queue_depth": self.queue_depth}
+
+
+def make_router(queue_depth=0):
+    policy = load_policy(None)
+    policy["slo_seconds"] = 20.0
+    return ModelRouter(policy=policy, scheduler=FakeScheduler(queue_depth), enabled=True)
+
+
+def observe(router, tier, seconds, queued=0.0, count=20):
+    route = router.tier_route(tier)
+    for _ in range(count):
+        router.record(route, seconds, queued=queued)
+
+
+def test_fast_standard_route_is_kept():
+    router = make_router()
+    observe(router, "standard", 8.0)
+
+    assert router.route("conflicts") == Route("standard", "gpt-4o", 800)
+
+
+def test_unobserved_models_are_tried():
+    router = make_router()
+
+    assert router.route("conflicts").tier == "standard"
+    assert router.predict(router.tier_route("fast")) == 0.0
+
+
+def test_slow_standard_degrades_to_fast():
+    router = make_router()
+    observe(router, "standard", 30.0)
+    observe(router, "fast", 6.0)
+
+    assert router.route("conflicts") == Route("fast", "gpt-4o-mini", 600)
+
+
+def test_last_tier_is_trimmed_in_proportion():
+    router = make_router()
+    observe(router, "standard", 60.0)
+    observe(router, "fast", 30.0)
+
+    # 600 tokens take 30s; 20s leaves room for 400
+    assert router.route("conflicts") == Route("fast", "gpt-4o-mini", 400)
+
+
+def test_trim_is_clamped_to_min_max_tokens():
+    router = make_router()
+    observe(router, "standard", 600.0)
+    observe(router, "fast", 600.0)
+
+    assert router.route("conflicts").max_tokens == router.policy["min_max_tokens"]
+
+
+def test_trim_accounts_for_queue_wait():
+    router = make_router(queue_depth=10)
+    observe(router, "standard", 60.0)
+    observe(router, "fast", 30.0)
+
+    # 10s of queueing leaves 10s of the SLO: 200 tokens, clamped to the minimum
+    assert router.route("conflicts").max_tokens == router.policy["min_max_tokens"]
+    assert router.predict(router.tier_route("fast")) == pytest.approx(40.0)
+
+
+def test_queue_wait_beyond_slo_keeps_standard_route():
+    router = make_router(queue_depth=30)
+    observe(router, "standard", 30.0)
+    observe(router, "fast", 6.0)
+
+    # Every tier waits 30s in the same queue; degrading would only lose quality
+    assert router.route("conflicts") == Route("standard", "gpt-4o", 800)
+
+
+def test_queue_time_is_not_learned_as_service_time():
+    router = make_router()
+    observe(router, "standard", 8.0, queued=40.0)
+
+    assert router.predict(router.tier_route("standard")) == pytest.approx(8.0)
+    assert router.observed_p90(router.tier_route("standard")) == pytest.approx(8.0)
+    assert router.route("conflicts").tier == "standard"
+
+
+def test_failed_calls_are_not_learned():
+    router = make_router()
+    route = router.tier_route("standard")
+    router.record(route, 100.0, ok=False)
+
+    assert router.predict(route) == 0.0
+
+
+def test_deep_always_uses_deep_tier():
+    router = make_router(queue_depth=30)
+    observe(router, "deep", 100.0)
+
+    assert router.route("conflicts", depth="deep") == Route("deep", "gpt-4o", 1600)
+
+
+def test_unknown_depth_is_rejected():
+    with pytest.raises(ValueError):
+        make_router().route("conflicts", depth="shallow")
@@ -0,0 +1,227 @@
+import json
+import threading
+import time
+
+import pytest
+
+import openai_service
+from fallbacks import is_degraded
+from openai_service import (
+    SECTIONS, compare_strengths, create_comparison_prompts, parse_combined_response, run_concurrently,
+    stream_comparison
+)
+from rate_limiter import PRIORITY_BACKGROUND
+
+ANN = ["Achiever", "Woo", "Focus", "Input", "Relator"]
+BOB = ["Harmony", "Achiever", "Context", "Ideation", "Learner"]
+PROMPTS = create_comparison_prompts("Ann", ANN, "Bob", BOB)
+
+
+def combined_reply(prompt, request):
+    """Answer combined prompts with JSON and section prompts with their own text."""
+    if request.get("response_format"):
+        return json.dumps({section: f"combined {section}" for section in SECTIONS})
+    return prompt
+
+
+def wait_for_requests(client, count):
+    while len(client.requests) < count:
+        time.sleep(0.001)
+
+
+def test_sections_are_requested_concurrently(fake_openai):
+    fake_openai.delay = 0.3
+    started = time.perf_counter()
+    result = compare_strengths("Ann", ANN, "Bob", BOB, mode="concurrent", use_cache=False)
+
+    assert time.perf_counter() - started < 0.6
+    assert result == PROMPTS
+
+
+def test_sequential_mode_gives_the_same_sections(fake_openai):
+    assert compare_strengths("Ann", ANN, "Bob", BOB, mode="sequential", use_cache=False) == PROMPTS
+    assert fake_openai.prompts() == list(PROMPTS)
+
+
+def test_failed_section_fails_the_comparison(fake_openai):
+    fake_openai.reply = lambda prompt, request: RuntimeError("boom") if "work well" in prompt else prompt
+
+    with pytest.raises(Exception, match="OpenAI API error: boom"):
+        compare_strengths("Ann", ANN, "Bob", BOB, mode="concurrent", use_cache=False)
+
+
+def test_run_concurrently_keeps_call_order():
+    calls = [lambda i=i: time.sleep(0.01 * (3 - i)) or i for i in range(3)]
+
+    assert run_concurrently(calls, timeout=5) == [0, 1, 2]
+
+
+def test_unknown_mode_is_rejected():
+    with pytest.raises(ValueError, match="Unknown comparison mode"):
+        compare_strengths("Ann", ANN, "Bob", BOB, mode="telepathy")
+
+
+def test_repeat_comparison_is_served_from_cache(fake_openai, comparison_cache):
+    first = compare_strengths("Ann", ANN, "Bob", BOB, mode="concurrent")
+    second = compare_strengths("Ann", ANN, "Bob", BOB, mode="concurrent")
+
+    assert first == second == PROMPTS
+    assert len(fake_openai.requests) == 3
+    assert comparison_cache.stats()["hits"] == 1
+
+    compare_strengths("Ann", ANN, "Bob", BOB, mode="concurrent", use_cache=False)
+    assert len(fake_openai.requests) == 6
+
+
+def test_stream_comparison_yields_every_section(fake_openai):
+    deltas = list(stream_comparison("Ann", ANN, "Bob", BOB, use_cache=False, mode="concurrent"))
+    text = {section: "".join(delta for name, delta in deltas if name == section) for section in SECTIONS}
+
+    assert tuple(text[section] for section in SECTIONS) == PROMPTS
+    assert len(deltas) > len(SECTIONS)
+    assert all(request["stream"] for request in fake_openai.requests)
+
+
+def test_cached_comparison_streams_one_delta_per_section(fake_openai, comparison_cache):
+    compare_strengths("Ann", ANN, "Bob", BOB, mode="concurrent")
+    fake_openai.requests.clear()
+
+    assert list(stream_comparison("Ann", ANN, "Bob", BOB)) == list(zip(SECTIONS, PROMPTS))
+    assert fake_openai.requests == []
+
+
+def test_parse_combined_response_returns_sections_in_order():
+    content = json.dumps({"communication": "c", "conflicts": " a ", "collaboration": "b"})
+
+    assert parse_combined_response(content) == ("a", "b", "c")
+
+
+@pytest.mark.parametrize("content", [
+    "",
+    "not json",
+    "[1, 2, 3]",
+    json.dumps({"conflicts": "a", "collaboration": "b"}),
+    json.dumps({"conflicts": "a", "collaboration": "b", "communication": "  "}),
+    json.dumps({"conflicts": "a", "collaboration": "b", "communication": 3}),
+])
+def test_parse_combined_response_rejects_malformed_output(content):
+    with pytest.raises(ValueError):
+        parse_combined_response(content)
+
+
+def test_combined_mode_makes_one_call(fake_openai):
+    fake_openai.reply = combined_reply
+    result = compare_strengths("Ann", ANN, "Bob", BOB, mode="combined", use_cache=False)
+
+    assert result == tuple(f"combined {section}" for section in SECTIONS)
+    assert len(fake_openai.requests) == 1
+
+
+def test_combined_mode_falls_back_to_section_calls(fake_openai):
+    fake_openai.reply = lambda prompt, request: "{not json" if request.get("response_format") else prompt
+    result = compare_strengths("Ann", ANN, "Bob", BOB, mode="combined", use_cache=False)
+
+    assert result == PROMPTS
+    assert len(fake_openai.requests) == 4
+
+
+def test_combined_fallback_is_cached_as_a_concurrent_answer(fake_openai, comparison_cache):
+    fake_openai.reply = lambda prompt, request: "{not json" if request.get("response_format") else prompt
+    compare_strengths("Ann", ANN, "Bob", BOB, mode="combined")
+    fake_openai.requests.clear()
+
+    assert compare_strengths("Ann", ANN, "Bob", BOB, mode="concurrent") == PROMPTS
+    assert fake_openai.requests == []
+
+    fake_openai.reply = combined_reply
+    assert compare_strengths("Ann", ANN, "Bob", BOB, mode="combined") == tuple(
+        f"combined {section}" for section in SECTIONS
+    )
+
+
+def test_combined_mode_streams_the_finished_result(fake_openai):
+    fake_openai.reply = combined_reply
+    deltas = list(stream_comparison("Ann", ANN, "Bob", BOB, use_cache=False, mode="combined"))
+
+    assert deltas == [(section, f"combined {section}") for section in SECTIONS]
+    assert len(fake_openai.requests) == 1
+
+
+def test_client_is_shared_until_the_key_changes(monkeypatch):
+    monkeypatch.setattr(openai_service, "_client", None)
+    monkeypatch.setattr(openai_service, "API_KEY_REFRESH_SECONDS", 0.0)
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-one")
+
+    first = openai_service.get_openai_client()
+    assert openai_service.get_openai_client() is first
+
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-two")
+    second = openai_service.get_openai_client()
+    assert second is not first
+    assert second.api_key == "sk-two"
+
+
+def test_missing_key_is_reported(monkeypatch):
+    monkeypatch.setattr(openai_service, "_client", None)
+    monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+
+    with pytest.raises(ValueError, match="OPENAI_API_KEY not found"):
+        openai_service.get_openai_client()
+
+
+def run_in_thread(fn, *args, **kwargs):
+    outcome = {}
+
+    def target():
+        outcome["result"] = fn(*args, **kwargs)
+
+    thread = threading.Thread(target=target)
+    thread.start()
+    return thread, outcome
+
+
+def test_identical_comparisons_share_one_run(fake_openai, comparison_cache):
+    fake_openai.delay = 0.2
+    leader, leader_outcome = run_in_thread(compare_strengths, "Ann", ANN, "Bob", BOB, mode="concurrent")
+    wait_for_requests(fake_openai, 3)
+    result = compare_strengths("Ann", ANN, "Bob", BOB, mode="concurrent")
+    leader.join()
+
+    assert result == leader_outcome["result"] == PROMPTS
+    assert len(fake_openai.requests) == 3
+
+
+def test_interactive_request_does_not_join_background_run(fake_openai, comparison_cache):
+    fake_openai.delay = 0.2
+    leader, _ = run_in_thread(
+        compare_strengths, "Ann", ANN, "Bob", BOB, mode="concurrent", priority=PRIORITY_BACKGROUND
+    )
+    wait_for_requests(fake_openai, 3)
+    compare_strengths("Ann", ANN, "Bob", BOB, mode="concurrent")
+    leader.join()
+
+    assert len(fake_openai.requests) == 6
+
+
+def test_uncached_request_does_not_join_cached_run(fake_openai, comparison_cache):
+    fake_openai.delay = 0.2
+    leader, _ = run_in_thread(compare_strengths, "Ann", ANN, "Bob", BOB, mode="concurrent")
+    wait_for_requests(fake_openai, 3)
+    compare_strengths("Ann", ANN, "Bob", BOB, mode="concurrent", use_cache=False)
+    leader.join()
+
+    assert len(fake_openai.requests) == 6
+
+
+def test_follower_falls_back_at_its_own_deadline(fake_openai, comparison_cache, monkeypatch):
+    monkeypatch.setattr(openai_service, "comparison_wait", lambda mode, deadline: 0.1)
+    fake_openai.delay = 0.5
+    leader, leader_outcome = run_in_thread(compare_strengths, "Ann", ANN, "Bob", BOB, mode="concurrent")
+    wait_for_requests(fake_openai, 3)
+    started = time.perf_counter()
+    result = compare_strengths("Ann", ANN, "Bob", BOB, mode="concurrent")
+
+    assert time.perf_counter() - started < 0.4
+    assert all(is_degraded(text) for text in result)
+    leader.join()
+    assert leader_outcome["result"] == PROMPTS
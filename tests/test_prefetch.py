@@ -0,0 +1,91 @@
+import threading
+import time
+
+from prefetch import PrefetchWorker
+
+ANN = ["Achiever", "Woo", "Focus", "Input", "Relator"]
+BOB = ["Harmony", "Achiever", "Context", "Ideation", "Learner"]
+
+
+class FakeScheduler:
+    def __init__(self, capacity=True):
+        self.capacity = capacity
+        self.checks = 0
+
+    def has_capacity(self, tokens, requests=1):
+        self.checks += 1
+        return self.capacity
+
+
+class Recorder:
+    def __init__(self):
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def __call__(self, person1_name, person1_strengths, person2_name, person2_strengths):
+        with self.lock:
+            self.calls.append(person2_name)
+
+
+def jobs(*names):
+    return [("Ann", ANN, name, BOB) for name in names]
+
+
+def wait_until(condition, timeout=2.0):
+    end = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > end:
+            raise AssertionError("condition not met in time")
+        time.sleep(0.01)
+
+
+def test_jobs_run_most_likely_first(comparison_cache):
+    scheduler = FakeScheduler(capacity=False)
+    compare = Recorder()
+    worker = PrefetchWorker(compare, backoff=0.02, scheduler=scheduler)
+
+    assert worker.submit(jobs("Bob", "Cat", "Ann")) == 2
+    wait_until(lambda: scheduler.checks > 0)
+    scheduler.capacity = True
+    wait_until(lambda: worker.stats()["completed"] == 2)
+
+    assert compare.calls == ["Bob", "Cat"]
+
+
+def test_no_comparison_runs_without_capacity(comparison_cache):
+    scheduler = FakeScheduler(capacity=False)
+    compare = Recorder()
+    worker = PrefetchWorker(compare, backoff=0.02, scheduler=scheduler)
+
+    worker.submit(jobs("Bob"))
+    wait_until(lambda: worker.stats()["deferred"] >= 3)
+
+    assert compare.calls == []
+    assert worker.stats()["queued"] == 1
+    assert worker.budget_remaining() == worker.max_per_hour
+
+
+def test_budget_caps_comparisons_per_hour(comparison_cache):
+    compare = Recorder()
+    worker = PrefetchWorker(compare, max_per_hour=2, backoff=0.02, scheduler=FakeScheduler())
+
+    worker.submit(jobs("Bob", "Cat", "Dan", "Eve"))
+    wait_until(lambda: worker.stats()["dropped"] == 2)
+
+    stats = worker.stats()
+    assert compare.calls == ["Bob", "Cat"]
+    assert stats["completed"] == 2
+    assert stats["budget_remaining"] == 0
+    assert stats["queued"] == 0
+
+
+def test_full_queue_drops_the_oldest_jobs(comparison_cache):
+    scheduler = FakeScheduler(capacity=False)
+    worker = PrefetchWorker(Recorder(), queue_size=2, backoff=0.02, scheduler=scheduler)
+
+    worker.submit(jobs("Bob"))
+    worker.submit(jobs("Cat", "Dan"))
+
+    stats = worker.stats()
+    assert stats["queued"] == 2
+    assert stats["dropped"] == 1
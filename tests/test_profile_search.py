@@ -0,0 +1,69 @@
+import random
+
+import pytest
+
+from profile_search import ProfileIndex
+from scoring import score_pair
+from strengths import CLIFTON_STRENGTHS, StrengthProfile
+
+ANN = ["Achiever", "Woo", "Focus", "Input", "Relator"]
+
+
+def profile(names):
+    return StrengthProfile.from_names(names)
+
+
+def team():
+    return {
+        "Twin": profile(ANN),
+        "Three": profile(["Achiever", "Woo", "Focus", "Harmony", "Context"]),
+        "One": profile(["Relator", "Harmony", "Context", "Ideation", "Learner"]),
+        "None": profile(["Harmony", "Context", "Ideation", "Learner", "Strategic"]),
+    }
+
+
+def test_top_k_shared_orders_by_shared_themes():
+    index = ProfileIndex(team())
+
+    assert index.top_k(profile(ANN), "shared", k=3) == [("Twin", 5.0), ("Three", 3.0), ("One", 1.0)]
+    assert index.top_k(profile(ANN), "shared", k=10, exclude=["Twin"])[0] == ("Three", 3.0)
+    assert len(index.top_k(profile(ANN), "shared", k=10)) == 4
+
+
+def test_top_k_matches_brute_force_scores():
+    rng = random.Random(0)
+    people = {f"P{i}": rng.sample(CLIFTON_STRENGTHS, 5) for i in range(300)}
+    index = ProfileIndex({name: profile(names) for name, names in people.items()}, capacity=8)
+    query = rng.sample(CLIFTON_STRENGTHS, 5)
+
+    for metric, score in [("complementary", "complementarity"), ("similar", "overlap")]:
+        expected = sorted((score_pair(query, names)[score] for names in people.values()), reverse=True)[:5]
+        found = index.top_k(profile(query), metric, k=5)
+        assert [value for _, value in found] == pytest.approx(expected, abs=1e-5), metric
+        for name, value in found:
+            assert score_pair(query, people[name])[score] == pytest.approx(value, abs=1e-5)
+
+
+def test_upsert_replaces_and_adds():
+    index = ProfileIndex(team())
+    index.upsert("None", profile(ANN))
+    index.upsert("New", profile(["Achiever", "Woo", "Focus", "Input", "Learner"]))
+
+    assert len(index) == 5
+    best = index.top_k(profile(ANN), "shared", k=3)
+    assert sorted(best[:2]) == [("None", 5.0), ("Twin", 5.0)]
+    assert best[2] == ("New", 4.0)
+
+
+def test_remove_keeps_other_rows_intact():
+    index = ProfileIndex(team())
+
+    assert index.remove("Twin") is True
+    assert index.remove("Twin") is False
+    assert "Twin" not in index
+    assert index.top_k(profile(ANN), "shared", k=10) == [("Three", 3.0), ("One", 1.0), ("None", 0.0)]
+
+
+def test_unknown_metric_is_rejected():
+    with pytest.raises(ValueError, match="Unknown search metric"):
+        ProfileIndex(team()).top_k(profile(ANN), "telepathy")
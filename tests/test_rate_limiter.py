@@ -0,0 +1,142 @@
+import asyncio
+import threading
+import time
+
+import httpx
+import openai
+import pytest
+
+import rate_limiter
+from rate_limiter import ApiScheduler, DeadlineExceeded
+
+
+def connection_error():
+    return openai.APIConnectionError(request=httpx.Request("POST", "https://api.openai.com/v1/chat/completions"))
+
+
+def exhausted_scheduler():
+    """A scheduler whose request budget is empty for the next minute."""
+    scheduler = ApiScheduler(rpm=1, tpm=100000, max_retries=2)
+    scheduler.acquire(1)
+    return scheduler
+
+
+def test_acquire_gives_up_at_deadline():
+    scheduler = exhausted_scheduler()
+    started = time.monotonic()
+    with pytest.raises(DeadlineExceeded):
+        scheduler.acquire(1, deadline_at=started + 0.2)
+    assert time.monotonic() - started < 1
+    assert scheduler.queue_depth() == 0
+
+
+def test_run_does_not_send_after_deadline():
+    scheduler = exhausted_scheduler()
+    calls = []
+    with pytest.raises(DeadlineExceeded):
+        scheduler.run(lambda: calls.append(1), tokens=1, deadline_at=time.monotonic() + 0.2)
+    assert calls == []
+
+
+def test_run_does_not_retry_past_deadline(monkeypatch):
+    monkeypatch.setattr(rate_limiter, "backoff_delay", lambda attempt: 10.0)
+    scheduler = ApiScheduler(rpm=1000, tpm=100000, max_retries=3)
+    calls = []
+
+    def call():
+        calls.append(1)
+        raise connection_error()
+
+    started = time.monotonic()
+    with pytest.raises(DeadlineExceeded):
+        scheduler.run(call, tokens=1, deadline_at=started + 1)
+    assert calls == [1]
+    assert time.monotonic() - started < 1
+
+
+def test_run_retries_within_deadline(monkeypatch):
+    monkeypatch.setattr(rate_limiter, "backoff_delay", lambda attempt: 0.01)
+    scheduler = ApiScheduler(rpm=1000, tpm=100000, max_retries=3)
+    calls = []
+
+    def call():
+        calls.append(1)
+        if len(calls) < 3:
+            raise connection_error()
+        return "ok"
+
+    assert scheduler.run(call, tokens=1, deadline_at=time.monotonic() + 5) == "ok"
+    assert len(calls) == 3
+
+
+def test_acquire_async_past_deadline_charges_nothing():
+    scheduler = exhausted_scheduler()
+    before = scheduler.requests.tokens
+    with pytest.raises(DeadlineExceeded):
+        asyncio.run(scheduler.acquire_async(1, deadline_at=time.monotonic() + 0.2))
+    assert scheduler.requests.tokens == pytest.approx(before, abs=0.01)
+    assert scheduler.queue_depth() == 0
+
+
+def test_async_caller_waits_behind_queued_interactive_caller():
+    scheduler = ApiScheduler(rpm=600, tpm=100000)
+    scheduler.requests.tokens = 0
+    order = []
+
+    def interactive():
+        scheduler.acquire(1, rate_limiter.PRIORITY_INTERACTIVE)
+        order.append("interactive")
+
+    async def background():
+        await scheduler.acquire_async(1, rate_limiter.PRIORITY_BACKGROUND)
+        order.append("background")
+
+    thread = threading.Thread(target=interactive)
+    thread.start()
+    time.sleep(0.02)
+    asyncio.run(background())
+    thread.join()
+    assert order == ["interactive", "background"]
+
+
+def test_run_async_does_not_send_after_deadline():
+    scheduler = exhausted_scheduler()
+    calls = []
+
+    async def call():
+        calls.append(1)
+
+    with pytest.raises(DeadlineExceeded):
+        asyncio.run(scheduler.run_async(call, tokens=1, deadline_at=time.monotonic() + 0.2))
+    assert calls == []
+
+
+def test_cancelled_async_request_is_not_charged():
+    scheduler = ApiScheduler(rpm=60, tpm=100000)
+    scheduler.requests.tokens = 0.5
+    calls = []
+
+    async def call():
+        calls.append(1)
+
+    async def scenario():
+        task = asyncio.ensure_future(scheduler.run_async(call, tokens=1))
+        await asyncio.sleep(0.05)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(scenario())
+    assert calls == []
+    # A charged request would leave the bucket in debt
+    assert scheduler.requests.tokens > 0.5
+
+
+def test_cancel_event_stops_queued_acquire():
+    scheduler = exhausted_scheduler()
+    cancel = threading.Event()
+    threading.Timer(0.1, cancel.set).start()
+    started = time.monotonic()
+    with pytest.raises(DeadlineExceeded):
+        scheduler.acquire(1, cancel=cancel)
+    assert time.monotonic() - started < 1
@@ -0,0 +1,59 @@
+import random
+
+import numpy as np
+import pytest
+
+from scoring import encode_profile, encode_profiles, pairwise_scores, score_one_to_many, score_pair
+from strengths import CLIFTON_STRENGTHS
+
+SCORES = ("overlap", "complementarity", "domain_coverage", "overall")
+
+
+def random_profiles(count, seed=0):
+    rng = random.Random(seed)
+    return [rng.sample(CLIFTON_STRENGTHS, 5) for _ in range(count)]
+
+
+def test_every_score_is_between_zero_and_one():
+    profiles = random_profiles(200)
+    scores = pairwise_scores(encode_profiles(profiles))
+
+    for name in SCORES:
+        assert scores[name].min() >= -1e-6, name
+        assert scores[name].max() <= 1 + 1e-6, name
+
+
+def test_extreme_pairs_stay_in_range():
+    executing = ["Achiever", "Arranger", "Belief", "Consistency", "Deliberative"]
+    relationship = ["Adaptability", "Connectedness", "Developer", "Empathy", "Harmony"]
+
+    for person1, person2 in [(executing, executing), (executing, relationship), (relationship, executing)]:
+        scores = score_pair(person1, person2)
+        assert all(0.0 <= scores[name] <= 1.0 for name in SCORES)
+
+
+def test_overlap_is_one_for_identical_profiles_and_zero_for_disjoint_ones():
+    profile = ["Achiever", "Woo", "Focus", "Input", "Relator"]
+    disjoint = ["Harmony", "Context", "Ideation", "Learner", "Strategic"]
+
+    assert score_pair(profile, profile)["overlap"] == pytest.approx(1.0)
+    assert score_pair(profile, disjoint)["overlap"] == pytest.approx(0.0)
+
+
+def test_higher_ranks_weigh_more():
+    profile = ["Achiever", "Woo", "Focus", "Input", "Relator"]
+    shares_first = ["Achiever", "Harmony", "Context", "Ideation", "Learner"]
+    shares_last = ["Harmony", "Context", "Ideation", "Learner", "Relator"]
+
+    assert score_pair(profile, shares_first)["overlap"] > score_pair(profile, shares_last)["overlap"]
+
+
+def test_batched_scores_match_single_pairs():
+    profiles = random_profiles(20, seed=1)
+    matrix = encode_profiles(profiles)
+    pairwise = pairwise_scores(matrix, chunk_size=7)
+    one_to_many = score_one_to_many(encode_profile(profiles[3]), matrix)
+
+    for name in SCORES:
+        np.testing.assert_allclose(pairwise[name][3], one_to_many[name], rtol=1e-5, atol=1e-6)
+        assert pairwise[name][3, 11] == pytest.approx(score_pair(profiles[3], profiles[11])[name], abs=1e-5)
@@ -0,0 +1,116 @@
+import json
+
+from fallbacks import FallbackText
+from session_history import ComparisonHistory, get_session_history, history_key, to_json
+
+STRENGTHS_A = ["Achiever", "Woo", "Focus", "Input", "Relator"]
+STRENGTHS_B = ["Harmony", "Command", "Context", "Ideation", "Learner"]
+
+
+def add(history, name, text="x", **kwargs):
+    return history.add(name, STRENGTHS_A, "Partner", STRENGTHS_B,
+                       {"conflicts": text, "collaboration": text, "communication": text}, **kwargs)
+
+
+def names(history):
+    return [entry["person1_name"] for entry in history.entries()]
+
+
+def test_evicts_least_recently_used_by_count():
+    history = ComparisonHistory(max_entries=3, max_bytes=10 ** 6)
+    for name in ("a", "b", "c"):
+        add(history, name)
+    # Reopening "a" makes "b" the least recently used
+    history.get(history_key("a", STRENGTHS_A, "Partner", STRENGTHS_B))
+    add(history, "d")
+
+    assert names(history) == ["d", "a", "c"]
+    assert history_key("b", STRENGTHS_A, "Partner", STRENGTHS_B) not in history
+
+
+def test_peek_does_not_change_eviction_order():
+    history = ComparisonHistory(max_entries=2, max_bytes=10 ** 6)
+    add(history, "a")
+    add(history, "b")
+    history.peek(history_key("a", STRENGTHS_A, "Partner", STRENGTHS_B))
+    add(history, "c")
+
+    assert names(history) == ["c", "b"]
+
+
+def test_evicts_by_bytes_and_keeps_total_in_step():
+    one_entry = add(ComparisonHistory(), "a", text="y" * 100)["bytes"]
+    history = ComparisonHistory(max_entries=100, max_bytes=2 * one_entry + 10)
+    for name in ("a", "b", "c"):
+        add(history, name, text="y" * 100)
+
+    assert names(history) == ["c", "b"]
+    assert history.total_bytes == sum(entry["bytes"] for entry in history.entries())
+    assert history.total_bytes <= history.max_bytes
+
+
+def test_entry_larger_than_byte_cap_is_still_kept():
+    history = ComparisonHistory(max_entries=10, max_bytes=50)
+    add(history, "a")
+    add(history, "b", text="z" * 1000)
+
+    assert names(history) == ["b"]
+    assert history.total_bytes == history.entries()[0]["bytes"]
+
+
+def test_bytes_count_utf8_not_characters():
+    ascii_entry = add(ComparisonHistory(), "a", text="e" * 10)
+    accented_entry = add(ComparisonHistory(), "a", text="é" * 10)
+
+    assert accented_entry["bytes"] - ascii_entry["bytes"] == 30
+
+
+def test_readding_same_comparison_replaces_entry():
+    history = ComparisonHistory(max_entries=10, max_bytes=10 ** 6)
+    add(history, "a", text="short")
+    add(history, "b")
+    add(history, "a", text="a much longer deep analysis", depth="deep")
+
+    assert names(history) == ["a", "b"]
+    assert history.entries()[0]["depth"] == "deep"
+    assert history.total_bytes == sum(entry["bytes"] for entry in history.entries())
+
+
+def test_remove_and_clear_release_bytes():
+    history = ComparisonHistory(max_entries=10, max_bytes=10 ** 6)
+    entry = add(history, "a")
+    add(history, "b")
+
+    assert history.remove(entry["key"])
+    assert not history.remove(entry["key"])
+    assert history.total_bytes == history.entries()[0]["bytes"]
+    history.clear()
+    assert len(history) == 0 and history.total_bytes == 0
+
+
+def test_json_export_keeps_people_and_sections():
+    entry = add(ComparisonHistory(), "a", text="é")
+    exported = json.loads(to_json(entry))
+
+    assert exported["person1"] == {"name": "a", "strengths": STRENGTHS_A}
+    assert exported["person2"]["name"] == "Partner"
+    assert exported["conflicts"] == "é"
+
+
+def test_degraded_sections_are_recorded_and_exported():
+    history = ComparisonHistory()
+    entry = history.add("a", STRENGTHS_A, "Partner", STRENGTHS_B, {
+        "conflicts": "ok",
+        "collaboration": FallbackText("offline"),
+        "communication": "ok",
+    })
+
+    assert entry["degraded"] == ["collaboration"]
+    assert json.loads(to_json(entry))["degraded_sections"] == ["collaboration"]
+
+
+def test_get_session_history_creates_once():
+    state = {}
+    history = get_session_history(state)
+
+    assert get_session_history(state) is history
@@ -0,0 +1,149 @@
+import asyncio
+import threading
+
+import pytest
+
+from singleflight import SingleFlight
+
+
+def start_followers(flights, key, count):
+    """Start threads that call flights.do(key, ...) and record what they got."""
+    outcomes = []
+    lock = threading.Lock()
+
+    def follow():
+        try:
+            outcome = ("result", flights.do(key, lambda: "follower ran"))
+        except Exception as e:
+            outcome = ("error", e)
+        with lock:
+            outcomes.append(outcome)
+
+    threads = [threading.Thread(target=follow) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    return threads, outcomes
+
+
+def wait_for_followers(flights, count):
+    while flights.stats()["coalesced"] < count:
+        threading.Event().wait(0.001)
+
+
+def test_followers_share_leader_result():
+    flights = SingleFlight()
+    release = threading.Event()
+    calls = []
+    leader_results = []
+
+    def work():
+        calls.append(1)
+        release.wait(5)
+        return "shared"
+
+    leader = threading.Thread(target=lambda: leader_results.append(flights.do("key", work)))
+    leader.start()
+    while flights.stats()["in_flight"] == 0:
+        threading.Event().wait(0.001)
+    threads, outcomes = start_followers(flights, "key", 3)
+    wait_for_followers(flights, 3)
+    release.set()
+    for thread in threads + [leader]:
+        thread.join(5)
+
+    assert outcomes == [("result", "shared")] * 3
+    assert leader_results == ["shared"]
+    assert calls == [1]
+    assert flights.stats() == {"leaders": 1, "coalesced": 3, "in_flight": 0}
+
+
+def test_leader_error_reaches_every_follower():
+    flights = SingleFlight()
+    future, leader = flights.begin("key")
+    assert leader
+    threads, outcomes = start_followers(flights, "key", 3)
+    wait_for_followers(flights, 3)
+
+    error = ValueError("boom")
+    flights.end("key", future, error=error)
+    for thread in threads:
+        thread.join(5)
+
+    assert outcomes == [("error", error)] * 3
+
+
+def test_do_reraises_in_leader_and_retires_key():
+    flights = SingleFlight()
+
+    def fail():
+        raise RuntimeError("leader failed")
+
+    with pytest.raises(RuntimeError):
+        flights.do("key", fail)
+    assert flights.stats()["in_flight"] == 0
+    # The next caller starts a fresh run instead of seeing the old error
+    assert flights.do("key", lambda: "fresh") == "fresh"
+
+
+def test_distinct_keys_do_not_coalesce():
+    flights = SingleFlight()
+    first, first_leader = flights.begin("a")
+    second, second_leader = flights.begin("b")
+    assert first_leader and second_leader
+    assert first is not second
+    flights.end("a", first, result=1)
+    flights.end("b", second, result=2)
+    assert (first.result(), second.result()) == (1, 2)
+
+
+def test_cancelled_async_leader_gives_followers_a_regular_error():
+    flights = SingleFlight()
+    started = asyncio.Event()
+
+    async def slow():
+        started.set()
+        await asyncio.sleep(10)
+
+    async def scenario():
+        leader = asyncio.ensure_future(flights.do_async("key", slow))
+        await started.wait()
+        follower = asyncio.ensure_future(flights.do_async("key", slow))
+        sync_future, is_leader = flights.begin("key")
+        await asyncio.sleep(0)
+        # The leader times out, as under asyncio.wait_for in the HTTP API
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        with pytest.raises(Exception) as follower_error:
+            await follower
+        return is_leader, sync_future, follower_error.value
+
+    is_leader, sync_future, follower_error = asyncio.run(scenario())
+    assert not is_leader
+    assert isinstance(follower_error, TimeoutError)
+    # Sync callers (the app) waiting on the same flight get the same regular error
+    with pytest.raises(TimeoutError):
+        sync_future.result(timeout=1)
+    assert flights.stats()["in_flight"] == 0
+
+
+def test_cancelled_async_follower_leaves_leader_running():
+    flights = SingleFlight()
+    release = asyncio.Event()
+
+    async def work():
+        await release.wait()
+        return "done"
+
+    async def scenario():
+        leader = asyncio.ensure_future(flights.do_async("key", work))
+        await asyncio.sleep(0)
+        follower = asyncio.ensure_future(flights.do_async("key", work))
+        await asyncio.sleep(0)
+        follower.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await follower
+        release.set()
+        return await leader
+
+    assert asyncio.run(scenario()) == "done"
@@ -0,0 +1,65 @@
+import pickle
+
+import pytest
+
+from strengths import CLIFTON_STRENGTHS, StrengthProfile, validate_strengths
+
+ANN = ["Achiever", "Woo", "Focus", "Input", "Relator"]
+BOB = ["Harmony", "Achiever", "Context", "Ideation", "Relator"]
+
+
+def test_profile_round_trips_through_bytes():
+    profile = StrengthProfile.from_names(ANN)
+    data = profile.to_bytes()
+
+    assert len(data) == 5
+    assert StrengthProfile.from_bytes(data) == profile
+    assert StrengthProfile.from_bytes(data).names() == ANN
+    assert list(profile) == ANN
+
+
+def test_every_theme_fits_the_mask():
+    profile = StrengthProfile.from_names(CLIFTON_STRENGTHS)
+
+    assert profile.mask == (1 << len(CLIFTON_STRENGTHS)) - 1
+    assert StrengthProfile.from_bytes(profile.to_bytes()).names() == CLIFTON_STRENGTHS
+
+
+def test_set_operations_use_the_mask():
+    ann = StrengthProfile.from_names(ANN)
+    bob = StrengthProfile.from_names(BOB)
+
+    assert ann.overlap(bob) == 2
+    assert ann.shared(bob) == ["Achiever", "Relator"]
+    assert bob.shared(ann) == ["Achiever", "Relator"]
+    assert ann.rank_of("Focus") == 2
+    assert ann.rank_of("Harmony") == -1
+    assert "Woo" in ann and "Harmony" not in ann
+
+
+@pytest.mark.parametrize("names", [["Achiever", "Achiever"], ["Achiever", "Not a theme"]])
+def test_invalid_names_are_rejected(names):
+    with pytest.raises(ValueError):
+        StrengthProfile.from_names(names)
+
+
+@pytest.mark.parametrize("data", [bytes([34]), bytes([3, 3])])
+def test_invalid_bytes_are_rejected(data):
+    with pytest.raises(ValueError):
+        StrengthProfile.from_bytes(data)
+
+
+def test_profile_is_immutable_hashable_and_picklable():
+    profile = StrengthProfile.from_names(ANN)
+
+    with pytest.raises(AttributeError):
+        profile.mask = 0
+    assert {profile: 1}[StrengthProfile.from_names(ANN)] == 1
+    assert pickle.loads(pickle.dumps(profile)) == profile
+
+
+def test_validate_strengths():
+    assert validate_strengths(ANN) == (True, "")
+    assert not validate_strengths(ANN[:4])[0]
+    assert not validate_strengths(ANN[:4] + ["Achiever"])[0]
+    assert not validate_strengths(ANN[:4] + ["Not a theme"])[0]